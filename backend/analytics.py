@@ -0,0 +1,377 @@
+"""
+PROJECT VECTOR — Cohort Outcome Analytics
+Calgary Strength & Physio
+
+Read side of /api/analytics/pathology/{id}: how journeys on one pathology
+actually progress, from phase_completions and metric_recordings.
+
+  * Phase durations: distribution (percentiles, weekly histogram) of
+    phase_completions.duration_days per phase.
+  * Time to met: days from the start of a phase to the first recording
+    that satisfies each of its exit criteria, judged by the same compiled
+    predicates the progression engine uses.
+  * Stalls: active journeys that have been in their phase longer than the
+    cohort's p90 for that phase, or have no recording for STALL_IDLE_DAYS.
+
+Each journey is reduced to a small JourneySummary from bulk extracts.
+Recordings stay in SQLite: only their distinct (criterion, value) pairs
+come back to be judged, and SQLite returns each journey's first met date
+per criterion and its last recording date. Summaries are
+cached per pathology with a watermark: the max rowid of metric_recordings,
+phase_completions and client_journeys. A later request re-summarizes only
+the journeys that gained rows past the watermark, then re-aggregates the
+cached summaries. A Living Library reload, or a watermark that went
+backwards (rows deleted, database reset), rebuilds the pathology from
+scratch.
+"""
+
+import threading
+from dataclasses import dataclass
+from datetime import date
+from typing import Optional, Tuple
+
+# Completed journeys a phase needs before its p90 is used for stall detection
+ANALYTICS_MIN_COHORT = 5
+STALL_IDLE_DAYS = 21
+STALL_LIST_MAX = 100
+HISTOGRAM_BIN_DAYS = 7
+
+# Journey ids per IN (...) list when re-summarizing changed journeys, and
+# met (criterion, value) pairs per VALUES list; together under SQLite's
+# default 999 host parameters
+EXTRACT_CHUNK = 500
+MET_PAIRS_CHUNK = 200
+
+
+@dataclass(frozen=True)
+class JourneySummary:
+    client_id: str
+    status: str
+    current_phase_id: Optional[str]
+    phase_started: Optional[date]             # start of the current phase
+    last_recorded: Optional[date]
+    durations: Tuple[Tuple[str, int], ...]    # (phase_id, duration_days)
+    time_to_met: Tuple[Tuple[str, int], ...]  # (criterion_id, days)
+
+
+def _day(value):
+    try:
+        return date.fromisoformat(str(value)[:10])
+    except (TypeError, ValueError):
+        return None
+
+
+# --- Distributions ---
+
+def percentile(values, q):
+    """Linear-interpolated percentile of an already sorted list."""
+    if not values:
+        return None
+    pos = (len(values) - 1) * q
+    lo = int(pos)
+    hi = min(lo + 1, len(values) - 1)
+    return values[lo] + (values[hi] - values[lo]) * (pos - lo)
+
+
+def distribution(values):
+    values = sorted(values)
+    if not values:
+        return {"count": 0}
+    return {
+        "count": len(values),
+        "mean": round(sum(values) / len(values), 1),
+        "min": values[0],
+        "p25": round(percentile(values, 0.25), 1),
+        "p50": round(percentile(values, 0.50), 1),
+        "p75": round(percentile(values, 0.75), 1),
+        "p90": round(percentile(values, 0.90), 1),
+        "max": values[-1],
+    }
+
+
+def histogram(values, width=HISTOGRAM_BIN_DAYS):
+    counts = {}
+    for value in values:
+        counts[value // width] = counts.get(value // width, 0) + 1
+    return [{"fromDay": b * width, "count": counts[b]} for b in sorted(counts)]
+
+
+# --- Extraction ---
+
+def read_watermark(cursor):
+    """(max rowid of metric_recordings, phase_completions, client_journeys)."""
+    return tuple(cursor.execute("""
+        SELECT
+            COALESCE((SELECT MAX(rowid) FROM metric_recordings), 0),
+            COALESCE((SELECT MAX(rowid) FROM phase_completions), 0),
+            COALESCE((SELECT MAX(rowid) FROM client_journeys), 0)
+    """).fetchone())
+
+
+def changed_journeys(cursor, pathology_id, since):
+    """Journeys of the pathology with rows added after the `since` watermark."""
+    recordings, completions, journeys = since
+    return {row[0] for row in cursor.execute("""
+        SELECT id FROM client_journeys WHERE pathology_id = ? AND rowid > ?
+        UNION
+        SELECT m.journey_id FROM metric_recordings m
+        JOIN client_journeys j ON j.id = m.journey_id
+        WHERE m.rowid > ? AND j.pathology_id = ?
+        UNION
+        SELECT c.journey_id FROM phase_completions c
+        JOIN client_journeys j ON j.id = c.journey_id
+        WHERE c.rowid > ? AND j.pathology_id = ?
+    """, (pathology_id, journeys, recordings, pathology_id, completions, pathology_id))}
+
+
+def summarize_journeys(cursor, protocol, journey_ids=None):
+    """JourneySummary per journey: every journey of the pathology, or just `journey_ids`."""
+    if journey_ids is None:
+        return _summarize(cursor, protocol, None)
+    ids = sorted(journey_ids)
+    summaries = {}
+    for i in range(0, len(ids), EXTRACT_CHUNK):
+        summaries.update(_summarize(cursor, protocol, ids[i:i + EXTRACT_CHUNK]))
+    return summaries
+
+
+def _summarize(cursor, protocol, chunk):
+    if chunk is None:
+        journey_filter, journey_params = "pathology_id = ?", (protocol.pathology_id,)
+        child_filter = "journey_id IN (SELECT id FROM client_journeys WHERE pathology_id = ?)"
+        child_params = (protocol.pathology_id,)
+    else:
+        placeholders = ", ".join("?" * len(chunk))
+        journey_filter = f"pathology_id = ? AND id IN ({placeholders})"
+        journey_params = (protocol.pathology_id, *chunk)
+        child_filter, child_params = f"journey_id IN ({placeholders})", tuple(chunk)
+
+    # 1. Journeys
+    journeys = cursor.execute(f"""
+        SELECT id, client_id, status, current_phase_id, started_at
+        FROM client_journeys WHERE {journey_filter}
+    """, journey_params).fetchall()
+
+    # 2. Completed phases: durations and the start date of each phase
+    completions = {}
+    for row in cursor.execute(f"""
+        SELECT journey_id, phase_id, started_at, completed_at, duration_days
+        FROM phase_completions WHERE {child_filter}
+    """, child_params):
+        completions.setdefault(row["journey_id"], []).append(row)
+
+    # 3. Distinct (criterion, value) pairs, each judged once by the compiled
+    #    predicate; the recordings themselves are never pulled into Python
+    criteria = {crit.id: ph.id for ph in protocol.phases for crit in ph.criteria}
+    predicates = {crit.id: crit.is_met for ph in protocol.phases for crit in ph.criteria}
+    met_pairs = [
+        (criterion_id, value)
+        for criterion_id, value in cursor.execute(f"""
+            SELECT DISTINCT criterion_id, recorded_value
+            FROM metric_recordings WHERE criterion_id IS NOT NULL AND {child_filter}
+        """, child_params)
+        if criterion_id in predicates and predicates[criterion_id](value)
+    ]
+
+    # 4. First met day per (journey, criterion), found by SQLite off the met pairs
+    first_met = {}
+    for i in range(0, len(met_pairs), MET_PAIRS_CHUNK):
+        pairs = met_pairs[i:i + MET_PAIRS_CHUNK]
+        for journey_id, criterion_id, first in cursor.execute(f"""
+            WITH met(criterion_id, recorded_value) AS (VALUES {", ".join(["(?, ?)"] * len(pairs))})
+            SELECT journey_id, criterion_id, MIN(recorded_at)
+            FROM metric_recordings
+            WHERE {child_filter} AND (criterion_id, recorded_value) IN met
+            GROUP BY journey_id, criterion_id
+        """, (*(item for pair in pairs for item in pair), *child_params)):
+            key = (journey_id, criterion_id)
+            if first and (key not in first_met or first < first_met[key]):
+                first_met[key] = first
+
+    # 5. Last recording per journey (stall detection)
+    last_recorded = {
+        journey_id: last
+        for journey_id, last in cursor.execute(f"""
+            SELECT journey_id, MAX(recorded_at) FROM metric_recordings
+            WHERE {child_filter} GROUP BY journey_id
+        """, child_params)
+    }
+
+    met_by_journey = {}
+    for (journey_id, criterion_id), day in first_met.items():
+        met_by_journey.setdefault(journey_id, []).append((criterion_id, _day(day)))
+
+    summaries = {}
+    for journey in journeys:
+        done = completions.get(journey["id"], ())
+        phase_starts = {row["phase_id"]: _day(row["started_at"]) for row in done}
+        ended = [d for d in (_day(row["completed_at"]) for row in done) if d is not None]
+        current_start = max(ended) if ended else _day(journey["started_at"])
+        if journey["current_phase_id"] is not None:
+            phase_starts.setdefault(journey["current_phase_id"], current_start)
+
+        time_to_met = []
+        for criterion_id, day in met_by_journey.get(journey["id"], ()):
+            start = phase_starts.get(criteria[criterion_id])
+            if start is not None and day is not None:
+                time_to_met.append((criterion_id, max(0, (day - start).days)))
+
+        summaries[journey["id"]] = JourneySummary(
+            client_id=journey["client_id"],
+            status=journey["status"],
+            current_phase_id=journey["current_phase_id"],
+            phase_started=current_start,
+            last_recorded=_day(last_recorded.get(journey["id"])),
+            durations=tuple(
+                (row["phase_id"], row["duration_days"]) for row in done if row["duration_days"] is not None
+            ),
+            time_to_met=tuple(time_to_met),
+        )
+    return summaries
+
+
+# --- Aggregation ---
+
+def aggregate(protocol, summaries, today):
+    """The cohort report for one pathology from its journey summaries."""
+    durations, time_to_met = {}, {}
+    status_counts = {}
+    for summary in summaries.values():
+        status_counts[summary.status] = status_counts.get(summary.status, 0) + 1
+        for phase_id, days in summary.durations:
+            durations.setdefault(phase_id, []).append(days)
+        for criterion_id, days in summary.time_to_met:
+            time_to_met.setdefault(criterion_id, []).append(days)
+
+    phases, p90 = [], {}
+    for ph in protocol.phases:
+        values = durations.get(ph.id, [])
+        stats = distribution(values)
+        if len(values) >= ANALYTICS_MIN_COHORT:
+            p90[ph.id] = stats["p90"]
+        phases.append({
+            "phaseId": ph.id,
+            "name": ph.name,
+            "typicalDuration": ph.typical_duration,
+            "durationDays": stats,
+            "histogram": histogram(values),
+            "criteria": [
+                {
+                    "criterionId": crit.id,
+                    "label": crit.label,
+                    "timeToMetDays": distribution(time_to_met.get(crit.id, [])),
+                }
+                for crit in ph.criteria
+            ],
+        })
+
+    # Stalls: measured against the cohort, not the protocol's nominal duration
+    names = {ph.id: ph.name for ph in protocol.phases}
+    stalls = []
+    for journey_id, summary in summaries.items():
+        if summary.status != "active" or summary.phase_started is None:
+            continue
+        days_in_phase = (today - summary.phase_started).days
+        idle_days = (today - max(filter(None, (summary.last_recorded, summary.phase_started)))).days
+        reasons = []
+        limit = p90.get(summary.current_phase_id)
+        if limit is not None and days_in_phase > limit:
+            reasons.append("beyond_cohort_p90")
+        if idle_days >= STALL_IDLE_DAYS:
+            reasons.append("no_recent_recordings")
+        if reasons:
+            stalls.append({
+                "journeyId": journey_id,
+                "clientId": summary.client_id,
+                "phase": names.get(summary.current_phase_id),
+                "daysInPhase": days_in_phase,
+                "daysSinceRecording": idle_days,
+                "reasons": reasons,
+            })
+    stalls.sort(key=lambda s: (-s["daysInPhase"], s["journeyId"]))
+
+    return {
+        "pathologyId": protocol.pathology_id,
+        "journeys": {"total": len(summaries), **status_counts},
+        "phases": phases,
+        "stalls": {"count": len(stalls), "journeys": stalls[:STALL_LIST_MAX]},
+        "asOf": today.isoformat(),
+    }
+
+
+# --- Incremental Cache ---
+
+class _PathologyState:
+    __slots__ = ("lock", "library_version", "watermark", "summaries", "report", "day")
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.library_version = None
+        self.watermark = None
+        self.summaries = {}
+        self.report = None
+        self.day = None
+
+
+class CohortAnalytics:
+    """Per-pathology JourneySummary cache with watermark-based incremental refresh."""
+
+    def __init__(self, protocol_cache):
+        self.protocol_cache = protocol_cache
+        self._states = {}
+        self._lock = threading.Lock()
+        self.full_refreshes = 0
+        self.journeys_refreshed = 0
+
+    def _state(self, pathology_id):
+        with self._lock:
+            state = self._states.get(pathology_id)
+            if state is None:
+                state = self._states[pathology_id] = _PathologyState()
+            return state
+
+    def report(self, cursor, pathology, watermark, today=None):
+        """
+        Cohort report for `pathology` (row with id, version, library_version)
+        as of `watermark` (read_watermark). Returns (report, journeys_refreshed).
+        """
+        today = today or date.today()
+        state = self._state(pathology["id"])
+        # One refresh per pathology at a time; concurrent callers reuse its result
+        with state.lock:
+            protocol = self.protocol_cache.get(
+                cursor, pathology["id"], pathology["version"], pathology["library_version"]
+            )
+            if (state.watermark is None
+                    or state.library_version != pathology["library_version"]
+                    or any(now < then for now, then in zip(watermark, state.watermark))):
+                state.summaries = summarize_journeys(cursor, protocol)
+                state.report = None
+                refreshed = len(state.summaries)
+                with self._lock:
+                    self.full_refreshes += 1
+            elif watermark != state.watermark:
+                changed = changed_journeys(cursor, pathology["id"], state.watermark)
+                if changed:
+                    state.summaries.update(summarize_journeys(cursor, protocol, changed))
+                    state.report = None
+                refreshed = len(changed)
+            else:
+                refreshed = 0
+
+            state.watermark = watermark
+            state.library_version = pathology["library_version"]
+            if state.report is None or state.day != today:
+                state.report = aggregate(protocol, state.summaries, today)
+                state.day = today
+            with self._lock:
+                self.journeys_refreshed += refreshed
+            return state.report, refreshed
+
+    def stats(self):
+        with self._lock:
+            return {
+                "pathologies": len(self._states),
+                "full_refreshes": self.full_refreshes,
+                "journeys_refreshed": self.journeys_refreshed,
+            }
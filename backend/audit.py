@@ -0,0 +1,210 @@
+"""
+PROJECT VECTOR — Audit Logging Pipeline
+Calgary Strength & Physio
+
+Audit records must never cost the event loop a disk write. The
+`vector_audit` logger therefore only enqueues (QueueHandler); a single
+listener thread per worker drains the queue in batches, formats each record
+as one JSON line, and flushes once per batch.
+
+  * Per-worker segments: each gunicorn worker appends to its own
+    `audit.<pid>.jsonl`, so the 4 workers never interleave writes in a
+    shared file and rotation needs no cross-process coordination.
+  * Rotation: a segment rolls over when it passes AUDIT_LOG_MAX_BYTES or
+    AUDIT_LOG_ROTATE_SECONDS, whichever comes first, keeping
+    AUDIT_LOG_BACKUPS old segments.
+  * Retention: backups are only pruned within one pid, so every worker
+    restart would leave its predecessor's segments behind for good. On
+    start-up each worker sweeps every segment not written for
+    AUDIT_LOG_RETENTION_DAYS. Age alone decides: pids are reused across
+    container restarts, so whether pid N is running says nothing about
+    who wrote audit.N.jsonl.
+  * Structured fields: pass `extra={"audit": {...}}` and the keys are
+    written alongside ts/level/event.
+
+Only security-relevant events (access, protocol errors) belong here;
+operational warnings go to each module's own logger.
+
+scripts/bench_audit_logging.py compares the per-request cost of this path
+with the synchronous FileHandler it replaced.
+"""
+
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import re
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+AUDIT_LOGGER_NAME = "vector_audit"
+AUDIT_LOG_DIR = Path(os.getenv("AUDIT_LOG_DIR", "database/logs"))
+AUDIT_LOG_MAX_BYTES = int(os.getenv("AUDIT_LOG_MAX_BYTES", str(10 * 1024 * 1024)))
+AUDIT_LOG_ROTATE_SECONDS = int(os.getenv("AUDIT_LOG_ROTATE_SECONDS", str(24 * 60 * 60)))
+AUDIT_LOG_BACKUPS = int(os.getenv("AUDIT_LOG_BACKUPS", "30"))
+AUDIT_LOG_RETENTION_DAYS = int(os.getenv("AUDIT_LOG_RETENTION_DAYS", "90"))
+AUDIT_BATCH_SIZE = 256
+
+# audit.<pid>.jsonl and its rotated backups audit.<pid>.jsonl.<n>
+_SEGMENT = re.compile(r"^audit\.(\d+)\.jsonl(?:\.\d+)?$")
+
+
+class JsonLineFormatter(logging.Formatter):
+    """One JSON object per record: ts, level, event, plus any `audit` fields."""
+
+    def format(self, record):
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "event": record.getMessage(),
+            "pid": record.process,
+        }
+        fields = getattr(record, "audit", None)
+        if fields:
+            entry.update(fields)
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, separators=(",", ":"), default=str)
+
+
+class SegmentFileHandler(logging.handlers.RotatingFileHandler):
+    """
+    Size- and time-rotated file handler that leaves flushing to the caller,
+    so a batch of records costs one write syscall instead of one per record.
+    """
+
+    def __init__(self, filename, max_bytes, rotate_seconds, backup_count):
+        super().__init__(filename, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8", delay=True)
+        self.rotate_seconds = rotate_seconds
+        self.rollover_at = time.time() + rotate_seconds
+
+    def shouldRollover(self, record):
+        if self.rotate_seconds and time.time() >= self.rollover_at:
+            return True
+        return super().shouldRollover(record)
+
+    def doRollover(self):
+        super().doRollover()
+        self.rollover_at = time.time() + self.rotate_seconds
+
+    def emit(self, record):
+        try:
+            if self.shouldRollover(record):
+                self.doRollover()
+            if self.stream is None:
+                self.stream = self._open()
+            self.stream.write(self.format(record) + self.terminator)
+        except Exception:
+            self.handleError(record)
+
+
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    """
+    Enqueue the record as-is. The stock QueueHandler formats and copies the
+    record on the caller's thread; here all formatting happens on the
+    listener. Audit records carry only immutable strings, so this is safe.
+    """
+
+    def prepare(self, record):
+        return record
+
+
+class BatchingQueueListener(logging.handlers.QueueListener):
+    """QueueListener that drains up to `batch_size` records per wake-up."""
+
+    def __init__(self, q, *handlers, batch_size=AUDIT_BATCH_SIZE):
+        super().__init__(q, *handlers, respect_handler_level=True)
+        self.batch_size = batch_size
+
+    def _monitor(self):
+        q = self.queue
+        has_task_done = hasattr(q, "task_done")
+        stopping = False
+        while not stopping:
+            batch = [self.dequeue(True)]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self.dequeue(False))
+                except queue.Empty:
+                    break
+            for record in batch:
+                if record is self._sentinel:
+                    stopping = True
+                else:
+                    self.handle(record)
+                if has_task_done:
+                    q.task_done()
+            for handler in self.handlers:
+                handler.flush()
+
+
+def sweep_stale_segments(directory, max_age_seconds, now=None):
+    """
+    Delete segments of any process not written for `max_age_seconds`.
+    Returns the number of files removed.
+
+    A live worker's open segment may be swept too: with `max_age_seconds`
+    above the rotation interval, its next record rolls it over into a new
+    file before writing, so nothing lands in the deleted one.
+    """
+    cutoff = (now if now is not None else time.time()) - max_age_seconds
+    removed = 0
+    for path in Path(directory).iterdir():
+        if _SEGMENT.match(path.name) is None:
+            continue
+        try:
+            if path.stat().st_mtime >= cutoff:
+                continue
+            path.unlink()
+            removed += 1
+        except OSError:
+            continue
+    return removed
+
+
+_listener = None
+
+
+def setup_audit_logging():
+    """Route `vector_audit` through the queue; idempotent per process."""
+    global _listener
+    logger = logging.getLogger(AUDIT_LOGGER_NAME)
+    if _listener is not None:
+        return logger
+
+    AUDIT_LOG_DIR.mkdir(parents=True, exist_ok=True)
+    # Retention never drops below the rotation interval (see sweep_stale_segments)
+    sweep_stale_segments(AUDIT_LOG_DIR, max(AUDIT_LOG_RETENTION_DAYS * 24 * 60 * 60, 2 * AUDIT_LOG_ROTATE_SECONDS))
+    handler = SegmentFileHandler(
+        str(AUDIT_LOG_DIR / f"audit.{os.getpid()}.jsonl"),
+        max_bytes=AUDIT_LOG_MAX_BYTES,
+        rotate_seconds=AUDIT_LOG_ROTATE_SECONDS,
+        backup_count=AUDIT_LOG_BACKUPS,
+    )
+    handler.setFormatter(JsonLineFormatter())
+
+    records = queue.SimpleQueue()
+    logger.handlers = [DeferredQueueHandler(records)]
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+    _listener = BatchingQueueListener(records, handler)
+    _listener.start()
+    atexit.register(stop_audit_logging)
+    return logger
+
+
+def stop_audit_logging():
+    """Drain outstanding records and close the segment file."""
+    global _listener
+    if _listener is None:
+        return
+    _listener.stop()
+    for handler in _listener.handlers:
+        handler.close()
+    _listener = None
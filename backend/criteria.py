@@ -0,0 +1,157 @@
+"""
+PROJECT VECTOR — Compiled Exit-Criteria Predicates
+Calgary Strength & Physio
+
+Exit criteria are stored as (target_operator, target_value) text pairs. They
+are compiled once, when a protocol is loaded, into small immutable predicate
+objects so evaluating a recording is a single comparison against a
+pre-parsed threshold instead of a float() parse and an operator if-chain.
+
+  * NumericPredicate: '=', '>', '>=', '<', '<=' against a float threshold.
+  * RangePredicate:   'between' against an inclusive 'low..high' (or
+                      'low-high') target, e.g. '0..10'.
+  * TextPredicate:    case-folded equality ('=') and pass/fail matching for
+                      non-numeric targets such as 'full' or 'pass'.
+  * NeverMet:         operator/target pairs that can never be satisfied
+                      (e.g. '>=' 'bodyweight').
+
+Recorded values are always strings in metric_recordings; a value that does
+not parse as a number falls back to the text rules, matching the behaviour
+of the original check_criteria_met.
+"""
+
+import operator
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Callable
+
+NUMERIC_OPERATORS = {
+    "=": operator.eq,
+    ">": operator.gt,
+    ">=": operator.ge,
+    "<": operator.lt,
+    "<=": operator.le,
+}
+
+RANGE_OPERATOR = "between"
+RANGE_PATTERN = re.compile(
+    r"^\s*(-?\d+(?:\.\d+)?)\s*(?:\.\.|-|to)\s*(-?\d+(?:\.\d+)?)\s*$"
+)
+
+
+def _parse_float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _text_matches(op, target_folded, value):
+    """String fallback shared by every predicate: '=' equality, then pass/fail."""
+    folded = str(value).casefold()
+    if op == "=":
+        return folded == target_folded
+    return target_folded == "pass" and folded == "pass"
+
+
+# --- Predicates (immutable, safe to share across threads) ---
+
+@dataclass(frozen=True)
+class NumericPredicate:
+    op: str
+    threshold: float
+    target_folded: str
+    compare: Callable[[float, float], bool]
+
+    def __call__(self, value):
+        if value is None:
+            return False
+        number = _parse_float(value)
+        if number is None:
+            return _text_matches(self.op, self.target_folded, value)
+        return self.compare(number, self.threshold)
+
+
+@dataclass(frozen=True)
+class RangePredicate:
+    low: float
+    high: float
+
+    def __call__(self, value):
+        number = _parse_float(value)
+        return number is not None and self.low <= number <= self.high
+
+
+@dataclass(frozen=True)
+class TextPredicate:
+    op: str
+    target_folded: str
+
+    def __call__(self, value):
+        if value is None:
+            return False
+        return _text_matches(self.op, self.target_folded, value)
+
+
+@dataclass(frozen=True)
+class NeverMet:
+    def __call__(self, value):
+        return False
+
+
+NEVER_MET = NeverMet()
+
+
+@lru_cache(maxsize=1024)
+def compile_criterion(target_operator, target_value):
+    """Compile one (operator, target) pair into a reusable predicate."""
+    op = (target_operator or "").strip().lower()
+    target = str(target_value if target_value is not None else "")
+
+    if op == RANGE_OPERATOR:
+        match = RANGE_PATTERN.match(target)
+        if not match:
+            return NeverMet()
+        low, high = sorted((float(match.group(1)), float(match.group(2))))
+        return RangePredicate(low=low, high=high)
+
+    target_folded = target.casefold()
+    threshold = _parse_float(target)
+    if threshold is not None:
+        compare = NUMERIC_OPERATORS.get(op)
+        if compare is None:
+            return NeverMet()
+        return NumericPredicate(op=op, threshold=threshold, target_folded=target_folded, compare=compare)
+
+    if op == "=" or target_folded == "pass":
+        return TextPredicate(op=op, target_folded=target_folded)
+    return NeverMet()
+
+
+# --- Evaluation ---
+
+def evaluate_criteria(predicates, observations):
+    """
+    Apply compiled predicates to a page of already-fetched latest values.
+
+    The set-based work happens in SQL (one pass joins every criterion to its
+    latest value); here the rows are grouped by criterion and each predicate
+    is mapped once over its column of values, instead of a predicate lookup
+    per row. `predicates` maps criterion_id -> compiled predicate;
+    `observations` is an iterable of (journey_id, criterion_id, latest_value)
+    rows (None for never-measured criteria, as a LEFT JOIN produces). An
+    unknown criterion is unmet. Returns {journey_id: {criterion_id: met}}.
+    """
+    columns = {}
+    for journey_id, criterion_id, value in observations:
+        journey_ids, values = columns.setdefault(criterion_id, ([], []))
+        journey_ids.append(journey_id)
+        values.append(value)
+
+    results = {}
+    for criterion_id, (journey_ids, values) in columns.items():
+        predicate = predicates.get(criterion_id, NEVER_MET)
+        for journey_id, met in zip(journey_ids, map(predicate, values)):
+            results.setdefault(journey_id, {})[criterion_id] = met
+    return results
@@ -0,0 +1,165 @@
+"""
+PROJECT VECTOR — SQLite Connection Pool
+Calgary Strength & Physio
+
+Connections are opened once per worker and reused across requests instead of
+paying sqlite3.connect() + pragma setup on every call.
+
+  * Readers: a LIFO pool of query_only connections checked out for the length
+    of a request. Checkout (rather than thread-locals) is used because FastAPI
+    runs a yield dependency and its sync endpoint on different threadpool
+    threads, so thread identity does not follow the request. When every
+    reader stays busy for `checkout_timeout`, PoolExhausted is raised.
+  * Writer: a single connection per worker, serialized by a lock. WAL lets
+    readers proceed while it writes; busy_timeout absorbs contention with the
+    other gunicorn workers instead of surfacing `database is locked`.
+"""
+
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+BUSY_TIMEOUT_MS = 5000
+CACHED_STATEMENTS = 256
+
+# Applied once, when a pooled connection is first opened
+CONNECTION_PRAGMAS = (
+    "PRAGMA foreign_keys = ON",
+    f"PRAGMA busy_timeout = {BUSY_TIMEOUT_MS}",
+    "PRAGMA synchronous = NORMAL",
+    "PRAGMA mmap_size = 268435456",   # 256 MB
+    "PRAGMA cache_size = -16000",     # ~16 MB page cache
+    "PRAGMA temp_store = MEMORY",
+)
+
+
+class PoolExhausted(Exception):
+    """Every pooled reader stayed checked out for the whole checkout timeout."""
+
+
+class ConnectionPool:
+    """Pre-configured read and write handles for one SQLite database file."""
+
+    def __init__(self, db_path, max_readers=8, checkout_timeout=BUSY_TIMEOUT_MS / 1000):
+        self.db_path = str(db_path)
+        self.max_readers = max_readers
+        self.checkout_timeout = checkout_timeout
+        self._readers = queue.LifoQueue()
+        self._reader_count = 0
+        self._reader_lock = threading.Lock()
+        self._writer = None
+        self._write_lock = threading.Lock()
+        self._after_commit = []
+
+    def _connect(self, read_only):
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=BUSY_TIMEOUT_MS / 1000,
+            check_same_thread=False,
+            cached_statements=CACHED_STATEMENTS,
+        )
+        conn.row_factory = sqlite3.Row
+        if not read_only:
+            # journal_mode is persistent on the database file; set it from the writer
+            conn.execute("PRAGMA journal_mode = WAL")
+        for pragma in CONNECTION_PRAGMAS:
+            conn.execute(pragma)
+        if read_only:
+            conn.execute("PRAGMA query_only = ON")
+        return conn
+
+    def _checkout_reader(self):
+        try:
+            return self._readers.get_nowait()
+        except queue.Empty:
+            pass
+        with self._reader_lock:
+            if self._reader_count < self.max_readers:
+                self._reader_count += 1
+                try:
+                    return self._connect(read_only=True)
+                except Exception:
+                    self._reader_count -= 1
+                    raise
+        try:
+            return self._readers.get(timeout=self.checkout_timeout)
+        except queue.Empty:
+            raise PoolExhausted(f"all {self.max_readers} readers busy for {self.checkout_timeout}s") from None
+
+    @contextmanager
+    def reader(self):
+        """Check out a read-only connection; it is returned to the pool on exit."""
+        conn = self._checkout_reader()
+        try:
+            yield conn
+        finally:
+            if conn.in_transaction:
+                conn.rollback()
+            self._readers.put(conn)
+
+    @contextmanager
+    def writer(self):
+        """
+        Exclusive access to the worker's write connection.
+
+        Commits on a clean exit and rolls back if the block raises, so callers
+        never leave a half-applied transaction or a leaked handle behind.
+        """
+        with self._write_lock:
+            if self._writer is None:
+                self._writer = self._connect(read_only=False)
+            conn = self._writer
+            self._after_commit = []
+            try:
+                yield conn
+            except BaseException:
+                conn.rollback()
+                self._after_commit = []
+                raise
+            else:
+                conn.commit()
+                callbacks, self._after_commit = self._after_commit, []
+                for callback in callbacks:
+                    callback()
+
+    @contextmanager
+    def savepoint(self, cursor, name):
+        """
+        Run a block under SAVEPOINT `name` inside the current writer()
+        transaction. If the block raises, its writes and the after_commit()
+        callbacks it queued are discarded and the exception propagates; the
+        rest of the transaction carries on.
+        """
+        mark = len(self._after_commit)
+        cursor.execute(f"SAVEPOINT {name}")
+        try:
+            yield
+        except BaseException:
+            cursor.execute(f"ROLLBACK TO {name}")
+            cursor.execute(f"RELEASE {name}")
+            del self._after_commit[mark:]
+            raise
+        cursor.execute(f"RELEASE {name}")
+
+    def after_commit(self, callback):
+        """
+        Run `callback` once the current writer block commits (dropped on
+        rollback, or when the enclosing savepoint() rolls back). Only valid
+        while holding writer().
+        """
+        self._after_commit.append(callback)
+
+    def close(self):
+        """Close every pooled connection (used on worker shutdown)."""
+        while True:
+            try:
+                self._readers.get_nowait().close()
+            except queue.Empty:
+                break
+        with self._reader_lock:
+            self._reader_count = 0
+        with self._write_lock:
+            if self._writer is not None:
+                self._writer.close()
+                self._writer = None
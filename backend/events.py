@@ -0,0 +1,174 @@
+"""
+PROJECT VECTOR — Live Journey Events (Server-Sent Events)
+Calgary Strength & Physio
+
+In-process pub/sub behind GET /api/client/{id}/events. Metric writes
+publish small deltas for a client; every dashboard or clinician portal
+streaming that client receives them instead of re-fetching and re-assembling
+the whole journey.
+
+Events (SSE `event:` names, JSON `data:`):
+  * criterion — {"id", "metric", "current", "met"}: a current-phase
+    criterion's latest value after a write.
+  * phase     — {"completed_phase_id", "current_phase_id", ...}: a phase
+    was completed and the next one unlocked.
+  * resync    — {}: deltas may have been missed (slow viewer, a write on
+    another worker); the viewer should re-fetch the journey, which is a
+    conditional GET and usually a 304.
+
+Publishing is thread-safe and never blocks the writer: each message is
+serialized once and handed to the subscribers' event loops with
+call_soon_threadsafe. Writers publish through ConnectionPool.after_commit,
+so a rolled-back write is never announced.
+
+The bus is per worker. Streams re-check a cheap journey fingerprint on
+every keep-alive tick and send `resync` when it moved without a local
+event, which covers writes handled by the other gunicorn workers.
+"""
+
+import asyncio
+import itertools
+import json
+import threading
+
+SSE_RETRY_MS = 5000
+
+# Sentinel queued to end a stream (shutdown)
+_CLOSE = object()
+
+
+def format_sse(event, data, event_id=None):
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"event: {event}")
+    lines.append("data: " + json.dumps(data, separators=(",", ":")))
+    return ("\n".join(lines) + "\n\n").encode("utf-8")
+
+
+RESYNC_MESSAGE = format_sse("resync", {})
+
+
+class Subscription:
+    """One connected viewer: a bounded queue owned by the stream's event loop."""
+
+    def __init__(self, client_id, loop, max_queue):
+        self.client_id = client_id
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize=max_queue)
+        self.delivered = 0
+
+    def offer(self, message):
+        """Thread-safe: schedule `message` onto the subscriber's loop."""
+        try:
+            self.loop.call_soon_threadsafe(self._put, message)
+        except RuntimeError:
+            pass  # Loop already closed; the stream is gone
+
+    def _put(self, message):
+        if self.queue.full():
+            # Viewer is too slow: drop the backlog, tell it to re-fetch (or,
+            # on shutdown, just to close)
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            if message is not _CLOSE:
+                message = RESYNC_MESSAGE
+        self.queue.put_nowait(message)
+
+    async def next(self, timeout):
+        """Next message, or None after `timeout` seconds without one."""
+        try:
+            message = await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+        self.delivered += 1
+        return message
+
+
+class JourneyEventBus:
+    """Per-worker fan-out of journey deltas, keyed by client id."""
+
+    def __init__(self, max_subscribers=500, max_queue=256):
+        self.max_subscribers = max_subscribers
+        self.max_queue = max_queue
+        self._subscribers = {}
+        self._count = 0
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self.published = 0
+
+    def subscribe(self, client_id):
+        """
+        Register a viewer from inside a running event loop. Returns None when
+        the worker is at `max_subscribers`.
+        """
+        subscription = Subscription(client_id, asyncio.get_running_loop(), self.max_queue)
+        with self._lock:
+            if self._count >= self.max_subscribers:
+                return None
+            self._subscribers.setdefault(client_id, set()).add(subscription)
+            self._count += 1
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            viewers = self._subscribers.get(subscription.client_id)
+            if viewers and subscription in viewers:
+                viewers.discard(subscription)
+                self._count -= 1
+                if not viewers:
+                    del self._subscribers[subscription.client_id]
+
+    def publish(self, client_id, event, data):
+        """Send one event to every viewer of `client_id` (no-op if none)."""
+        with self._lock:
+            viewers = tuple(self._subscribers.get(client_id, ()))
+        if not viewers:
+            return
+        message = format_sse(event, data, next(self._ids))
+        for subscription in viewers:
+            subscription.offer(message)
+        self.published += 1
+
+    def close(self):
+        """End every open stream (worker shutdown)."""
+        with self._lock:
+            viewers = [s for group in self._subscribers.values() for s in group]
+        for subscription in viewers:
+            subscription.offer(_CLOSE)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "subscribers": self._count,
+                "clients": len(self._subscribers),
+                "published": self.published,
+            }
+
+
+async def event_stream(bus, subscription, fingerprint, keepalive_seconds=15.0):
+    """
+    Async generator for StreamingResponse. `fingerprint` is an async
+    callable returning the journey's current ETag (or None); it runs once
+    per idle keep-alive tick to catch writes made by other workers.
+    """
+    try:
+        yield f"retry: {SSE_RETRY_MS}\n\n".encode("utf-8")
+        last_seen = await fingerprint()
+        delivered_at_check = subscription.delivered
+        while True:
+            message = await subscription.next(keepalive_seconds)
+            if message is _CLOSE:
+                return
+            if message is not None:
+                yield message
+                continue
+
+            current = await fingerprint()
+            if current != last_seen and subscription.delivered == delivered_at_check:
+                yield RESYNC_MESSAGE
+            last_seen = current
+            delivered_at_check = subscription.delivered
+            yield b": keep-alive\n\n"
+    finally:
+        bus.unsubscribe(subscription)
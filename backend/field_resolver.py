@@ -0,0 +1,206 @@
+"""
+PROJECT VECTOR — JaneApp Field Resolver
+Calgary Strength & Physio
+
+Maps treatment-note field labels (e.g. "Knee Extension (Passive)") to the
+exit criterion they measure in a given phase, entirely in memory. One
+resolver is built per phase when the protocol cache compiles a protocol;
+the webhook never issues a `description LIKE` scan.
+
+Resolution order (first hit wins):
+  1. Alias table: database/seeds/janeapp_aliases.json (or
+     $JANEAPP_ALIAS_PATH), {phase_id: {label: criterion_id}}.
+  2. Exact metric_name ("knee_extension").
+  3. Normalized tokens: the label's tokens joined with '_' equal a
+     metric_name ("Quad Lag" -> quad_lag).
+  4. Token subset: every metric_name token appears in the label
+     ("Pain Level (VAS)" -> pain_level); the most specific metric wins.
+  5. Description: the normalized label appears in the criterion's
+     normalized description (the old LIKE behaviour).
+
+The alias file can be edited in place: resolvers re-stat it at most every
+ALIAS_CHECK_SECONDS and drop their memo when it changed, so new aliases
+apply to running workers without a restart or a library reload.
+
+Per-label results are memoized, so repeat labels are a single dict lookup.
+Labels that resolve to nothing are counted in `resolver_stats` so the alias
+table can be tuned from real traffic.
+"""
+
+import json
+import os
+import re
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+
+ALIAS_PATH = Path(os.getenv("JANEAPP_ALIAS_PATH", "database/seeds/janeapp_aliases.json"))
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+# Labels come from an external system; bound per-phase memo and counter growth
+MEMO_MAX = 1024
+UNMATCHED_MAX = 1000
+
+# Minimum gap between two stat() calls on the alias file
+ALIAS_CHECK_SECONDS = 2.0
+
+_alias_lock = threading.Lock()
+_alias_cache = {"mtime": None, "aliases": {}, "version": 0, "checked": None}
+
+
+def tokenize(text):
+    return tuple(TOKEN_PATTERN.findall(str(text or "").lower()))
+
+
+def normalize(text):
+    return " ".join(tokenize(text))
+
+
+def load_aliases(path=ALIAS_PATH, max_age=ALIAS_CHECK_SECONDS):
+    """
+    (aliases, version) for the alias table. The file is re-stat'ed at most
+    every `max_age` seconds and re-read only when its mtime changes;
+    `version` moves on every re-read. A file that fails to parse (caught
+    mid-write) keeps the previous table and is retried on the next check.
+    """
+    now = time.monotonic()
+    with _alias_lock:
+        checked = _alias_cache["checked"]
+        if checked is not None and now - checked < max_age:
+            return _alias_cache["aliases"], _alias_cache["version"]
+        _alias_cache["checked"] = now
+        try:
+            mtime = path.stat().st_mtime
+        except OSError:
+            mtime = None
+        if mtime != _alias_cache["mtime"]:
+            aliases = {}
+            try:
+                if mtime is not None:
+                    with open(path, "r", encoding="utf-8") as f:
+                        raw = json.load(f)
+                    aliases = {
+                        phase_id: {normalize(label): criterion_id for label, criterion_id in labels.items()}
+                        for phase_id, labels in raw.get("phases", {}).items()
+                    }
+            except (OSError, ValueError):
+                return _alias_cache["aliases"], _alias_cache["version"]
+            _alias_cache["aliases"] = aliases
+            _alias_cache["mtime"] = mtime
+            _alias_cache["version"] += 1
+        return _alias_cache["aliases"], _alias_cache["version"]
+
+
+# --- Unmatched-label counters (per worker) ---
+
+class ResolverStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.resolved = Counter()
+        self.unmatched = Counter()
+
+    def record(self, phase_id, label, strategy):
+        with self._lock:
+            if strategy is None:
+                key = (phase_id, label)
+                if key in self.unmatched or len(self.unmatched) < UNMATCHED_MAX:
+                    self.unmatched[key] += 1
+            else:
+                self.resolved[strategy] += 1
+
+    def snapshot(self, top=50):
+        with self._lock:
+            return {
+                "resolved": dict(self.resolved),
+                "unmatched_total": sum(self.unmatched.values()),
+                "unmatched": [
+                    {"phase_id": phase_id, "label": label, "count": count}
+                    for (phase_id, label), count in self.unmatched.most_common(top)
+                ],
+            }
+
+
+resolver_stats = ResolverStats()
+
+
+# --- Per-phase Resolver ---
+
+class FieldResolver:
+    """In-memory label -> CompiledCriterion index for one phase."""
+
+    def __init__(self, phase_id, criteria, alias_source=load_aliases):
+        self.phase_id = phase_id
+        self._by_id = {crit.id: crit for crit in criteria}
+        self._alias_source = alias_source
+        self._alias_version = None
+        self._aliases = {}
+        self._by_metric = {}
+        for crit in criteria:
+            self._by_metric.setdefault(crit.metric_name, crit)
+        self._token_sets = [
+            (frozenset(tokenize(crit.metric_name.replace("_", " "))), crit) for crit in criteria
+        ]
+        self._descriptions = [(normalize(crit.description), crit) for crit in criteria]
+        self._memo = {}
+
+    def resolve(self, label):
+        """Return the matching criterion (or None) for a JaneApp field label."""
+        if label is None:
+            return None
+        label = str(label)
+        self._refresh_aliases()
+        hit = self._memo.get(label)
+        if hit is None:
+            hit = self._lookup(label)
+            if len(self._memo) < MEMO_MAX:
+                self._memo[label] = hit
+        criterion, strategy = hit
+        resolver_stats.record(self.phase_id, label, strategy)
+        return criterion
+
+    def _refresh_aliases(self):
+        aliases, version = self._alias_source()
+        if version == self._alias_version:
+            return
+        # Alias table edited: earlier answers may no longer hold
+        self._aliases = {
+            label: self._by_id[criterion_id]
+            for label, criterion_id in aliases.get(self.phase_id, {}).items()
+            if criterion_id in self._by_id
+        }
+        self._memo = {}
+        self._alias_version = version
+
+    def _lookup(self, label):
+        key = normalize(label)
+
+        criterion = self._aliases.get(key)
+        if criterion is not None:
+            return criterion, "alias"
+
+        criterion = self._by_metric.get(label)
+        if criterion is not None:
+            return criterion, "metric_name"
+
+        tokens = tokenize(label)
+        criterion = self._by_metric.get("_".join(tokens))
+        if criterion is not None:
+            return criterion, "normalized"
+
+        label_tokens = frozenset(tokens)
+        best = None
+        for metric_tokens, crit in self._token_sets:
+            if metric_tokens and metric_tokens <= label_tokens:
+                if best is None or len(metric_tokens) > len(best[0]):
+                    best = (metric_tokens, crit)
+        if best is not None:
+            return best[1], "tokens"
+
+        if key:
+            for description, crit in self._descriptions:
+                if key in description:
+                    return crit, "description"
+
+        return None, None
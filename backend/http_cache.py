@@ -0,0 +1,107 @@
+"""
+PROJECT VECTOR — HTTP Conditional Request Helpers
+Calgary Strength & Physio
+
+ETag / Last-Modified support for the read endpoints, so unchanged journeys
+and protocol documents are answered with 304 before any payload is built.
+
+  * Journey ETags are derived from the journey header row (which already
+    carries the library version and a latest_metric watermark), so a
+    revalidation costs one query and no assembly.
+  * Protocol Vault documents are served from a rendered-JSON cache keyed
+    by the file's mtime and size; the ETag comes from the same stat.
+
+ETags are weak (W/"...") because they describe the data, not the exact
+bytes on the wire (compression may differ).
+"""
+
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from email.utils import formatdate, parsedate_to_datetime
+
+from fastapi import Response
+
+# PHI must not sit in shared caches; clients revalidate with If-None-Match
+PRIVATE_REVALIDATE = "private, no-cache"
+
+
+def make_etag(*parts):
+    digest = hashlib.sha1(repr(parts).encode("utf-8")).hexdigest()
+    return f'W/"{digest}"'
+
+
+def etag_matches(if_none_match, etag):
+    """Weak comparison per RFC 9110 §13.1.2."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    bare = etag[2:] if etag.startswith("W/") else etag
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == bare:
+            return True
+    return False
+
+
+def not_modified_since(if_modified_since, mtime):
+    if not if_modified_since:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since).timestamp()
+    except (TypeError, ValueError):
+        return False
+    return int(mtime) <= int(since)
+
+
+def not_modified(etag, last_modified=None, cache_control=PRIVATE_REVALIDATE):
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if last_modified is not None:
+        headers["Last-Modified"] = last_modified
+    return Response(status_code=304, headers=headers)
+
+
+def http_date(timestamp):
+    return formatdate(timestamp, usegmt=True)
+
+
+# --- Rendered Protocol Documents ---
+
+class RenderedFileCache:
+    """LRU of pre-serialized JSON bodies for files, keyed by (mtime_ns, size)."""
+
+    def __init__(self, maxsize=64):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, path, render):
+        """
+        Return (body_bytes, etag, last_modified) for `path`, re-rendering with
+        `render(text)` only when the file's mtime or size changed.
+        """
+        stat = path.stat()
+        fingerprint = (stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == fingerprint:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+
+        body = json.dumps(render(path.read_text(encoding="utf-8"))).encode("utf-8")
+        rendered = (body, make_etag(key, *fingerprint), http_date(stat.st_mtime))
+
+        with self._lock:
+            self._entries[key] = (fingerprint, rendered)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return rendered
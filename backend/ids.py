@@ -0,0 +1,63 @@
+"""
+PROJECT VECTOR — Record Identifiers
+Calgary Strength & Physio
+
+Recording ids used to be `REC_{datetime.now().timestamp()}`, which two
+concurrent requests (or two gunicorn workers) can produce at the same
+microsecond. Ids are now ULIDs: a 48-bit millisecond timestamp followed by
+80 random bits, Crockford base32 encoded (26 characters).
+
+  * Unique across workers: each millisecond starts from fresh os.urandom
+    bits, and the generator state is reset in forked children.
+  * Monotonic within a worker: ids minted in the same millisecond
+    increment the random part, so ids sort in creation order.
+"""
+
+import os
+import threading
+import time
+
+_CROCKFORD = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+_RANDOM_BITS = 80
+_RANDOM_MASK = (1 << _RANDOM_BITS) - 1
+
+
+def encode_ulid(value):
+    """128-bit integer -> 26-character Crockford base32 string."""
+    return "".join(_CROCKFORD[(value >> shift) & 31] for shift in range(125, -1, -5))
+
+
+class UlidGenerator:
+    """Thread-safe, per-process monotonic ULID source."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self._last_ms = -1
+        self._last_random = 0
+
+    def __call__(self):
+        with self._lock:
+            now_ms = time.time_ns() // 1_000_000
+            if now_ms > self._last_ms:
+                self._last_ms = now_ms
+                self._last_random = int.from_bytes(os.urandom(_RANDOM_BITS // 8), "big")
+            else:
+                # Same millisecond (or the clock stepped back): stay ordered
+                self._last_random = (self._last_random + 1) & _RANDOM_MASK
+            value = (self._last_ms << _RANDOM_BITS) | self._last_random
+        return encode_ulid(value)
+
+
+new_ulid = UlidGenerator()
+
+if hasattr(os, "register_at_fork"):
+    # A gunicorn preload master must not hand its sequence to every worker
+    os.register_at_fork(after_in_child=new_ulid._reset)
+
+
+def new_record_id(prefix):
+    """'<prefix>_<ULID>', e.g. REC_01J9Z3Q8X4T6M2B7C5N0PKD1RS."""
+    return f"{prefix}_{new_ulid()}"
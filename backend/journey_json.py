@@ -0,0 +1,161 @@
+"""
+PROJECT VECTOR — Journey Payload Serialization
+Calgary Strength & Physio
+
+The TRAJECTORY payload is mostly static: phase names, descriptions,
+durations, criterion labels/targets and programming slots only change when
+the Living Library is reloaded. Those parts are encoded to JSON bytes once,
+when a protocol is compiled (see protocol_cache.load_protocol), and held on
+the CompiledPhase as PhaseFragments. A journey request then only encodes
+the dynamic values (phase status, each criterion's current value and met
+flag, the client block) and splices them between the cached fragments.
+
+The result is returned as raw bytes, bypassing FastAPI's jsonable_encoder
+and response-model validation.
+
+Field selection: name and status are always present; PHASE_FIELDS may be
+narrowed (`?fields=criteria` / `?compact=1`) for clients that only need
+status and criteria, which skips the programming and description bytes
+entirely.
+
+orjson is used when installed; the stdlib encoder produces equivalent JSON.
+"""
+
+import json
+from dataclasses import dataclass
+from typing import Tuple
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional accelerator
+    orjson = None
+
+# Phase-level fields that can be selected; name and status are always sent
+PHASE_FIELDS = ("description", "typicalDuration", "criteria", "programming")
+COMPACT_FIELDS = ("criteria",)
+
+_STATUS = {
+    status: f',"status":"{status}"'.encode()
+    for status in ("active", "completed", "locked")
+}
+_MET = {True: b',"met":true}', False: b',"met":false}'}
+
+
+def dumps(value):
+    """Encode `value` as compact UTF-8 JSON bytes."""
+    if orjson is not None:
+        return orjson.dumps(value)
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+@dataclass(frozen=True)
+class PhaseFragments:
+    """Pre-encoded static parts of one phase object."""
+    name: bytes                  # {"name":...
+    description: bytes           # ,"description":...
+    typical_duration: bytes      # ,"typicalDuration":...
+    criteria: Tuple[bytes, ...]  # {"id":..,"label":..,"target":..,"current":  (one per criterion)
+    programming: bytes           # ,"programming":[...]
+
+
+def build_phase_fragments(name, description, typical_duration, criteria, programming):
+    """Encode the static parts of a phase; `criteria`/`programming` are compiled tuples."""
+    return PhaseFragments(
+        name=b'{"name":' + dumps(name),
+        description=b',"description":' + dumps(description),
+        typical_duration=b',"typicalDuration":' + dumps(typical_duration),
+        criteria=tuple(
+            dumps({"id": crit.id, "label": crit.label, "target": crit.target})[:-1] + b',"current":'
+            for crit in criteria
+        ),
+        programming=b',"programming":' + dumps([
+            {
+                "type": slot.type,
+                "exercise": slot.exercise,
+                "hd": slot.hd,
+                "rationale": slot.rationale,
+                "intent": slot.intent,
+                "detail": slot.detail
+            }
+            for slot in programming
+        ]),
+    )
+
+
+def current_value(crit, value):
+    """A criterion's displayed current value ("0 degrees"), None if unrecorded."""
+    return f"{value} {crit.measurement_unit}" if value else None
+
+
+def parse_fields(fields, compact=False):
+    """
+    Phase fields selected by a `fields=` query value (comma separated) or
+    `compact`; explicit fields take precedence. Returns None for the full
+    payload. Raises ValueError on an unknown field name.
+    """
+    if fields is None:
+        return COMPACT_FIELDS if compact else None
+    selected = {name.strip() for name in fields.split(",") if name.strip()}
+    unknown = selected.difference(PHASE_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+    # Canonical order, so equivalent selections share an ETag
+    return tuple(name for name in PHASE_FIELDS if name in selected)
+
+
+def render_journey(protocol, journey, latest_values, fields=None):
+    """
+    Serialize the TRAJECTORY payload for a journey header row.
+
+    `latest_values` maps criterion_id -> latest recorded value; `fields`
+    comes from parse_fields (None = every phase field).
+    """
+    fields = PHASE_FIELDS if fields is None else fields
+    with_description = "description" in fields
+    with_duration = "typicalDuration" in fields
+    with_criteria = "criteria" in fields
+    with_programming = "programming" in fields
+
+    phases = []
+    current_phase_index = -1
+    for idx, ph in enumerate(protocol.phases):
+        if ph.id == journey["current_phase_id"]:
+            status = "active"
+            current_phase_index = idx
+        elif current_phase_index == -1:
+            status = "completed"
+        else:
+            status = "locked"
+
+        frag = ph.fragments
+        parts = [frag.name, _STATUS[status]]
+        if with_description:
+            parts.append(frag.description)
+        if with_duration:
+            parts.append(frag.typical_duration)
+        if with_criteria:
+            # Only the current value and met flag are encoded per request
+            items = []
+            for crit, prefix in zip(ph.criteria, frag.criteria):
+                value = latest_values.get(crit.id)
+                current = dumps(current_value(crit, value)) if value else b"null"
+                items.append(prefix + current + _MET[crit.is_met(value)])
+            parts.append(b',"criteria":[' + b",".join(items) + b"]")
+        if with_programming:
+            parts.append(frag.programming)
+        parts.append(b"}")
+        phases.append(b"".join(parts))
+
+    client = dumps({
+        "name": journey["display_name"],
+        "sport": journey["sport_activity"],
+        "terminalGoal": journey["terminal_goal"],
+        "pathology": journey["pathology_name"],
+        "protocolId": journey["pathology_id"],
+        "researchSource": journey["research_source"],
+        "researchDoi": journey["research_doi"],
+        "startDate": journey["started_at"],
+        "nextSession": "2026-02-14",
+        "currentPhaseIndex": current_phase_index
+    })
+    return b'{"client":' + client + b',"phases":[' + b",".join(phases) + b"]}"
@@ -1,34 +1,167 @@
-from fastapi import FastAPI, HTTPException, Request
-from fastapi.staticfiles import StaticFiles
+from fastapi import APIRouter, Depends, FastAPI, HTTPException, Query, Request, Response
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from starlette.concurrency import run_in_threadpool
 from pydantic import BaseModel
+import asyncio
 import sqlite3
 import json
+import itertools
 import hmac
 import hashlib
-import os
 import logging
+import os
+import time
+from contextlib import asynccontextmanager
 from pathlib import Path
-from datetime import datetime
-from typing import List, Optional
-
-app = FastAPI(title="VECTOR API", version="0.1.0")
+from datetime import date, datetime, timezone
+from typing import List, Literal, Optional
+
+from backend.analytics import CohortAnalytics, read_watermark
+from backend.audit import AUDIT_LOGGER_NAME, setup_audit_logging, stop_audit_logging
+from backend.criteria import evaluate_criteria
+from backend.db import ConnectionPool, PoolExhausted
+from backend.events import JourneyEventBus, event_stream
+from backend.field_resolver import resolver_stats
+from backend.http_cache import (
+    PRIVATE_REVALIDATE, RenderedFileCache, etag_matches, make_etag,
+    not_modified, not_modified_since
+)
+from backend.ids import new_record_id
+from backend.journey_json import dumps, parse_fields, render_journey
+from backend.profiling import (
+    ProfilingMiddleware, profile_connection, profiling_enabled, request_metrics, span
+)
+from backend.progression import ProgressionEngine
+from backend.protocol_cache import ProtocolCache
+from backend.search import SEARCH_KINDS, match_expression, search
+from backend.series import bucketed_series, lttb, raw_series
+from backend.sync import bundle_version, current_seq, journey_delta, render_snapshot, reset_delta
+from backend.static_assets import StaticAssets
+from backend.webhook_queue import WebhookQueue
+from backend.write_buffer import WriteBuffer
+
+# Importing this module has no side effects beyond building objects: files,
+# threads and connections are opened per worker in lifespan(), and the
+# shareable warm-up lives in preload() (run once before fork under
+# gunicorn `preload_app`, see gunicorn.conf.py).
+
+DB_PATH = Path(os.getenv("VECTOR_DB_PATH", "database/data/vector.db"))
+JANEAPP_SECRET = os.getenv("JANEAPP_WEBHOOK_SECRET", "dev_secret_unsecure")
 
 # SECURITY: Audit logging (local only, never sent to external server)
-AUDIT_LOG_DIR = Path("database/logs")
-AUDIT_LOG_DIR.mkdir(parents=True, exist_ok=True)
-AUDIT_LOG_PATH = AUDIT_LOG_DIR / "audit.log"
-
-logging.basicConfig(
-    filename=str(AUDIT_LOG_PATH),
-    level=logging.INFO,
-    format='%(asctime)s | %(levelname)s | %(message)s',
-    datefmt='%Y-%m-%d %H:%M:%S'
+# PERF: Records are queued and written as batched JSON lines by a listener
+# thread, started per worker in lifespan()
+audit_logger = logging.getLogger(AUDIT_LOGGER_NAME)
+# Operational warnings (start-up, background writes) stay out of the audit trail
+logger = logging.getLogger(__name__)
+
+# PERF: Pooled, pre-configured connections shared by every request in this worker
+# (one reader per threadpool thread: Starlette runs sync endpoints on 40 by default)
+db_pool = ConnectionPool(DB_PATH, max_readers=int(os.getenv("DB_MAX_READERS", "40")))
+DB_POOL_RETRY_AFTER_SECONDS = 1
+
+# PERF: Single writer thread group-committing recordings and webhook enqueues
+write_buffer = WriteBuffer(
+    db_pool,
+    linger=float(os.getenv("WRITE_BUFFER_LINGER_MS", "2")) / 1000,
+    max_batch=int(os.getenv("WRITE_BUFFER_MAX_BATCH", "500")),
+    high_water=int(os.getenv("WRITE_BUFFER_HIGH_WATER", "20000"))
 )
-audit_logger = logging.getLogger("vector_audit")
+WRITE_BUFFER_RETRY_AFTER_SECONDS = 1
+# Longest a read waits for the same client's buffered writes to commit
+WRITE_BUFFER_READ_WAIT_SECONDS = 1.0
+
+# PERF: Durable JaneApp inbox, drained off the request path by background threads
+webhook_queue = WebhookQueue(
+    db_pool,
+    write_buffer=write_buffer,
+    workers=int(os.getenv("WEBHOOK_WORKERS", "2")),
+    high_water=int(os.getenv("WEBHOOK_QUEUE_HIGH_WATER", "10000"))
+)
+WEBHOOK_RETRY_AFTER_SECONDS = 30
+
+# PERF: Fingerprinted, precompressed frontend assets held in memory
+# (VECTOR_STATIC_RELOAD=1 picks up edits under frontend/ without a restart; dev only)
+frontend_assets = StaticAssets("frontend", html=True, reload=os.getenv("VECTOR_STATIC_RELOAD") == "1")
+
+# PERF: Compiled protocol trees shared by every request in this worker
+protocol_cache = ProtocolCache(maxsize=128)
+
+# PERF: Cohort analytics, refreshed incrementally past a rowid watermark
+cohort_analytics = CohortAnalytics(protocol_cache)
+
+# Live deltas for /api/client/{id}/events viewers in this worker
+journey_events = JourneyEventBus(max_subscribers=int(os.getenv("SSE_MAX_SUBSCRIBERS", "500")))
+SSE_KEEPALIVE_SECONDS = 15.0
+
+def publish_after_commit(client_id, event, data):
+    """Announce a journey delta once the surrounding write transaction commits."""
+    db_pool.after_commit(lambda: journey_events.publish(client_id, event, data))
+
+# Data-gated phase advancement, evaluated incrementally after each metric write
+progression = ProgressionEngine(protocol_cache, on_event=publish_after_commit)
+
+# PERF: Serialized Protocol Vault documents, revalidated against file mtime
+protocol_documents = RenderedFileCache(maxsize=64)
+
+# PERF: Compress API responses above API_GZIP_MIN_BYTES (static assets arrive
+# precompressed and SSE streams are excluded by the middleware)
+API_GZIP_MIN_BYTES = int(os.getenv("API_GZIP_MIN_BYTES", "1024"))
+
+router = APIRouter()
+
+# --- Start-up & Shutdown ---
+
+_preloaded = False
+_ready = False
+
+def preload():
+    """
+    Start-up work every worker can share: compile the Living Library into
+    the protocol cache (one bulk read) and build the frontend assets.
+
+    Fork-safe: it starts no threads and its SQLite connection is closed
+    before returning, so gunicorn can run it in the master (preload_app)
+    and each worker inherits the result copy-on-write. Idempotent.
+    """
+    global _preloaded
+    if _preloaded:
+        return
+    frontend_assets.build()
+    try:
+        conn = sqlite3.connect(f"file:{DB_PATH}?mode=ro", uri=True)
+        conn.row_factory = sqlite3.Row
+        try:
+            protocol_cache.warm(conn.cursor())
+        finally:
+            conn.close()
+    except sqlite3.Error as e:
+        # Not fatal: protocols then compile on first use; /api/_ready reports the DB
+        logger.warning(f"PRELOAD: failed, protocols compile on first use: {e}")
+    _preloaded = True
+
+@asynccontextmanager
+async def lifespan(app):
+    """Per-worker resources: audit listener, warm-up (unless preloaded), write buffer, webhook drainers."""
+    global _ready
+    setup_audit_logging()
+    await run_in_threadpool(preload)
+    write_buffer.start()
+    webhook_queue.start(apply_janeapp_event)
+    _ready = True
+    try:
+        yield
+    finally:
+        _ready = False
+        journey_events.close()
+        webhook_queue.stop()
+        write_buffer.stop()
+        db_pool.close()
+        stop_audit_logging()
 
 # SECURITY: Middleware to log all client data access
-@app.middleware("http")
 async def audit_middleware(request: Request, call_next):
     """Log all API requests for security audit trail."""
     client_ip = request.client.host if request.client else "unknown"
@@ -36,23 +169,21 @@ async def audit_middleware(request: Request, call_next):
     method = request.method
     
     # Log access to client data endpoints
-    if "/api/client/" in path or "/api/metric/" in path:
-        audit_logger.info(f"ACCESS | IP: {client_ip} | {method} {path}")
+    if ("/api/client/" in path or "/api/metric/" in path or "/api/caseload/" in path
+            or "/api/analytics/" in path):
+        audit_logger.info("ACCESS", extra={"audit": {"ip": client_ip, "method": method, "path": path}})
     
     response = await call_next(request)
     return response
 
-# Enable CORS for local development (localhost only in production)
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["http://localhost:8000", "http://127.0.0.1:8000"],  # SECURITY: Restrict origins
-    allow_credentials=True,
-    allow_methods=["GET", "POST"],  # SECURITY: Only needed methods
-    allow_headers=["*"],
-)
-
-DB_PATH = Path("database/data/vector.db")
-JANEAPP_SECRET = os.getenv("JANEAPP_WEBHOOK_SECRET", "dev_secret_unsecure")
+async def pool_exhausted_handler(request: Request, exc: PoolExhausted):
+    """Every pooled reader is busy: ask the client to retry rather than answer 500."""
+    logger.warning(f"DB POOL: {exc}")
+    return JSONResponse(
+        status_code=503,
+        content={"status": "busy", "reason": "All database readers are busy"},
+        headers={"Retry-After": str(DB_POOL_RETRY_AFTER_SECONDS)}
+    )
 
 # --- Pydantic Models ---
 
@@ -63,46 +194,173 @@ class MetricRecord(BaseModel):
     unit: Optional[str] = ""
     recorded_at: Optional[str] = None # ISO format, defaults to now
 
+class MetricRecordBatch(BaseModel):
+    records: List[MetricRecord]
+
 # --- Database Helpers ---
 
 def get_db_connection():
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
-    return conn
+    """Dependency: pooled read-only connection, returned to the pool after the request."""
+    with db_pool.reader() as conn:
+        yield profile_connection(conn)
 
-def check_criteria_met(operator, target_val, current_val):
-    if current_val is None:
-        return False
-    
-    try:
-        # Simple numeric comparison if applicable
-        t_num = float(target_val)
-        c_num = float(current_val)
-        if operator == "=": return c_num == t_num
-        if operator == ">": return c_num > t_num
-        if operator == ">=": return c_num >= t_num
-        if operator == "<": return c_num < t_num
-        if operator == "<=": return c_num <= t_num
-    except ValueError:
-        # String comparison fallback
-        if operator == "=": return str(current_val).lower() == str(target_val).lower()
-        if target_val.lower() == "pass" and str(current_val).lower() == "pass": return True
-        
-    return False
+async def group_commit(work, keys=()):
+    """
+    Run `work(cursor)` in the write buffer's next group transaction and wait
+    until it has committed. Exceptions raised by `work` (HTTPException
+    included) roll back that unit only and are re-raised here.
+    """
+    return await asyncio.wrap_future(write_buffer.submit(work, keys))
 
 # --- API Endpoints ---
 
-@app.get("/api/client/{client_id}/journey")
-def get_client_journey(client_id: str):
-    conn = get_db_connection()
+@router.get("/api/client/{client_id}/journey")
+def get_client_journey(
+    client_id: str,
+    request: Request,
+    fields: Optional[str] = Query(None, description="Phase fields to include, comma separated (description, typicalDuration, criteria, programming)"),
+    compact: bool = Query(False, description="Shorthand for fields=criteria"),
+    conn: sqlite3.Connection = Depends(get_db_connection)
+):
+    started = time.perf_counter()
+    try:
+        selected = parse_fields(fields, compact)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    # Read-your-writes: let this client's buffered recordings commit first
+    write_buffer.wait_for(client_id, WRITE_BUFFER_READ_WAIT_SECONDS)
+
+    statements = []
+    # PERF: Count every statement sqlite executes for this assembly so the
+    # fixed query budget is visible to whoever is looking at the response.
+    conn.set_trace_callback(statements.append)
+    try:
+        cursor = conn.cursor()
+        with span("header"):
+            journey = fetch_journey_header(cursor, client_id)
+
+        # PERF: The header row covers everything the payload depends on, so an
+        # unchanged journey is answered with 304 before any assembly work.
+        # Trimmed representations get their own validator
+        etag = make_etag(tuple(journey)) if selected is None else make_etag(tuple(journey), selected)
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            revalidated = not_modified(etag)
+            revalidated.headers["X-DB-Queries"] = str(len(statements))
+            return revalidated
+
+        with span("assembly"):
+            body = assemble_journey(cursor, journey, selected)
+    finally:
+        conn.set_trace_callback(None)
+
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    # PERF: Pre-serialized bytes; skips jsonable_encoder and re-encoding
+    return Response(content=body, media_type="application/json", headers={
+        "ETag": etag,
+        "Cache-Control": PRIVATE_REVALIDATE,
+        "X-DB-Queries": str(len(statements)),
+        "X-Assembly-Time-Ms": f"{elapsed_ms:.2f}",
+    })
+
+@router.get("/api/client/{client_id}/events")
+async def stream_client_events(client_id: str):
+    """
+    Server-Sent Events stream of criterion and phase deltas for one client.
+    Viewers load the journey once, then patch it from this stream.
+    """
+    # 404 before subscribing, like the journey endpoint
+    await run_in_threadpool(journey_fingerprint, client_id)
+
+    subscription = journey_events.subscribe(client_id)
+    if subscription is None:
+        return JSONResponse(
+            status_code=503,
+            content={"status": "busy", "reason": "Too many live viewers"},
+            headers={"Retry-After": str(int(SSE_KEEPALIVE_SECONDS))}
+        )
+
+    async def fingerprint():
+        try:
+            return await run_in_threadpool(journey_fingerprint, client_id)
+        except HTTPException:
+            return None
+
+    return StreamingResponse(
+        event_stream(journey_events, subscription, fingerprint, SSE_KEEPALIVE_SECONDS),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.get("/api/client/{client_id}/snapshot")
+def get_client_snapshot(client_id: str, request: Request, conn: sqlite3.Connection = Depends(get_db_connection)):
+    """
+    Offline bundle: the full journey payload plus the sync cursor it is
+    current to. Stored by the frontend and kept fresh with /sync deltas.
+    """
+    write_buffer.wait_for(client_id, WRITE_BUFFER_READ_WAIT_SECONDS)
     cursor = conn.cursor()
-
-    # 1. Fetch Active Journey Details
+    # Cursor before journey: a write landing in between is re-sent by the next delta
+    seq = current_seq(cursor)
+    journey = fetch_journey_header(cursor, client_id)
+
+    etag = make_etag(tuple(journey), "snapshot")
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return not_modified(etag)
+
+    body = render_snapshot(seq, journey, assemble_journey(cursor, journey))
+    return Response(content=body, media_type="application/json", headers={
+        "ETag": etag,
+        "Cache-Control": PRIVATE_REVALIDATE,
+    })
+
+@router.get("/api/client/{client_id}/sync")
+def get_client_sync(
+    client_id: str,
+    since: int = Query(..., ge=0, description="seq of the stored snapshot or last applied delta"),
+    protocol_version: str = Query(..., alias="protocolVersion", description="protocolVersion of the stored snapshot"),
+    conn: sqlite3.Connection = Depends(get_db_connection)
+):
+    """Recordings and phase changes since `since`, or a reset if the snapshot is stale."""
+    write_buffer.wait_for(client_id, WRITE_BUFFER_READ_WAIT_SECONDS)
+    cursor = conn.cursor()
+    seq = current_seq(cursor)
+    journey = fetch_journey_header(cursor, client_id)
+
+    if since > seq or protocol_version != bundle_version(journey):
+        delta = reset_delta(seq)
+    else:
+        protocol = protocol_cache.get(
+            cursor,
+            journey["pathology_id"],
+            journey["version"],
+            journey["library_version"]
+        )
+        delta = journey_delta(cursor, protocol, journey, since, seq)
+    return Response(content=dumps(delta), media_type="application/json", headers={
+        "Cache-Control": PRIVATE_REVALIDATE,
+    })
+
+def journey_fingerprint(client_id):
+    """The journey's ETag, used by live streams to notice writes from other workers."""
+    with db_pool.reader() as conn:
+        return make_etag(tuple(fetch_journey_header(conn.cursor(), client_id)))
+
+def fetch_journey_header(cursor, client_id):
+    """
+    Active journey header with the pathology citation, the library version
+    counter and a latest_metric watermark folded in. Raises 404 if none.
+    """
     journey = cursor.execute("""
         SELECT 
-            j.id as journey_id, j.current_phase_id, j.started_at,
+            j.id as journey_id, j.current_phase_id, j.started_at, j.updated_at,
             c.display_name, c.sport_activity, c.terminal_goal,
-            p.id as pathology_id, p.name as pathology_name
+            p.id as pathology_id, p.name as pathology_name,
+            p.research_source, p.research_doi, p.version,
+            (SELECT counter FROM library_version WHERE id = 1) as library_version,
+            (
+                SELECT COUNT(*) || ':' || COALESCE(MAX(recorded_at), '') || ':' || COALESCE(group_concat(recording_id), '')
+                FROM latest_metric WHERE journey_id = j.id
+            ) as recordings_watermark
         FROM client_journeys j
         JOIN clients c ON j.client_id = c.id
         JOIN pathologies p ON j.pathology_id = p.id
@@ -110,109 +368,256 @@ def get_client_journey(client_id: str):
     """, (client_id,)).fetchone()
 
     if not journey:
-        conn.close()
         raise HTTPException(status_code=404, detail="Active journey not found")
+    return journey
 
-    # 2. Fetch All Phases for this Pathology
-    phases_rows = cursor.execute("""
-        SELECT * FROM phases WHERE pathology_id = ? ORDER BY order_index ASC
-    """, (journey["pathology_id"],)).fetchall()
+def assemble_journey(cursor, journey, fields=None):
+    """
+    Serialize the TRAJECTORY payload for a journey header row.
 
-    phases_data = []
-    current_phase_index = -1
+    The protocol tree comes from the in-process protocol cache, so a warm
+    request runs one more query after the header: a latest_metric read for
+    the current value of every criterion. Static phase content is spliced in
+    from JSON fragments encoded when the protocol was compiled.
+    """
+    # 1. Compiled protocol tree (cached per pathology version)
+    protocol = protocol_cache.get(
+        cursor,
+        journey["pathology_id"],
+        journey["version"],
+        journey["library_version"]
+    )
+
+    # 2. Latest recording per criterion (trigger-maintained latest_metric)
+    latest_values = {
+        row["criterion_id"]: row["recorded_value"]
+        for row in cursor.execute("""
+            SELECT criterion_id, recorded_value FROM latest_metric WHERE journey_id = ?
+        """, (journey["journey_id"],))
+    }
 
-    for idx, ph in enumerate(phases_rows):
-        phase_id = ph["id"]
-        
-        # Determine Status
-        if ph["id"] == journey["current_phase_id"]:
-            status = "active"
-            current_phase_index = idx
-        elif current_phase_index == -1: 
-            status = "completed"
-        else:
-            status = "locked"
-
-        # Fetch Exit Criteria
-        criteria_rows = cursor.execute("""
-            SELECT * FROM exit_criteria WHERE phase_id = ?
-        """, (phase_id,)).fetchall()
-
-        criteria_list = []
-        for crit in criteria_rows:
-            # Fetch latest metric
-            rec = cursor.execute("""
-                SELECT recorded_value 
-                FROM metric_recordings 
-                WHERE journey_id = ? AND criterion_id = ? 
-                ORDER BY recorded_at DESC LIMIT 1
-            """, (journey["journey_id"], crit["id"])).fetchone()
-            
-            current_val = rec["recorded_value"] if rec else None
-            is_met = check_criteria_met(
-                crit["target_operator"], 
-                crit["target_value"], 
-                current_val
-            )
-
-            criteria_list.append({
-                "label": f"{crit['metric_name']} {crit['target_operator']} {crit['target_value']} {crit['measurement_unit']}",
-                "target": f"{crit['target_operator']} {crit['target_value']}",
-                "current": f"{current_val} {crit['measurement_unit']}" if current_val else None,
-                "met": is_met
-            })
-
-        # Fetch Programming
-        prog_rows = cursor.execute("""
-            SELECT * FROM programming_slots WHERE phase_id = ? ORDER BY order_index ASC
-        """, (phase_id,)).fetchall()
-        
-        prog_list = []
-        for prog in prog_rows:
-            prog_list.append({
-                "type": prog["slot_type"],
-                "exercise": prog["standard_exercise"],
-                "hd": prog["high_density_option"],
-                "rationale": prog["high_density_rationale"], 
-                "intent": prog["intent_description"],
-                "detail": prog["sets_reps_guidance"] or "See clinician notes"
-            })
-
-        phases_data.append({
-            "name": ph["name"],
-            "status": status,
-            "description": ph["description"],
-            "typicalDuration": ph["typical_duration"],
-            "criteria": criteria_list,
-            "programming": prog_list
-        })
-        
-    # Get extra pathology details
-    pathology_details = cursor.execute("SELECT research_source, research_doi FROM pathologies WHERE id = ?", (journey["pathology_id"],)).fetchone()
-    
-    conn.close()
+    # 3. Only status and criterion values are encoded per request
+    return render_journey(protocol, journey, latest_values, fields)
+
+@router.get("/api/analytics/pathology/{pathology_id}")
+def get_pathology_analytics(pathology_id: str, request: Request, conn: sqlite3.Connection = Depends(get_db_connection)):
+    """
+    Cohort outcomes for one pathology: phase duration distributions,
+    time-to-met percentiles per exit criterion, and stalled active journeys.
+    """
+    cursor = conn.cursor()
+    pathology = cursor.execute("""
+        SELECT id, version, (SELECT counter FROM library_version WHERE id = 1) as library_version
+        FROM pathologies WHERE id = ?
+    """, (pathology_id,)).fetchone()
+    if pathology is None:
+        raise HTTPException(status_code=404, detail="Pathology not found")
+
+    # PERF: Unchanged tables (and the same day, which stall ages depend on)
+    # revalidate without touching the summary cache
+    watermark = read_watermark(cursor)
+    etag = make_etag("analytics", tuple(pathology), watermark, date.today().isoformat())
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return not_modified(etag)
+
+    report, refreshed = cohort_analytics.report(cursor, pathology, watermark)
+    return Response(content=dumps(report), media_type="application/json", headers={
+        "ETag": etag,
+        "Cache-Control": PRIVATE_REVALIDATE,
+        "X-Journeys-Refreshed": str(refreshed),
+    })
+
+# Upper bound on hits returned per /api/search request
+SEARCH_LIMIT_MAX = 100
+
+@router.get("/api/search")
+def search_library(
+    q: str = Query(..., description="Free-text query; the last word is matched as a prefix"),
+    kind: Optional[Literal[SEARCH_KINDS]] = Query(None, description="Restrict hits to one kind"),
+    limit: int = Query(20, ge=1, le=SEARCH_LIMIT_MAX),
+    conn: sqlite3.Connection = Depends(get_db_connection)
+):
+    """
+    Ranked full-text search over the Living Library: pathologies, phases,
+    programming slots (every exercise option) and Protocol Vault sections.
+    """
+    if match_expression(q) is None:
+        raise HTTPException(status_code=400, detail="Query must contain at least one word")
+    results = search(conn.cursor(), q, kind, limit)
+    return Response(content=dumps({"query": q, "results": results}), media_type="application/json")
+
+# Upper bound on journeys returned per /api/caseload/readiness page
+CASELOAD_PAGE_MAX = 1000
+
+# Upper bound on the LTTB target of /api/client/{id}/metrics/{metric}/series
+SERIES_POINTS_MAX = 5000
+
+@router.get("/api/client/{client_id}/metrics/{metric_name}/series")
+def get_metric_series(
+    client_id: str,
+    metric_name: str,
+    start: Optional[str] = Query(None, description="First day included (YYYY-MM-DD)"),
+    end: Optional[str] = Query(None, description="Last day included (YYYY-MM-DD)"),
+    bucket: Optional[Literal["day", "week"]] = Query(None, description="Aggregate to min/max/last per day or week"),
+    points: Optional[int] = Query(None, ge=3, le=SERIES_POINTS_MAX, description="Downsample to at most N points (LTTB)"),
+    conn: sqlite3.Connection = Depends(get_db_connection)
+):
+    """
+    History of one numeric metric for the client's active journey, for
+    trend charts. Filtering and bucketing run in SQL over metric_series;
+    only the (optional) LTTB pass runs in Python.
+    """
+    for value in (start, end):
+        if value is not None:
+            try:
+                date.fromisoformat(value)
+            except ValueError:
+                raise HTTPException(status_code=400, detail=f"Invalid date '{value}', expected YYYY-MM-DD")
+
+    cursor = conn.cursor()
+    journey = cursor.execute("""
+        SELECT id FROM client_journeys WHERE client_id = ? AND status = 'active'
+    """, (client_id,)).fetchone()
+    if not journey:
+        raise HTTPException(status_code=404, detail="Active journey not found")
+
+    if bucket:
+        rows = bucketed_series(cursor, journey["id"], metric_name, bucket, start, end)
+        # Downsample on the last value of each bucket
+        sampled = lttb(rows, points, y=lambda row: row[4]) if points else rows
+        series = [
+            {"t": row[1], "min": row[2], "max": row[3], "last": row[4], "count": row[5]}
+            for row in sampled
+        ]
+    else:
+        rows = raw_series(cursor, journey["id"], metric_name, start, end)
+        sampled = lttb(rows, points, y=lambda row: row[2]) if points else rows
+        series = [{"t": row[1], "value": row[2]} for row in sampled]
 
     return {
-        "client": {
-            "name": journey["display_name"],
-            "sport": journey["sport_activity"],
-            "terminalGoal": journey["terminal_goal"],
-            "pathology": journey["pathology_name"],
-            "protocolId": journey["pathology_id"],
-            "researchSource": pathology_details["research_source"],
-            "researchDoi": pathology_details["research_doi"],
-            "startDate": journey["started_at"],
-            "nextSession": "2026-02-14", 
-            "currentPhaseIndex": current_phase_index
-        },
-        "phases": phases_data
+        "clientId": client_id,
+        "metric": metric_name,
+        "bucket": bucket,
+        "total": len(rows),
+        "downsampled": len(sampled) < len(rows),
+        "points": series
     }
 
-@app.post("/api/metric/record")
-def record_metric(record: MetricRecord):
-    conn = get_db_connection()
-    cursor = conn.cursor()
+# Upper bound on records accepted per /api/metric/record/batch request
+METRIC_BATCH_MAX = 5000
+
+@router.get("/api/caseload/readiness")
+def get_caseload_readiness(
+    after: Optional[str] = Query(None, description="Journey id cursor from the previous page's nextCursor"),
+    limit: int = Query(200, ge=1, le=CASELOAD_PAGE_MAX),
+):
+    """
+    Met/unmet exit-criteria counts for every active journey's current phase.
+
+    Keyset-paged on client_journeys.id and streamed as it is serialized, so
+    the whole caseload never has to be materialized in one response body.
+    The page is fetched up front: the pooled reader and its read transaction
+    are released before the first byte is sent, not held while a slow
+    client drains the stream.
+    """
+    with db_pool.reader() as conn:
+        cursor = conn.cursor()
+        rows = caseload_readiness_rows(cursor, after, limit).fetchall()
+        predicates = caseload_predicates(cursor, rows)
+    return StreamingResponse(
+        stream_caseload_readiness(rows, predicates, limit),
+        media_type="application/json",
+    )
+
+def caseload_predicates(cursor, rows):
+    """criterion_id -> compiled is_met for every pathology on a caseload page (protocol cache)."""
+    predicates = {}
+    versions = {(r["pathology_id"], r["pathology_version"], r["library_version"]) for r in rows}
+    for pathology_id, version, library_version in versions:
+        protocol = protocol_cache.get(cursor, pathology_id, version, library_version)
+        for phase in protocol.phases:
+            for crit in phase.criteria:
+                predicates[crit.id] = crit.is_met
+    return predicates
+
+def stream_caseload_readiness(rows, predicates, limit):
+    """Serialize a fetched caseload page one journey at a time."""
+    # PERF: One evaluation for the whole page, a column of values per criterion
+    met_by_journey = evaluate_criteria(predicates, (
+        (r["journey_id"], r["criterion_id"], r["recorded_value"])
+        for r in rows if r["criterion_id"] is not None
+    ))
+
+    yield '{"journeys": ['
+    last_id = None
+    count = 0
+    for journey_id, journey_rows in itertools.groupby(rows, key=lambda r: r["journey_id"]):
+        journey_rows = list(journey_rows)
+        head = journey_rows[0]
+        met_by_criterion = met_by_journey.get(journey_id, {})
+        unmet = [
+            r["metric_name"] for r in journey_rows
+            if r["criterion_id"] is not None and not met_by_criterion[r["criterion_id"]]
+        ]
+        total = len(met_by_criterion)
+
+        yield ("," if count else "") + json.dumps({
+            "journeyId": journey_id,
+            "clientId": head["client_id"],
+            "clientName": head["display_name"],
+            "pathologyId": head["pathology_id"],
+            "phaseId": head["current_phase_id"],
+            "phaseName": head["phase_name"],
+            "met": total - len(unmet),
+            "total": total,
+            "ready": total > 0 and not unmet,
+            "unmet": unmet
+        })
+        last_id = journey_id
+        count += 1
 
+    next_cursor = last_id if count == limit else None
+    yield f'], "count": {count}, "nextCursor": {json.dumps(next_cursor)}}}'
+
+def caseload_readiness_rows(cursor, after, limit):
+    """
+    One set-based pass for a page of active journeys: every current-phase
+    criterion joined to its latest recording, ordered by journey id.
+
+    Each criterion's latest value is a primary-key probe into latest_metric
+    rather than a correlated subquery over metric_recordings.
+    """
+    return cursor.execute("""
+        WITH page AS (
+            SELECT id, client_id, pathology_id, current_phase_id
+            FROM client_journeys
+            WHERE status = 'active' AND (? IS NULL OR id > ?)
+            ORDER BY id
+            LIMIT ?
+        )
+        SELECT
+            page.id AS journey_id, page.client_id, page.pathology_id, page.current_phase_id,
+            p.version AS pathology_version,
+            (SELECT counter FROM library_version WHERE id = 1) AS library_version,
+            c.display_name, ph.name AS phase_name,
+            ec.id AS criterion_id, ec.metric_name,
+            l.recorded_value
+        FROM page
+        JOIN clients c ON c.id = page.client_id
+        JOIN pathologies p ON p.id = page.pathology_id
+        LEFT JOIN phases ph ON ph.id = page.current_phase_id
+        LEFT JOIN exit_criteria ec ON ec.phase_id = page.current_phase_id
+        LEFT JOIN latest_metric l ON l.journey_id = page.id AND l.criterion_id = ec.id
+        ORDER BY page.id, ec.rowid
+    """, (after, after, limit))
+
+@router.post("/api/metric/record")
+async def record_metric(record: MetricRecord):
+    # PERF: Committed by the shared group-commit writer; concurrent recordings share a transaction
+    return await group_commit(lambda cursor: record_one(cursor, record), keys=(record.client_id,))
+
+def record_one(cursor, record):
+    """Insert one recording for the client's active journey inside a write-buffer unit."""
     # 1. Get active journey
     journey = cursor.execute("""
         SELECT id, current_phase_id FROM client_journeys 
@@ -220,7 +625,6 @@ def record_metric(record: MetricRecord):
     """, (record.client_id,)).fetchone()
 
     if not journey:
-        conn.close()
         raise HTTPException(status_code=404, detail="No active journey found for this client")
 
     # 2. Find matching criterion in current phase
@@ -231,12 +635,11 @@ def record_metric(record: MetricRecord):
     """, (journey["current_phase_id"], record.metric_name)).fetchone()
 
     if not criterion:
-        conn.close()
         raise HTTPException(status_code=400, detail=f"Metric '{record.metric_name}' is not an exit criterion for current phase")
 
     # 3. Insert recording
     recorded_at = record.recorded_at or datetime.now().isoformat()
-    recording_id = f"REC_{datetime.now().timestamp()}"
+    recording_id = new_record_id("REC")
     
     cursor.execute("""
         INSERT INTO metric_recordings 
@@ -253,13 +656,152 @@ def record_metric(record: MetricRecord):
         recorded_at
     ))
 
-    conn.commit()
-    conn.close()
+    # 4. Advance the phase if this recording met its last open criterion
+    advanced = progression.apply(cursor, [(journey["id"], criterion["id"])])
+
+    return {"status": "success", "recording_id": recording_id, "advanced": advanced}
+
+@router.post("/api/metric/record/batch")
+async def record_metric_batch(batch: MetricRecordBatch):
+    """
+    Record a full assessment in one request and one transaction.
+
+    Items that cannot be matched to an active journey / current-phase
+    criterion are reported individually and do not block the rest.
+    """
+    if len(batch.records) > METRIC_BATCH_MAX:
+        raise HTTPException(status_code=413, detail=f"Batch exceeds {METRIC_BATCH_MAX} records")
+
+    results, advanced = await group_commit(
+        lambda cursor: insert_metric_records(cursor, batch.records),
+        keys={r.client_id for r in batch.records}
+    )
+    recorded = sum(1 for r in results if r["status"] == "success")
+    return {"status": "success", "recorded": recorded, "failed": len(results) - recorded, "results": results, "advanced": advanced}
+
+@router.post("/api/metric/stream", status_code=202)
+async def stream_metrics(batch: MetricRecordBatch):
+    """
+    Write-behind ingestion for high-frequency sources (VBT, sensors).
+
+    Readings are validated against a read connection, given ids and queued;
+    they commit with the next group flush, a few milliseconds later, and the
+    response does not wait for it. The client's next journey, snapshot or
+    sync read on this worker waits for them (read-your-writes).
+    """
+    if len(batch.records) > METRIC_BATCH_MAX:
+        raise HTTPException(status_code=413, detail=f"Batch exceeds {METRIC_BATCH_MAX} records")
+    if write_buffer.saturated():
+        return JSONResponse(
+            status_code=503,
+            content={"status": "busy", "reason": "Write buffer is full"},
+            headers={"Retry-After": str(WRITE_BUFFER_RETRY_AFTER_SECONDS)}
+        )
+
+    def resolve():
+        with db_pool.reader() as conn:
+            return resolve_metric_records(conn.cursor(), batch.records)
+
+    rows, results = await run_in_threadpool(resolve)
+    if rows:
+        future = write_buffer.submit(
+            lambda cursor: insert_recording_rows(cursor, rows),
+            keys={r.client_id for r in batch.records}
+        )
+        future.add_done_callback(log_write_behind_failure)
+
+    return {"status": "accepted", "accepted": len(rows), "rejected": len(results) - len(rows), "results": results}
+
+@router.get("/api/metric/stream/stats")
+def metric_stream_stats():
+    """Group-commit counters for this worker's write buffer."""
+    return write_buffer.stats()
+
+def log_write_behind_failure(future):
+    """Write-behind units have no caller waiting; their failures are logged here."""
+    error = future.exception()
+    if error is not None:
+        logger.warning(f"WRITE BUFFER: write-behind unit failed: {error}")
+
+def insert_metric_records(cursor, records):
+    """
+    Resolve and insert `records` inside the caller's transaction.
+    Returns (results, advanced): one result dict per input record, in order,
+    and the phase transitions made.
+    """
+    rows, results = resolve_metric_records(cursor, records)
+    advanced = insert_recording_rows(cursor, rows)
+    return results, advanced
+
+def resolve_metric_records(cursor, records):
+    """
+    Match `records` to active journeys and current-phase criteria with two
+    set-based lookups (read-only). Returns (rows, results): metric_recordings
+    rows for every match, and one result dict per input record, in order.
+    """
+    if not records:
+        return [], []
+
+    # 1. Active journeys for every client in the batch
+    client_ids = sorted({r.client_id for r in records})
+    journeys = {}
+    for row in cursor.execute(f"""
+        SELECT client_id, id, current_phase_id FROM client_journeys
+        WHERE status = 'active' AND client_id IN ({",".join("?" * len(client_ids))})
+    """, client_ids):
+        journeys.setdefault(row["client_id"], row)
+
+    # 2. Exit criteria for every current phase touched by the batch
+    phase_ids = sorted({j["current_phase_id"] for j in journeys.values() if j["current_phase_id"]})
+    criteria = {}
+    if phase_ids:
+        for row in cursor.execute(f"""
+            SELECT id, phase_id, metric_name FROM exit_criteria
+            WHERE phase_id IN ({",".join("?" * len(phase_ids))})
+        """, phase_ids):
+            criteria.setdefault((row["phase_id"], row["metric_name"]), row["id"])
+
+    # 3. Build rows and per-item results
+    default_recorded_at = datetime.now().isoformat()
+    rows = []
+    results = []
+    for index, record in enumerate(records):
+        journey = journeys.get(record.client_id)
+        if not journey:
+            results.append({"index": index, "status": "error", "detail": "No active journey found for this client"})
+            continue
+        criterion_id = criteria.get((journey["current_phase_id"], record.metric_name))
+        if not criterion_id:
+            results.append({"index": index, "status": "error", "detail": f"Metric '{record.metric_name}' is not an exit criterion for current phase"})
+            continue
+
+        recording_id = new_record_id("REC")
+        rows.append((
+            recording_id,
+            journey["id"],
+            journey["current_phase_id"],
+            criterion_id,
+            record.metric_name,
+            record.value,
+            record.unit,
+            record.recorded_at or default_recorded_at
+        ))
+        results.append({"index": index, "status": "success", "recording_id": recording_id})
+    return rows, results
+
+def insert_recording_rows(cursor, rows):
+    """Insert resolved rows with one executemany, then run phase progression for them."""
+    cursor.executemany("""
+        INSERT INTO metric_recordings 
+        (id, journey_id, phase_id, criterion_id, metric_name, recorded_value, measurement_unit, recorded_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    """, rows)
 
-    return {"status": "success", "recording_id": recording_id}
+    # Phase progression for every (journey, criterion) written
+    return progression.apply(cursor, [(row[1], row[3]) for row in rows])
 
-@app.get("/api/protocol/{protocol_id}")
-async def get_protocol_content(protocol_id: str):
+@router.get("/api/protocol/{protocol_id}")
+def get_protocol_content(protocol_id: str, request: Request):
     """
     Serve secure, offline protocol documents from the Protocol Vault.
     """
@@ -271,13 +813,28 @@ async def get_protocol_content(protocol_id: str):
         raise HTTPException(status_code=404, detail="Protocol document not found")
         
     try:
-        content = protocol_path.read_text(encoding="utf-8")
-        return {"id": safe_id, "content": content}
+        # PERF: Rendered JSON is reused until the file's mtime/size changes
+        body, etag, last_modified = protocol_documents.get(
+            safe_id, protocol_path, lambda content: {"id": safe_id, "content": content}
+        )
     except Exception as e:
-        audit_logger.error(f"PROTOCOL ERROR: Failed to read {safe_id}: {str(e)}")
+        audit_logger.error("PROTOCOL ERROR", extra={"audit": {"protocol_id": safe_id, "error": str(e)}})
         raise HTTPException(status_code=500, detail="Failed to load protocol content")
 
-@app.post("/webhooks/janeapp")
+    if_none_match = request.headers.get("if-none-match")
+    if etag_matches(if_none_match, etag) or (
+        if_none_match is None
+        and not_modified_since(request.headers.get("if-modified-since"), protocol_path.stat().st_mtime)
+    ):
+        return not_modified(etag, last_modified)
+
+    return Response(
+        content=body,
+        media_type="application/json",
+        headers={"ETag": etag, "Last-Modified": last_modified, "Cache-Control": PRIVATE_REVALIDATE}
+    )
+
+@router.post("/webhooks/janeapp")
 async def janeapp_webhook(request: Request):
     # 1. Verify Signature (based on docs/janeapp_integration.md)
     signature = request.headers.get("X-Jane-Signature", "")
@@ -295,67 +852,169 @@ async def janeapp_webhook(request: Request):
     
     # 2. Parse Payload
     data = await request.json()
+    if not isinstance(data, dict):
+        raise HTTPException(status_code=400, detail="Payload must be a JSON object")
     event_type = data.get("event")
     
     if event_type != "treatment_note.created":
         return {"status": "ignored", "reason": "Unsupported event type"}
     
     # 3. Extract Client ID (from patient.external_id)
-    client_id = data.get("patient", {}).get("external_id")
+    client_id = payload_object(data, "patient").get("external_id")
     if not client_id:
         raise HTTPException(status_code=400, detail="Missing external_id in patient data")
-    
-    # 4. Process metrics from fields
-    fields = data.get("treatment_note", {}).get("fields", [])
-    recorded_at = data.get("appointment", {}).get("date", datetime.now().isoformat())
-    
+
+    # 4. Backpressure: let JaneApp retry later rather than grow the queue unbounded
+    if webhook_queue.saturated():
+        return JSONResponse(
+            status_code=503,
+            content={"status": "busy", "reason": "Webhook queue is full"},
+            headers={"Retry-After": str(WEBHOOK_RETRY_AFTER_SECONDS)}
+        )
+
+    # 5. Persist the raw payload; metrics are applied by the background drainers
+    # Idempotency key is the treatment note id (docs/janeapp_integration.md §6.4)
+    note_id = payload_object(data, "treatment_note").get("id")
+    event_id = f"{event_type}:{note_id}" if note_id else "sha256:" + hashlib.sha256(body).hexdigest()
+    queued = await run_in_threadpool(webhook_queue.enqueue, event_id, event_type, body.decode("utf-8"))
+
+    return JSONResponse(
+        status_code=202,
+        content={"status": "queued" if queued else "duplicate", "event_id": event_id}
+    )
+
+@router.get("/api/_ready")
+def readiness_probe():
+    """
+    Readiness probe: 200 once this worker has started up and can read the
+    database, 503 otherwise (deploy health checks route traffic on it).
+    """
+    if not _ready:
+        raise HTTPException(status_code=503, detail="Starting up")
+    try:
+        with db_pool.reader() as conn:
+            library_version = conn.execute("""
+                SELECT counter FROM library_version WHERE id = 1
+            """).fetchone()[0]
+    except sqlite3.Error:
+        raise HTTPException(status_code=503, detail="Database unavailable")
+    cache = protocol_cache.stats()
+    return {
+        "status": "ready",
+        "worker": os.getpid(),
+        "libraryVersion": library_version,
+        "protocolsCached": cache["size"],
+        "preloaded": _preloaded,
+    }
+
+@router.get("/api/_debug/metrics")
+def debug_metrics():
+    """Prometheus scrape target for this worker's request metrics (profiling only)."""
+    if not profiling_enabled():
+        raise HTTPException(status_code=404, detail="Profiling is disabled")
+    return PlainTextResponse(request_metrics.render(), media_type="text/plain; version=0.0.4")
+
+@router.get("/webhooks/janeapp/stats")
+def janeapp_webhook_stats():
+    """Queue depth, throughput and field-matching counters for this worker."""
+    return {**webhook_queue.stats(), "resolver": resolver_stats.snapshot()}
+
+def payload_object(data, key):
+    """`data[key]` when it is a JSON object, else {}: malformed sections read as missing fields."""
+    value = data.get(key)
+    return value if isinstance(value, dict) else {}
+
+def apply_janeapp_event(cursor, payload, received_at):
+    """Queue handler: apply one stored treatment_note.created payload."""
+    data = json.loads(payload)
+    client_id = payload_object(data, "patient").get("external_id")
+    fields = payload_object(data, "treatment_note").get("fields", [])
+    # Undated notes are dated when JaneApp delivered them, not when a drainer
+    # got to them (received_at is UTC; recordings are in local time)
+    recorded_at = payload_object(data, "appointment").get("date") or (
+        datetime.fromisoformat(received_at).replace(tzinfo=timezone.utc).astimezone().replace(tzinfo=None).isoformat()
+    )
+    return record_treatment_note(cursor, client_id, fields, recorded_at)
+
+def record_treatment_note(cursor, client_id, fields, recorded_at):
+    """Insert every treatment-note field that maps to a current-phase exit criterion."""
     recorded_count = 0
-    # Re-use record_metric logic via direct DB access for speed
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
     journey = cursor.execute("""
-        SELECT id, current_phase_id FROM client_journeys 
-        WHERE client_id = ? AND status = 'active'
+        SELECT
+            j.id, j.current_phase_id, j.pathology_id, p.version,
+            (SELECT counter FROM library_version WHERE id = 1) as library_version
+        FROM client_journeys j
+        JOIN pathologies p ON j.pathology_id = p.id
+        WHERE j.client_id = ? AND j.status = 'active'
     """, (client_id,)).fetchone()
-    
+
     if not journey:
-        conn.close()
         return {"status": "ignored", "reason": "No active journey"}
 
+    # Field labels resolve against the phase's in-memory index (no SQL per field)
+    protocol = protocol_cache.get(
+        cursor,
+        journey["pathology_id"],
+        journey["version"],
+        journey["library_version"]
+    )
+    phase = protocol.phase(journey["current_phase_id"])
+    if phase is None:
+        return {"status": "ignored", "reason": "Current phase not in protocol"}
+
+    rows = []
     for field in fields:
-        label = field.get("label")
-        value = field.get("value")
-        unit = field.get("unit", "")
-        
-        # Attempt to find matching criterion
-        criterion = cursor.execute("""
-            SELECT id, metric_name FROM exit_criteria 
-            WHERE phase_id = ? AND (metric_name = ? OR description LIKE ?)
-        """, (journey["current_phase_id"], label, f"%{label}%")).fetchone()
-        
+        criterion = phase.resolver.resolve(field.get("label"))
         if criterion:
-            cursor.execute("""
-                INSERT INTO metric_recordings 
-                (id, journey_id, phase_id, criterion_id, metric_name, recorded_value, measurement_unit, recorded_at)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                f"WH_{datetime.now().timestamp()}_{recorded_count}",
+            rows.append((
+                new_record_id("WH"),
                 journey["id"],
                 journey["current_phase_id"],
-                criterion["id"],
-                criterion["metric_name"],
-                str(value),
-                unit,
+                criterion.id,
+                criterion.metric_name,
+                str(field.get("value")),
+                field.get("unit", ""),
                 recorded_at
             ))
             recorded_count += 1
-            
-    conn.commit()
-    conn.close()
-    
-    return {"status": "success", "metrics_recorded": recorded_count}
 
-# Mount static files for frontend dev
-# Fix: Move mount to after all routes to avoid path collisions
-app.mount("/", StaticFiles(directory="frontend", html=True), name="frontend")
+    cursor.executemany("""
+        INSERT INTO metric_recordings 
+        (id, journey_id, phase_id, criterion_id, metric_name, recorded_value, measurement_unit, recorded_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    """, rows)
+
+    advanced = progression.apply(cursor, [(row[1], row[3]) for row in rows])
+
+    return {"status": "success", "metrics_recorded": recorded_count, "advanced": advanced}
+
+def create_app():
+    """
+    Build the ASGI application. Cheap and side-effect free; resources are
+    opened by lifespan() when the server starts it.
+    """
+    app = FastAPI(title="VECTOR API", version="0.1.0", lifespan=lifespan)
+    app.middleware("http")(audit_middleware)
+    app.add_exception_handler(PoolExhausted, pool_exhausted_handler)
+
+    # Enable CORS for local development (localhost only in production)
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=["http://localhost:8000", "http://127.0.0.1:8000"],  # SECURITY: Restrict origins
+        allow_credentials=True,
+        allow_methods=["GET", "POST"],  # SECURITY: Only needed methods
+        allow_headers=["*"],
+    )
+    app.add_middleware(GZipMiddleware, minimum_size=API_GZIP_MIN_BYTES)
+
+    # PERF: Opt-in latency histograms, sampled statement timing and Server-Timing
+    # (PROFILE_SAMPLE_RATE; off by default)
+    app.add_middleware(ProfilingMiddleware)
+
+    app.include_router(router)
+
+    # Frontend mount goes after all routes to avoid path collisions
+    app.mount("/", frontend_assets, name="frontend")
+    return app
+
+app = create_app()
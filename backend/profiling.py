@@ -0,0 +1,330 @@
+"""
+PROJECT VECTOR — Request Profiling & Server-Timing
+Calgary Strength & Physio
+
+Opt-in instrumentation for answering "where did this slow request go":
+SQLite, Python assembly, or serialization.
+
+Enabled by PROFILE_SAMPLE_RATE (0 = off, the default; 1.0 = every request):
+
+  * Every request (when enabled): method/route latency is added to a
+    per-worker histogram. The cost is one perf_counter pair and a bucket
+    increment.
+  * Sampled requests (PROFILE_SAMPLE_RATE, or any request carrying
+    `X-Vector-Profile: 1`): the connection from get_db_connection is
+    wrapped so every statement is counted and timed. (Writes run on the
+    write buffer's thread and are sampled per flush, see profiled().)
+    The response carries a Server-Timing header
+    (db;dur=..;desc="N queries", assembly;dur=.., total;dur=..).
+    A statement repeated PROFILE_N_PLUS_ONE times or more in one request
+    is logged as an N+1 pattern and counted.
+
+Metrics are exposed in Prometheus text format at /api/_debug/metrics (404
+while profiling is disabled). Each gunicorn worker keeps its own registry;
+samples carry a `worker` label so scrapes from different workers can be
+summed.
+"""
+
+import contextvars
+import logging
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+PROFILE_N_PLUS_ONE = int(os.getenv("PROFILE_N_PLUS_ONE", "5"))
+PROFILE_HEADER = b"x-vector-profile"
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+logger = logging.getLogger(__name__)
+
+_current = contextvars.ContextVar("vector_profile", default=None)
+
+
+def profiling_enabled():
+    return PROFILE_SAMPLE_RATE > 0
+
+
+# --- Per-request Profile ---
+
+class RequestProfile:
+    """Statement counts and timings for one request (or background batch)."""
+
+    __slots__ = ("statements", "db_seconds", "by_sql", "spans")
+
+    def __init__(self):
+        self.statements = 0
+        self.db_seconds = 0.0
+        self.by_sql = {}
+        self.spans = {}
+
+    def record(self, sql, seconds, new_statement=True):
+        entry = self.by_sql.get(sql)
+        if entry is None:
+            entry = self.by_sql[sql] = [0, 0.0]
+        if new_statement:
+            self.statements += 1
+            entry[0] += 1
+        entry[1] += seconds
+        self.db_seconds += seconds
+
+    def repeated(self):
+        """Statements executed PROFILE_N_PLUS_ONE times or more: likely N+1 loops."""
+        return [(sql, count) for sql, (count, _) in self.by_sql.items() if count >= PROFILE_N_PLUS_ONE]
+
+    def server_timing(self, total_seconds):
+        parts = [f'db;dur={self.db_seconds * 1000:.2f};desc="{self.statements} queries"']
+        parts.extend(f"{name};dur={seconds * 1000:.2f}" for name, seconds in self.spans.items())
+        parts.append(f"total;dur={total_seconds * 1000:.2f}")
+        return ", ".join(parts)
+
+
+@contextmanager
+def span(name):
+    """Time a named phase of the current sampled request (no-op otherwise)."""
+    profile = _current.get()
+    if profile is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        profile.spans[name] = profile.spans.get(name, 0.0) + time.perf_counter() - started
+
+
+# --- Connection Proxy (sampled requests only) ---
+
+class ProfiledCursor:
+    __slots__ = ("_cursor", "_profile", "_sql")
+
+    def __init__(self, cursor, profile):
+        self._cursor = cursor
+        self._profile = profile
+        self._sql = None
+
+    def execute(self, sql, parameters=()):
+        started = time.perf_counter()
+        self._cursor.execute(sql, parameters)
+        self._sql = sql
+        self._profile.record(sql, time.perf_counter() - started)
+        return self
+
+    def executemany(self, sql, seq_of_parameters):
+        started = time.perf_counter()
+        self._cursor.executemany(sql, seq_of_parameters)
+        self._sql = sql
+        self._profile.record(sql, time.perf_counter() - started)
+        return self
+
+    def _fetch(self, method, *args):
+        # Row stepping is statement time too; attribute it to the last statement
+        started = time.perf_counter()
+        try:
+            return method(*args)
+        finally:
+            if self._sql is not None:
+                self._profile.record(self._sql, time.perf_counter() - started, new_statement=False)
+
+    def fetchone(self):
+        return self._fetch(self._cursor.fetchone)
+
+    def fetchmany(self, size=None):
+        return self._fetch(self._cursor.fetchmany, *(() if size is None else (size,)))
+
+    def fetchall(self):
+        return self._fetch(self._cursor.fetchall)
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        return self._fetch(self._cursor.__next__)
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+
+class ProfiledConnection:
+    __slots__ = ("_conn", "_profile")
+
+    def __init__(self, conn, profile):
+        self._conn = conn
+        self._profile = profile
+
+    def cursor(self):
+        return ProfiledCursor(self._conn.cursor(), self._profile)
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+
+def profile_connection(conn):
+    """The connection, instrumented if the current request is being sampled."""
+    profile = _current.get()
+    return conn if profile is None else ProfiledConnection(conn, profile)
+
+
+# --- Metrics Registry ---
+
+class Metrics:
+    """Per-worker latency histograms and statement counters, keyed by (method, route)."""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._latency = {}
+        self._db = {}
+        self._repeats = {}
+
+    def observe(self, method, route, seconds):
+        with self._lock:
+            entry = self._latency.get((method, route))
+            if entry is None:
+                entry = self._latency[(method, route)] = [[0] * len(self.buckets), 0.0, 0]
+            counts = entry[0]
+            for i, bound in enumerate(self.buckets):
+                if seconds <= bound:
+                    counts[i] += 1
+                    break
+            entry[1] += seconds
+            entry[2] += 1
+
+    def observe_profile(self, method, route, profile):
+        with self._lock:
+            entry = self._db.get((method, route))
+            if entry is None:
+                entry = self._db[(method, route)] = [0, 0, 0.0]
+            entry[0] += 1
+            entry[1] += profile.statements
+            entry[2] += profile.db_seconds
+            if profile.repeated():
+                self._repeats[(method, route)] = self._repeats.get((method, route), 0) + 1
+
+    def render(self):
+        """Prometheus text exposition format (0.0.4)."""
+        worker = os.getpid()
+        lines = [
+            "# HELP vector_http_request_duration_seconds Request latency by route.",
+            "# TYPE vector_http_request_duration_seconds histogram",
+        ]
+        with self._lock:
+            for (method, route), (counts, total, count) in sorted(self._latency.items()):
+                labels = f'method="{method}",route="{route}",worker="{worker}"'
+                cumulative = 0
+                for bound, n in zip(self.buckets, counts):
+                    cumulative += n
+                    lines.append(f'vector_http_request_duration_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+                lines.append(f'vector_http_request_duration_seconds_bucket{{{labels},le="+Inf"}} {count}')
+                lines.append(f"vector_http_request_duration_seconds_sum{{{labels}}} {total:.6f}")
+                lines.append(f"vector_http_request_duration_seconds_count{{{labels}}} {count}")
+
+            lines += [
+                "# HELP vector_profiled_requests_total Requests sampled for statement profiling.",
+                "# TYPE vector_profiled_requests_total counter",
+            ]
+            lines += [
+                f'vector_profiled_requests_total{{method="{m}",route="{r}",worker="{worker}"}} {n}'
+                for (m, r), (n, _, _) in sorted(self._db.items())
+            ]
+            lines += [
+                "# HELP vector_db_statements_total SQL statements executed by sampled requests.",
+                "# TYPE vector_db_statements_total counter",
+            ]
+            lines += [
+                f'vector_db_statements_total{{method="{m}",route="{r}",worker="{worker}"}} {s}'
+                for (m, r), (_, s, _) in sorted(self._db.items())
+            ]
+            lines += [
+                "# HELP vector_db_seconds_total Time spent in SQLite by sampled requests.",
+                "# TYPE vector_db_seconds_total counter",
+            ]
+            lines += [
+                f'vector_db_seconds_total{{method="{m}",route="{r}",worker="{worker}"}} {t:.6f}'
+                for (m, r), (_, _, t) in sorted(self._db.items())
+            ]
+            lines += [
+                "# HELP vector_n_plus_one_total Sampled requests that repeated a statement PROFILE_N_PLUS_ONE+ times.",
+                "# TYPE vector_n_plus_one_total counter",
+            ]
+            lines += [
+                f'vector_n_plus_one_total{{method="{m}",route="{r}",worker="{worker}"}} {n}'
+                for (m, r), n in sorted(self._repeats.items())
+            ]
+        return "\n".join(lines) + "\n"
+
+
+request_metrics = Metrics()
+
+
+def finish(method, route, profile):
+    """Record a sampled profile and log any N+1 pattern it contains."""
+    request_metrics.observe_profile(method, route, profile)
+    for sql, count in profile.repeated():
+        logger.warning(f"N+1 QUERY: {method} {route} ran {count}x: {' '.join(sql.split())[:200]}")
+
+
+@contextmanager
+def profiled(name):
+    """
+    Profile a unit of background work (e.g. a webhook drain batch) under the
+    pseudo-route `name`, subject to the same sampling as requests.
+    """
+    if not profiling_enabled():
+        yield
+        return
+    profile = RequestProfile() if random.random() < PROFILE_SAMPLE_RATE else None
+    token = _current.set(profile)
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        _current.reset(token)
+        request_metrics.observe("BACKGROUND", name, time.perf_counter() - started)
+        if profile is not None:
+            finish("BACKGROUND", name, profile)
+
+
+# --- ASGI Middleware ---
+
+class ProfilingMiddleware:
+    """Pure ASGI middleware: latency histograms, sampling and Server-Timing."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not profiling_enabled():
+            await self.app(scope, receive, send)
+            return
+
+        forced = any(key == PROFILE_HEADER and value == b"1" for key, value in scope.get("headers", ()))
+        profile = RequestProfile() if forced or random.random() < PROFILE_SAMPLE_RATE else None
+        token = _current.set(profile)
+        started = time.perf_counter()
+
+        async def send_with_timing(message):
+            if profile is not None and message["type"] == "http.response.start":
+                header = profile.server_timing(time.perf_counter() - started).encode("latin-1")
+                message = {**message, "headers": [*message.get("headers", ()), (b"server-timing", header)]}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current.reset(token)
+            route = scope.get("route")
+            # Route templates keep label cardinality bounded (no client ids)
+            route_path = getattr(route, "path", None) or "unmatched"
+            request_metrics.observe(scope["method"], route_path, time.perf_counter() - started)
+            if profile is not None:
+                finish(scope["method"], route_path, profile)
@@ -0,0 +1,217 @@
+"""
+PROJECT VECTOR — Phase Advancement Engine
+Calgary Strength & Physio
+
+Moves a journey to its next phase as soon as every exit criterion of the
+current phase is met, inside the same transaction as the metric write that
+completed it.
+
+Evaluation is incremental. phase_progress / criterion_progress (see
+v_core.sql §2g) hold the met flag of each current-phase criterion and the
+number still unmet, so a new recording costs one indexed read (journey,
+cached state and latest value in a single query), one predicate call from
+the compiled protocol, and at most two small writes. The full phase is
+only re-read from latest_metric when the journey enters a phase or the
+Living Library is reloaded.
+
+On advancement a phase_completions row is written with the value that met
+each criterion ({"knee_extension": "0 degrees", ...}); completing the last
+phase marks the journey 'completed'. Phases without exit criteria never
+auto-advance; they wait for a clinician.
+
+If `on_event(client_id, event, data)` is given, the engine reports each
+re-evaluated criterion ("criterion") and each transition ("phase") so live
+viewers can be updated with a delta instead of a full journey re-fetch.
+Events are reported only after the progression writes they describe.
+"""
+
+import json
+
+from backend.ids import new_record_id
+
+
+class ProgressionEngine:
+    """Applies metric changes to journey progression through the caller's cursor."""
+
+    def __init__(self, protocol_cache, on_event=None):
+        self.protocol_cache = protocol_cache
+        self.on_event = on_event
+
+    def apply(self, cursor, changes):
+        """
+        Re-evaluate each (journey_id, criterion_id) touched by a metric write.
+        Returns one transition dict per phase advanced, in order.
+        """
+        transitions = []
+        for journey_id, criterion_id in dict.fromkeys(changes):
+            transitions.extend(self._apply_one(cursor, journey_id, criterion_id))
+        return transitions
+
+    def _apply_one(self, cursor, journey_id, criterion_id):
+        # 1. Journey, cached progress and the criterion's latest value in one read
+        state = cursor.execute("""
+            SELECT
+                j.client_id, j.current_phase_id, j.pathology_id, p.version,
+                (SELECT counter FROM library_version WHERE id = 1) as library_version,
+                pp.phase_id as tracked_phase_id, pp.library_version as tracked_library_version,
+                pp.unmet_count, cp.met, lm.recorded_value
+            FROM client_journeys j
+            JOIN pathologies p ON j.pathology_id = p.id
+            LEFT JOIN phase_progress pp ON pp.journey_id = j.id
+            LEFT JOIN criterion_progress cp ON cp.journey_id = j.id AND cp.criterion_id = ?
+            LEFT JOIN latest_metric lm ON lm.journey_id = j.id AND lm.criterion_id = ?
+            WHERE j.id = ? AND j.status = 'active'
+        """, (criterion_id, criterion_id, journey_id)).fetchone()
+        if state is None:
+            return []
+
+        protocol = self.protocol_cache.get(
+            cursor, state["pathology_id"], state["version"], state["library_version"]
+        )
+        phase = protocol.phase(state["current_phase_id"])
+        if phase is None:
+            return []
+
+        crit = phase.criterion(criterion_id)
+        if crit is None:
+            return []
+        met = crit.is_met(state["recorded_value"])
+
+        # 2. Stale or missing state: rebuild the whole phase once
+        if (state["tracked_phase_id"] != phase.id
+                or state["tracked_library_version"] != state["library_version"]):
+            unmet = self._seed_phase(cursor, journey_id, phase, state["library_version"])
+        else:
+            # 3. Incremental: only the changed criterion is evaluated
+            unmet = state["unmet_count"]
+            if met != bool(state["met"]):
+                unmet += -1 if met else 1
+                cursor.execute("""
+                    UPDATE criterion_progress SET met = ? WHERE journey_id = ? AND criterion_id = ?
+                """, (int(met), journey_id, criterion_id))
+                cursor.execute("""
+                    UPDATE phase_progress SET unmet_count = ? WHERE journey_id = ?
+                """, (unmet, journey_id))
+
+        # 4. Advance while the current phase is fully met
+        transitions = []
+        while unmet == 0 and phase.criteria:
+            next_phase = self._next_phase(protocol, phase)
+            transitions.append(self._advance(cursor, journey_id, phase, next_phase))
+            if next_phase is None:
+                break
+            phase = next_phase
+            unmet = self._seed_phase(cursor, journey_id, phase, state["library_version"])
+
+        # 5. Announce only once every write above has gone through
+        self._emit(state["client_id"], "criterion", {
+            "id": crit.id,
+            "metric": crit.metric_name,
+            "current": f"{state['recorded_value']} {crit.measurement_unit}" if state["recorded_value"] else None,
+            "met": met,
+        })
+        for transition in transitions:
+            self._emit(state["client_id"], "phase", transition)
+        return transitions
+
+    def _emit(self, client_id, event, data):
+        if self.on_event is not None:
+            self.on_event(client_id, event, data)
+
+    @staticmethod
+    def _next_phase(protocol, phase):
+        later = [ph for ph in protocol.phases if ph.order_index > phase.order_index]
+        return min(later, key=lambda ph: ph.order_index) if later else None
+
+    def _seed_phase(self, cursor, journey_id, phase, library_version):
+        """Evaluate every criterion of `phase` from latest_metric; returns the unmet count."""
+        values = {
+            row["criterion_id"]: row["recorded_value"]
+            for row in cursor.execute("""
+                SELECT criterion_id, recorded_value FROM latest_metric WHERE journey_id = ?
+            """, (journey_id,))
+        }
+        flags = [(journey_id, crit.id, int(crit.is_met(values.get(crit.id)))) for crit in phase.criteria]
+        unmet = sum(1 for _, _, met in flags if not met)
+
+        cursor.execute("DELETE FROM criterion_progress WHERE journey_id = ?", (journey_id,))
+        cursor.executemany("""
+            INSERT INTO criterion_progress (journey_id, criterion_id, met) VALUES (?, ?, ?)
+        """, flags)
+        cursor.execute("""
+            INSERT INTO phase_progress (journey_id, phase_id, library_version, unmet_count, criteria_count)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT(journey_id) DO UPDATE SET
+                phase_id        = excluded.phase_id,
+                library_version = excluded.library_version,
+                unmet_count     = excluded.unmet_count,
+                criteria_count  = excluded.criteria_count
+        """, (journey_id, phase.id, library_version, unmet, len(phase.criteria)))
+        return unmet
+
+    def _advance(self, cursor, journey_id, phase, next_phase):
+        """Record the completion of `phase` and move the journey on."""
+        # Values that met each criterion; only read on the (rare) transition
+        evidence = {
+            row["criterion_id"]: row
+            for row in cursor.execute("""
+                SELECT criterion_id, recorded_value, measurement_unit, recorded_at
+                FROM latest_metric WHERE journey_id = ?
+            """, (journey_id,))
+        }
+        criteria_met = {}
+        completed_at = None
+        for crit in phase.criteria:
+            row = evidence.get(crit.id)
+            if row is None:
+                continue
+            unit = row["measurement_unit"] or crit.measurement_unit
+            criteria_met[crit.metric_name] = f"{row['recorded_value']} {unit}" if unit else row["recorded_value"]
+            if row["recorded_at"] and (completed_at is None or row["recorded_at"] > completed_at):
+                completed_at = row["recorded_at"]
+
+        # Phase start: previous completion, else the journey start
+        started_at = cursor.execute("""
+            SELECT COALESCE(
+                (SELECT MAX(completed_at) FROM phase_completions WHERE journey_id = j.id),
+                j.started_at
+            ) FROM client_journeys j WHERE j.id = ?
+        """, (journey_id,)).fetchone()[0]
+
+        cursor.execute("""
+            INSERT INTO phase_completions
+            (id, journey_id, phase_id, started_at, completed_at, duration_days, criteria_met, notes)
+            VALUES (?, ?, ?, ?, date(?), CAST(julianday(date(?)) - julianday(date(?)) AS INTEGER), ?, ?)
+        """, (
+            # A phase can be completed again (journey moved back by a clinician)
+            new_record_id("PC"),
+            journey_id,
+            phase.id,
+            started_at,
+            completed_at or "now",
+            completed_at or "now",
+            started_at,
+            json.dumps(criteria_met),
+            "Auto-advanced: all exit criteria met"
+        ))
+
+        if next_phase is None:
+            cursor.execute("""
+                UPDATE client_journeys
+                SET status = 'completed', completed_at = date(?), updated_at = datetime('now')
+                WHERE id = ?
+            """, (completed_at or "now", journey_id))
+            cursor.execute("DELETE FROM phase_progress WHERE journey_id = ?", (journey_id,))
+            cursor.execute("DELETE FROM criterion_progress WHERE journey_id = ?", (journey_id,))
+        else:
+            cursor.execute("""
+                UPDATE client_journeys SET current_phase_id = ?, updated_at = datetime('now')
+                WHERE id = ?
+            """, (next_phase.id, journey_id))
+
+        return {
+            "journey_id": journey_id,
+            "completed_phase_id": phase.id,
+            "current_phase_id": next_phase.id if next_phase else None,
+            "criteria_met": criteria_met,
+        }
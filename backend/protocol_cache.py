@@ -0,0 +1,267 @@
+"""
+PROJECT VECTOR — Protocol Structure Cache
+Calgary Strength & Physio
+
+Phases, exit criteria and programming slots only change when
+scripts/load_base.py reloads the Living Library, so the compiled protocol
+tree is held in memory and shared by every request in a worker.
+
+Entries are keyed by (pathologies.id, pathologies.version). The seed loader
+also bumps the single-row `library_version` counter; each journey read
+fetches that counter alongside the journey header, so a worker notices a
+reload from any other process without re-reading the protocol tree.
+
+ProtocolCache.warm() compiles the whole library with one set-based read at
+start-up; under gunicorn `preload_app` it runs once in the master and the
+workers inherit the compiled trees instead of each compiling on demand.
+"""
+
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Optional, Tuple
+
+from backend.criteria import compile_criterion
+from backend.field_resolver import FieldResolver
+from backend.journey_json import PhaseFragments, build_phase_fragments
+
+
+# --- Compiled Protocol Tree (immutable) ---
+
+@dataclass(frozen=True)
+class CompiledCriterion:
+    id: str
+    metric_name: str
+    target_operator: str
+    target_value: str
+    measurement_unit: Optional[str]
+    description: Optional[str]
+    label: str
+    target: str
+    is_met: Callable[[Optional[str]], bool]
+
+
+@dataclass(frozen=True)
+class CompiledSlot:
+    type: str
+    exercise: str
+    hd: Optional[str]
+    rationale: Optional[str]
+    intent: Optional[str]
+    detail: str
+
+
+@dataclass(frozen=True)
+class CompiledPhase:
+    id: str
+    order_index: int
+    name: str
+    description: Optional[str]
+    typical_duration: Optional[str]
+    criteria: Tuple[CompiledCriterion, ...]
+    programming: Tuple[CompiledSlot, ...]
+    resolver: FieldResolver
+    fragments: PhaseFragments
+
+    def criterion(self, criterion_id):
+        for crit in self.criteria:
+            if crit.id == criterion_id:
+                return crit
+        return None
+
+
+@dataclass(frozen=True)
+class CompiledProtocol:
+    pathology_id: str
+    version: int
+    phases: Tuple[CompiledPhase, ...]
+
+    def phase(self, phase_id):
+        for ph in self.phases:
+            if ph.id == phase_id:
+                return ph
+        return None
+
+    def criterion(self, criterion_id):
+        """(phase, criterion) for a criterion in any phase, or (None, None)."""
+        for ph in self.phases:
+            crit = ph.criterion(criterion_id)
+            if crit is not None:
+                return ph, crit
+        return None, None
+
+
+def load_protocol(cursor, pathology_id, version):
+    """Read one pathology's phases, criteria and slots in three set-based queries."""
+    return load_protocols(cursor, {pathology_id: version})[pathology_id]
+
+
+def load_protocols(cursor, versions):
+    """
+    Compile every pathology in `versions` ({pathology_id: version}) with the
+    same three set-based queries, whatever the number of pathologies.
+    """
+    placeholders = ", ".join("?" * len(versions))
+    ids = tuple(versions)
+
+    phases_by_pathology = {}
+    for ph in cursor.execute(f"""
+        SELECT * FROM phases WHERE pathology_id IN ({placeholders})
+        ORDER BY pathology_id, order_index ASC
+    """, ids).fetchall():
+        phases_by_pathology.setdefault(ph["pathology_id"], []).append(ph)
+
+    criteria_by_phase = {}
+    for crit in cursor.execute(f"""
+        SELECT ec.* FROM exit_criteria ec
+        JOIN phases ph ON ec.phase_id = ph.id
+        WHERE ph.pathology_id IN ({placeholders})
+        ORDER BY ph.pathology_id, ph.order_index ASC, ec.rowid ASC
+    """, ids):
+        criteria_by_phase.setdefault(crit["phase_id"], []).append(CompiledCriterion(
+            id=crit["id"],
+            metric_name=crit["metric_name"],
+            target_operator=crit["target_operator"],
+            target_value=crit["target_value"],
+            measurement_unit=crit["measurement_unit"],
+            description=crit["description"],
+            label=f"{crit['metric_name']} {crit['target_operator']} {crit['target_value']} {crit['measurement_unit']}",
+            target=f"{crit['target_operator']} {crit['target_value']}",
+            is_met=compile_criterion(crit["target_operator"], crit["target_value"]),
+        ))
+
+    slots_by_phase = {}
+    for slot in cursor.execute(f"""
+        SELECT ps.* FROM programming_slots ps
+        JOIN phases ph ON ps.phase_id = ph.id
+        WHERE ph.pathology_id IN ({placeholders})
+        ORDER BY ph.pathology_id, ph.order_index ASC, ps.order_index ASC
+    """, ids):
+        slots_by_phase.setdefault(slot["phase_id"], []).append(CompiledSlot(
+            type=slot["slot_type"],
+            exercise=slot["standard_exercise"],
+            hd=slot["high_density_option"],
+            rationale=slot["high_density_rationale"],
+            intent=slot["intent_description"],
+            detail=slot["sets_reps_guidance"] or "See clinician notes",
+        ))
+
+    protocols = {}
+    for pathology_id, version in versions.items():
+        phases = []
+        for ph in phases_by_pathology.get(pathology_id, ()):
+            criteria = tuple(criteria_by_phase.get(ph["id"], ()))
+            programming = tuple(slots_by_phase.get(ph["id"], ()))
+            phases.append(CompiledPhase(
+                id=ph["id"],
+                order_index=ph["order_index"],
+                name=ph["name"],
+                description=ph["description"],
+                typical_duration=ph["typical_duration"],
+                criteria=criteria,
+                programming=programming,
+                resolver=FieldResolver(ph["id"], criteria),
+                # PERF: Static JSON for the journey payload, encoded once per load
+                fragments=build_phase_fragments(
+                    ph["name"], ph["description"], ph["typical_duration"], criteria, programming
+                ),
+            ))
+        protocols[pathology_id] = CompiledProtocol(
+            pathology_id=pathology_id, version=version, phases=tuple(phases)
+        )
+    return protocols
+
+
+# --- LRU Cache ---
+
+class ProtocolCache:
+    """Thread-safe LRU of CompiledProtocol keyed by (pathology_id, version)."""
+
+    def __init__(self, maxsize=128):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._library_version = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.stale_reads = 0
+
+    def get(self, cursor, pathology_id, version, library_version):
+        """
+        Return the compiled protocol, loading it through `cursor` on a miss.
+
+        `library_version` is the counter read from SQLite in the same query as
+        the journey header. A higher counter means load_base ran somewhere and
+        every entry in this worker is dropped. The counter only grows, so a
+        lower one comes from a reader still on an older WAL snapshot: its
+        protocol is loaded through its own cursor and returned uncached,
+        leaving the entries (and the counter) of newer readers alone.
+        """
+        key = (pathology_id, version)
+        with self._lock:
+            if self._library_version is None or library_version > self._library_version:
+                self._entries.clear()
+                self._library_version = library_version
+            if library_version < self._library_version:
+                self.stale_reads += 1
+            else:
+                protocol = self._entries.get(key)
+                if protocol is not None:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return protocol
+                self.misses += 1
+
+        # Load outside the lock so a cold pathology doesn't stall warm ones
+        protocol = load_protocol(cursor, pathology_id, version)
+
+        with self._lock:
+            if library_version == self._library_version:
+                self._entries[key] = protocol
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+                    self.evictions += 1
+        return protocol
+
+    def warm(self, cursor):
+        """
+        Compile up to `maxsize` pathologies in one bulk read (start-up, ideally
+        before the server forks so every worker inherits the compiled trees).
+        Returns the number of protocols cached.
+        """
+        library_version = cursor.execute("""
+            SELECT counter FROM library_version WHERE id = 1
+        """).fetchone()[0]
+        versions = {
+            row["id"]: row["version"]
+            for row in cursor.execute("""
+                SELECT id, version FROM pathologies ORDER BY id LIMIT ?
+            """, (self.maxsize,))
+        }
+        protocols = load_protocols(cursor, versions) if versions else {}
+
+        with self._lock:
+            self._entries.clear()
+            self._library_version = library_version
+            for protocol in protocols.values():
+                self._entries[(protocol.pathology_id, protocol.version)] = protocol
+        return len(protocols)
+
+    def invalidate(self):
+        with self._lock:
+            self._entries.clear()
+            self._library_version = None
+
+    def stats(self):
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "library_version": self._library_version,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "stale_reads": self.stale_reads,
+            }
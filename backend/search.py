@@ -0,0 +1,94 @@
+"""
+PROJECT VECTOR — Living Library Search
+Calgary Strength & Physio
+
+Read side of /api/search. The index is the FTS5 table `library_search`
+(v_core.sql §1g): pathologies, phases and programming slots are mirrored
+into it by triggers as load_base.py writes them, and the Protocol Vault
+markdown is synced section by section by load_base.sync_documents().
+
+  * Queries are reduced to plain terms (letters/digits), AND-ed, with the
+    last term prefix-matched so results keep up with typing
+    ("bfr leg ext" finds "BFR Leg Extension"). No FTS5 syntax is passed
+    through, so user input can't produce a MATCH error.
+  * Ranking is BM25 with titles weighted over exercise names over body
+    text (the `rank` configured in the schema), so ORDER BY rank LIMIT n
+    stays inside the FTS5 index.
+  * title/exercises are returned whole and snippet is a window of the body;
+    all three are HTML-escaped with matches wrapped in <mark>.
+"""
+
+import html
+import re
+
+SEARCH_KINDS = ("pathology", "phase", "slot", "document")
+SEARCH_TERMS_MAX = 16
+SNIPPET_TOKENS = 24
+
+_TERM = re.compile(r"\w+")
+
+# Control characters can't occur in indexed text, so they are safe
+# highlight markers to swap for <mark> after escaping
+_OPEN, _CLOSE = "\x02", "\x03"
+
+
+def match_expression(query):
+    """FTS5 MATCH string for free text, or None if it holds no searchable term."""
+    terms = _TERM.findall(query or "")[:SEARCH_TERMS_MAX]
+    if not terms:
+        return None
+    expression = " ".join(f'"{term}"' for term in terms)
+    if _TERM.match(query[-1]):
+        # Still typing the last word: match it as a prefix
+        expression += "*"
+    return expression
+
+
+def _marked(text):
+    if text is None:
+        return None
+    return html.escape(text).replace(_OPEN, "<mark>").replace(_CLOSE, "</mark>")
+
+
+def search(cursor, query, kind=None, limit=20):
+    """Ranked library hits for `query`, best first; [] when nothing is searchable."""
+    expression = match_expression(query)
+    if expression is None:
+        return []
+
+    kind_clause, params = "", [_OPEN, _CLOSE, _OPEN, _CLOSE, _OPEN, _CLOSE, expression]
+    if kind is not None:
+        kind_clause = "AND c.kind = ?"
+        params.append(kind)
+    params.append(limit)
+
+    rows = cursor.execute(f"""
+        SELECT
+            c.kind, c.ref_id, c.pathology_id, p.name, ph.name,
+            highlight(library_search, 0, ?, ?),
+            highlight(library_search, 1, ?, ?),
+            snippet(library_search, 2, ?, ?, '…', {SNIPPET_TOKENS}),
+            library_search.rank
+        FROM library_search
+        JOIN library_search_content c ON c.id = library_search.rowid
+        LEFT JOIN pathologies p ON p.id = c.pathology_id
+        LEFT JOIN phases ph ON ph.id = c.phase_id
+        WHERE library_search MATCH ? {kind_clause}
+        ORDER BY library_search.rank
+        LIMIT ?
+    """, params).fetchall()
+
+    return [
+        {
+            "kind": row[0],
+            "id": row[1],
+            "pathologyId": row[2],
+            "pathology": row[3],
+            "phase": row[4],
+            "title": _marked(row[5]),
+            "exercises": _marked(row[6]) or None,
+            "snippet": _marked(row[7]) or None,
+            "score": round(-row[8], 3),
+        }
+        for row in rows
+    ]
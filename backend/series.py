@@ -0,0 +1,106 @@
+"""
+PROJECT VECTOR — Metric History Series
+Calgary Strength & Physio
+
+Read side of /api/client/{id}/metrics/{metric}/series. Values come from the
+trigger-maintained `metric_series` table (v_core.sql §2h), where numeric
+recordings are already REALs with normalized timestamps, so range filters
+and daily/weekly aggregation run entirely in SQLite.
+
+  * Raw: every numeric recording in the range, oldest first.
+  * Bucketed: one row per day or ISO week (Monday start) with min, max,
+    the last value recorded in the bucket, and the recording count.
+  * Downsampled: either series reduced to N points with
+    Largest-Triangle-Three-Buckets (LTTB), which keeps the visual shape
+    (peaks, troughs, trend changes) that plain striding would drop.
+"""
+
+# bucket name -> SQLite expression for the bucket start date
+BUCKET_EXPRESSIONS = {
+    "day": "date(recorded_at)",
+    "week": "date(recorded_at, 'weekday 0', '-6 days')",
+}
+
+
+def _range_clause(start, end):
+    """SQL fragment and params for an inclusive [start, end] date range."""
+    clause, params = "", []
+    if start:
+        clause += " AND recorded_at >= ?"
+        params.append(start)
+    if end:
+        clause += " AND recorded_at < date(?, '+1 day')"
+        params.append(end)
+    return clause, params
+
+
+def raw_series(cursor, journey_id, metric_name, start=None, end=None):
+    """Returns [(x, t, value)]: julian-day x (for LTTB), timestamp, value."""
+    clause, params = _range_clause(start, end)
+    return cursor.execute(f"""
+        SELECT julianday(recorded_at), recorded_at, numeric_value
+        FROM metric_series
+        WHERE journey_id = ? AND metric_name = ?{clause}
+        ORDER BY recorded_at, recording_id
+    """, (journey_id, metric_name, *params)).fetchall()
+
+
+def bucketed_series(cursor, journey_id, metric_name, bucket, start=None, end=None):
+    """Returns [(x, t, min, max, last, count)], one row per non-empty bucket."""
+    clause, params = _range_clause(start, end)
+    return cursor.execute(f"""
+        SELECT
+            julianday(bucket), bucket,
+            MIN(numeric_value), MAX(numeric_value),
+            MAX(CASE WHEN rn = 1 THEN numeric_value END),
+            COUNT(*)
+        FROM (
+            SELECT
+                {BUCKET_EXPRESSIONS[bucket]} as bucket,
+                numeric_value,
+                ROW_NUMBER() OVER (
+                    PARTITION BY {BUCKET_EXPRESSIONS[bucket]}
+                    ORDER BY recorded_at DESC, recording_id DESC
+                ) as rn
+            FROM metric_series
+            WHERE journey_id = ? AND metric_name = ?{clause}
+        )
+        GROUP BY bucket
+        ORDER BY bucket
+    """, (journey_id, metric_name, *params)).fetchall()
+
+
+def lttb(rows, threshold, x=lambda row: row[0], y=lambda row: row[1]):
+    """
+    Largest-Triangle-Three-Buckets downsampling of `rows` (ordered by x) to
+    `threshold` rows. The first and last rows are always kept; each bucket in
+    between contributes the row forming the largest triangle with the row
+    chosen before it and the average of the next bucket.
+    """
+    n = len(rows)
+    if threshold >= n or threshold < 3:
+        return list(rows)
+
+    sampled = [rows[0]]
+    every = (n - 2) / (threshold - 2)
+    a = 0
+    for i in range(threshold - 2):
+        # Average point of the next bucket
+        next_start = int((i + 1) * every) + 1
+        next_end = min(int((i + 2) * every) + 1, n)
+        span = next_end - next_start
+        avg_x = sum(x(rows[j]) for j in range(next_start, next_end)) / span
+        avg_y = sum(y(rows[j]) for j in range(next_start, next_end)) / span
+
+        # Row in this bucket with the largest triangle area
+        ax, ay = x(rows[a]), y(rows[a])
+        best, best_area = None, -1.0
+        for j in range(int(i * every) + 1, int((i + 1) * every) + 1):
+            area = abs((ax - avg_x) * (y(rows[j]) - ay) - (ax - x(rows[j])) * (avg_y - ay))
+            if area > best_area:
+                best, best_area = j, area
+        sampled.append(rows[best])
+        a = best
+
+    sampled.append(rows[-1])
+    return sampled
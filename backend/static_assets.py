@@ -0,0 +1,282 @@
+"""
+PROJECT VECTOR — Static Asset Pipeline
+Calgary Strength & Physio
+
+Serves the frontend/ mount from memory instead of re-reading files per
+request, so clinic Wi-Fi only downloads each script and stylesheet once:
+
+  * JS and CSS files are fingerprinted with a content hash
+    (js/trajectory.js -> js/trajectory.3f9c1a7be2.js) and served with
+    `Cache-Control: public, max-age=31536000, immutable`.
+  * src/href references in the HTML pages are rewritten to the
+    fingerprinted names. Pages themselves keep their URLs and are served
+    `no-cache` with a strong ETag, so a deploy is picked up on the next
+    load and an unchanged page costs a 304.
+  * Every compressible asset is precompressed once (gzip; brotli as well
+    when the `brotli` package is installed) and the variant is chosen from
+    Accept-Encoding.
+
+Original (unfingerprinted) JS/CSS paths still resolve, with no-cache, for
+anything that links to them directly.
+
+The build runs once, at startup via build() (or on first use, off the
+event loop). Each content-coding is its own representation with its own
+strong ETag (the gzip and br variants carry a -gzip / -br suffix).
+
+Development (`reload=True`, VECTOR_STATIC_RELOAD=1): HTML requests re-stat
+the source files at most once per RELOAD_INTERVAL_SECONDS, in the
+threadpool, and rebuild when something changed, so edits under frontend/
+show up on the next page load without a restart. Production never scans.
+"""
+
+import gzip
+import hashlib
+import mimetypes
+import posixpath
+import re
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict
+
+from starlette.concurrency import run_in_threadpool
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional accelerator
+    brotli = None
+
+IMMUTABLE = "public, max-age=31536000, immutable"
+REVALIDATE = "no-cache"
+
+FINGERPRINTED_SUFFIXES = {".js", ".css"}
+COMPRESSIBLE_TYPES = ("text/", "application/javascript", "application/json", "image/svg+xml")
+
+# Development reload: minimum gap between two scans of the directory
+RELOAD_INTERVAL_SECONDS = 1.0
+
+# src="..." / href="..." attribute values in HTML pages
+_REFERENCE = re.compile(r'\b(src|href)="([^"]+)"')
+
+
+@dataclass(frozen=True)
+class Asset:
+    media_type: str
+    etag: str
+    cache_control: str
+    variants: Dict[str, bytes]  # content-coding -> body ("identity" always present)
+
+    def variant_etag(self, coding):
+        """Strong validator of one content-coding: the identity ETag, suffixed for compressed bodies."""
+        return self.etag if coding == "identity" else f'{self.etag[:-1]}-{coding}"'
+
+
+def accepted_encodings(header):
+    """Content-codings with a non-zero q-value in an Accept-Encoding header."""
+    accepted = set()
+    for item in (header or "").split(","):
+        coding, _, params = item.partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if q > 0:
+            accepted.add(coding)
+    return accepted
+
+
+def compress_variants(body, media_type):
+    """identity plus whichever precompressed variants are actually smaller."""
+    variants = {"identity": body}
+    if not media_type.startswith(COMPRESSIBLE_TYPES):
+        return variants
+    # mtime=0 keeps the gzip bytes identical across workers and restarts
+    compressed = gzip.compress(body, compresslevel=9, mtime=0)
+    if len(compressed) < len(body):
+        variants["gzip"] = compressed
+    if brotli is not None:
+        compressed = brotli.compress(body, quality=11)
+        if len(compressed) < len(body):
+            variants["br"] = compressed
+    return variants
+
+
+def _media_type(path):
+    media_type = mimetypes.guess_type(path)[0] or "application/octet-stream"
+    if media_type.startswith("text/") or media_type == "application/javascript":
+        media_type += "; charset=utf-8"
+    return media_type
+
+
+def _route_path(scope):
+    """Request path relative to the mount point."""
+    path, root = scope["path"], scope.get("root_path", "")
+    if root and path.startswith(root):
+        path = path[len(root):]
+    return path
+
+
+class StaticAssets:
+    """ASGI app serving a directory through the fingerprint/precompress pipeline."""
+
+    def __init__(self, directory, html=True, reload=False):
+        self.directory = Path(directory)
+        self.html = html
+        self.reload = reload
+        self._assets: Dict[str, Asset] = {}
+        self._sources = {}
+        self._lock = threading.Lock()
+        self._built = False
+        self._next_scan = 0.0
+
+    # --- Build ---
+
+    def _scan(self):
+        """{relative posix path: (mtime_ns, size)} for every file under the directory."""
+        return {
+            path.relative_to(self.directory).as_posix(): (stat.st_mtime_ns, stat.st_size)
+            for path in sorted(self.directory.rglob("*"))
+            if path.is_file() and not path.name.startswith(".")
+            for stat in (path.stat(),)
+        }
+
+    def build(self):
+        """(Re)build the in-memory asset table from the directory."""
+        sources = self._scan()
+        assets, renamed = {}, {}
+
+        # 1. Fingerprint scripts and stylesheets
+        for rel in sources:
+            if rel.endswith(".html"):
+                continue
+            body = (self.directory / rel).read_bytes()
+            digest = hashlib.sha256(body).hexdigest()
+            media_type = _media_type(rel)
+            variants = compress_variants(body, media_type)
+            if posixpath.splitext(rel)[1] in FINGERPRINTED_SUFFIXES:
+                stem, suffix = posixpath.splitext(rel)
+                renamed[rel] = f"{stem}.{digest[:10]}{suffix}"
+                assets[renamed[rel]] = Asset(media_type, f'"{digest[:32]}"', IMMUTABLE, variants)
+            assets[rel] = Asset(media_type, f'"{digest[:32]}"', REVALIDATE, variants)
+
+        # 2. Point HTML pages at the fingerprinted names
+        for rel in sources:
+            if not rel.endswith(".html"):
+                continue
+            base = posixpath.dirname(rel)
+
+            def rewrite(match):
+                ref = match.group(2)
+                if ref.startswith(("#", "//")) or ":" in ref or "?" in ref:
+                    return match.group(0)
+                target = ref.lstrip("/") if ref.startswith("/") else posixpath.normpath(posixpath.join(base, ref))
+                if target not in renamed:
+                    return match.group(0)
+                new = renamed[target] if ref.startswith("/") else posixpath.relpath(renamed[target], base or ".")
+                return f'{match.group(1)}="{"/" if ref.startswith("/") else ""}{new}"'
+
+            text = (self.directory / rel).read_text(encoding="utf-8")
+            body = _REFERENCE.sub(rewrite, text).encode("utf-8")
+            media_type = _media_type(rel)
+            etag = f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+            assets[rel] = Asset(media_type, etag, REVALIDATE, compress_variants(body, media_type))
+
+        with self._lock:
+            self._assets = assets
+            self._sources = sources
+            self._built = True
+        return assets
+
+    def _refresh(self):
+        """Development only: rebuild if a file changed since the last scan."""
+        with self._lock:
+            now = time.monotonic()
+            if now < self._next_scan:
+                return
+            self._next_scan = now + RELOAD_INTERVAL_SECONDS
+        if self._scan() != self._sources:
+            self.build()
+
+    async def _lookup(self, path):
+        if not self._built:
+            # Not built at startup: build once, off the event loop
+            await run_in_threadpool(self.build)
+        elif self.reload and path.endswith(".html"):
+            # A page load is the moment a changed frontend/ file must show up
+            await run_in_threadpool(self._refresh)
+        with self._lock:
+            return self._assets.get(path)
+
+    # --- ASGI ---
+
+    async def __call__(self, scope, receive, send):
+        assert scope["type"] == "http"
+        if scope["method"] not in ("GET", "HEAD"):
+            await self._send(send, 405, [(b"allow", b"GET, HEAD")], b"Method Not Allowed")
+            return
+
+        path = _route_path(scope).lstrip("/")
+        if self.html and (path == "" or path.endswith("/")):
+            path += "index.html"
+        # Lookups are keys of the built table, so paths can't escape the directory
+        asset = await self._lookup(path)
+        if asset is None and self.html:
+            asset = await self._lookup(posixpath.join(path, "index.html"))
+        if asset is None:
+            await self._send(send, 404, [], b"Not Found")
+            return
+
+        request_headers = dict(scope.get("headers", ()))
+        coding = self._negotiate(asset, request_headers.get(b"accept-encoding", b"").decode("latin-1"))
+        etag = asset.variant_etag(coding)
+        headers = [
+            (b"etag", etag.encode()),
+            (b"cache-control", asset.cache_control.encode()),
+        ]
+        if len(asset.variants) > 1:
+            headers.append((b"vary", b"Accept-Encoding"))
+
+        if_none_match = request_headers.get(b"if-none-match", b"").decode("latin-1")
+        if etag in (tag.strip().removeprefix("W/") for tag in if_none_match.split(",")):
+            await self._send(send, 304, headers, b"")
+            return
+
+        body = asset.variants[coding]
+        headers.append((b"content-type", asset.media_type.encode()))
+        if coding != "identity":
+            headers.append((b"content-encoding", coding.encode()))
+        headers.append((b"content-length", str(len(body)).encode()))
+        await self._send(send, 200, headers, b"" if scope["method"] == "HEAD" else body, sized=True)
+
+    @staticmethod
+    def _negotiate(asset, accept_encoding):
+        accepted = accepted_encodings(accept_encoding)
+        for coding in ("br", "gzip"):
+            if coding in asset.variants and (coding in accepted or "*" in accepted):
+                return coding
+        return "identity"
+
+    @staticmethod
+    async def _send(send, status, headers, body, sized=False):
+        if not sized:
+            headers = [*headers, (b"content-length", str(len(body)).encode())]
+            if body:
+                headers.append((b"content-type", b"text/plain; charset=utf-8"))
+        await send({"type": "http.response.start", "status": status, "headers": headers})
+        await send({"type": "http.response.body", "body": body})
+
+    def stats(self):
+        with self._lock:
+            return {
+                "assets": len(self._assets),
+                "fingerprinted": sum(1 for a in self._assets.values() if a.cache_control == IMMUTABLE),
+                "brotli": brotli is not None,
+            }
@@ -0,0 +1,113 @@
+"""
+PROJECT VECTOR — Offline Snapshots & Delta Sync
+Calgary Strength & Physio
+
+Server side of the offline-first frontend (frontend/js/offline_store.js).
+A tablet keeps one snapshot per client in IndexedDB, renders from it on
+every load without waiting for the network, then asks only for what
+changed since the snapshot's sequence number.
+
+  * Snapshot — GET /api/client/{id}/snapshot: the full TRAJECTORY payload
+    (protocol tree, every criterion's current value and met flag) wrapped
+    with the sync cursor it is current to:
+        {"format":1,"seq":N,"protocolVersion":"PATH_ACL_01:3:12","journey":{...}}
+  * Delta — GET /api/client/{id}/sync?since=N&protocolVersion=...: the
+    journey_changes log (v_core.sql §2i) after seq N, reduced to its net
+    effect on the journey:
+        {"seq":M,"reset":false,"criteria":[{"id","current","met"}],"phase":{...}|null}
+    `criteria` holds the re-evaluated value and met flag of every criterion
+    whose latest value may have moved (a recording inserted, deleted or
+    both within the window), so the client patches its stored journey
+    without evaluating targets or replaying individual recordings itself.
+    `phase` is set when the journey changed phase.
+
+A snapshot is tied to its protocolVersion (pathology, pathology version,
+library version). When that moves, when the cursor is ahead of the server
+(restored database) or when the backlog is larger than SYNC_CHANGES_MAX,
+the delta is {"reset": true} and the client fetches a new snapshot.
+
+The cursor is read before the journey, so a write landing in between is
+sent again by the next delta; applying a delta twice is harmless.
+"""
+
+from backend.journey_json import current_value, dumps
+
+SNAPSHOT_FORMAT = 1
+
+# Beyond this many logged changes a fresh snapshot is smaller than the delta
+SYNC_CHANGES_MAX = 500
+
+
+def current_seq(cursor):
+    """Highest journey_changes sequence number (0 on an empty log)."""
+    return cursor.execute("SELECT COALESCE(MAX(seq), 0) FROM journey_changes").fetchone()[0]
+
+
+def bundle_version(journey):
+    """Protocol identity a stored snapshot was rendered against."""
+    return f"{journey['pathology_id']}:{journey['version']}:{journey['library_version']}"
+
+
+def render_snapshot(seq, journey, body):
+    """Wrap pre-encoded journey payload bytes into a snapshot bundle."""
+    header = dumps({
+        "format": SNAPSHOT_FORMAT,
+        "seq": seq,
+        "protocolVersion": bundle_version(journey),
+    })
+    return header[:-1] + b',"journey":' + body + b"}"
+
+
+def reset_delta(seq):
+    return {"seq": seq, "reset": True}
+
+
+def journey_delta(cursor, protocol, journey, since, seq):
+    """Changes to one journey in (since, seq], or a reset if the backlog is too long."""
+    journey_id = journey["journey_id"]
+    rows = cursor.execute("""
+        SELECT kind, criterion_id FROM journey_changes
+        WHERE journey_id = ? AND seq > ? AND seq <= ?
+        ORDER BY seq
+        LIMIT ?
+    """, (journey_id, since, seq, SYNC_CHANGES_MAX + 1)).fetchall()
+    if len(rows) > SYNC_CHANGES_MAX:
+        return reset_delta(seq)
+
+    touched, phase_moved = {}, False
+    for kind, criterion_id in rows:
+        if kind == "journey":
+            phase_moved = True
+        elif criterion_id is not None:
+            touched[criterion_id] = None
+
+    # Re-evaluate only the criteria those recordings could have moved
+    criteria = []
+    if touched:
+        ids = list(touched)
+        latest = dict(cursor.execute(f"""
+            SELECT criterion_id, recorded_value FROM latest_metric
+            WHERE journey_id = ? AND criterion_id IN ({",".join("?" * len(ids))})
+        """, [journey_id, *ids]).fetchall())
+        for criterion_id in ids:
+            _, crit = protocol.criterion(criterion_id)
+            if crit is None:
+                continue
+            value = latest.get(criterion_id)
+            criteria.append({"id": crit.id, "current": current_value(crit, value), "met": crit.is_met(value)})
+
+    phase = None
+    if phase_moved:
+        phase_ids = [ph.id for ph in protocol.phases]
+        current = journey["current_phase_id"]
+        phase = {
+            "currentPhaseId": current,
+            "currentPhaseIndex": phase_ids.index(current) if current in phase_ids else -1,
+        }
+
+    return {
+        "seq": seq,
+        "reset": False,
+        "criteria": criteria,
+        "phase": phase,
+    }
@@ -0,0 +1,234 @@
+"""
+PROJECT VECTOR — Durable Webhook Ingestion Queue
+Calgary Strength & Physio
+
+/webhooks/janeapp only verifies the signature and appends the raw payload to
+the `webhook_queue` table, then returns 202. A small pool of background
+threads per worker drains the table in batches on the pooled write
+connection, so a burst of treatment notes never blocks the event loop.
+
+  * Idempotency: `event_id` is UNIQUE. A JaneApp retry of the same
+    treatment note is acknowledged but not queued twice.
+  * Claiming: a reader probe finds claimable rows first; only then are
+    they leased with BEGIN IMMEDIATE, so the drainers of every gunicorn
+    worker share one queue and an idle poll never takes the write lock.
+    A lease that expires (a worker died mid-batch) makes the row
+    claimable again.
+  * Retry: a failing event is retried with exponential backoff, then
+    parked as 'failed' after `max_attempts` for manual review.
+  * Enqueues go through the write buffer (backend/write_buffer.py) when
+    one is given, so a burst of deliveries shares group commits.
+  * Backpressure: `depth` is refreshed after every drain pass that did
+    work (and while rows are outstanding elsewhere); the webhook
+    answers 503 + Retry-After once it reaches the high-water mark.
+"""
+
+import logging
+import threading
+import time
+
+from backend.profiling import profile_connection, profiled
+
+logger = logging.getLogger(__name__)
+
+
+class WebhookQueue:
+    """SQLite-backed work queue drained by background threads."""
+
+    def __init__(self, pool, workers=2, batch_size=50, max_attempts=5,
+                 lease_seconds=60, retry_base_seconds=2.0, poll_interval=1.0,
+                 high_water=10000, write_buffer=None):
+        self.pool = pool
+        self.write_buffer = write_buffer
+        self.workers = workers
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.lease_seconds = lease_seconds
+        self.retry_base_seconds = retry_base_seconds
+        self.poll_interval = poll_interval
+        self.high_water = high_water
+
+        self._handler = None
+        self._threads = []
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._stats_lock = threading.Lock()
+
+        self.depth = 0
+        self.enqueued = 0
+        self.duplicates = 0
+        self.processed = 0
+        self.retried = 0
+        self.failed = 0
+        self.last_batch_ms = 0.0
+
+    # --- Producer side ---
+
+    def enqueue(self, event_id, event_type, payload):
+        """Persist a raw payload. Returns False if `event_id` was already queued."""
+        def insert(cursor):
+            cursor.execute("""
+                INSERT OR IGNORE INTO webhook_queue (event_id, event_type, payload, next_attempt_at)
+                VALUES (?, ?, ?, ?)
+            """, (event_id, event_type, payload, time.time()))
+            return cursor.rowcount == 1
+
+        if self.write_buffer is not None:
+            # PERF: Share a commit with whatever else is being written
+            inserted = self.write_buffer.submit(insert).result()
+        else:
+            with self.pool.writer() as conn:
+                inserted = insert(profile_connection(conn).cursor())
+
+        with self._stats_lock:
+            if inserted:
+                self.enqueued += 1
+                self.depth += 1
+            else:
+                self.duplicates += 1
+        if inserted:
+            self._wake.set()
+        return inserted
+
+    def saturated(self):
+        return self.depth >= self.high_water
+
+    # --- Consumer side ---
+
+    def start(self, handler):
+        """
+        Start the drain threads. `handler(cursor, payload, received_at)`
+        applies one event inside the write transaction (`received_at` is the
+        row's UTC 'YYYY-MM-DD HH:MM:SS' arrival time); raising marks it for
+        retry.
+        """
+        if self._threads:
+            return
+        self._handler = handler
+        self._stop.clear()
+        self.refresh_depth()
+        for n in range(self.workers):
+            thread = threading.Thread(target=self._run, name=f"webhook-drain-{n}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self, timeout=5.0):
+        self._stop.set()
+        self._wake.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                drained = self.drain_once()
+            except Exception:
+                logger.exception("WEBHOOK QUEUE: drain pass failed")
+                drained = 0
+            if not drained:
+                self._wake.wait(self.poll_interval)
+                self._wake.clear()
+
+    def drain_once(self):
+        """Claim and apply one batch. Returns the number of events handled."""
+        batch = self._claim()
+        if not batch:
+            if self.depth:
+                # Rows outstanding but none claimable here: track other workers' progress
+                self.refresh_depth()
+            return 0
+
+        started = time.perf_counter()
+        done, retry, failed = [], [], []
+        with profiled("webhook_queue.drain"), self.pool.writer() as conn:
+            cursor = profile_connection(conn).cursor()
+            # One transaction for the batch; each event gets its own savepoint
+            cursor.execute("BEGIN IMMEDIATE")
+            for row in batch:
+                try:
+                    with self.pool.savepoint(cursor, "webhook_event"):
+                        self._handler(cursor, row["payload"], row["received_at"])
+                except Exception as e:
+                    attempts = row["attempts"] + 1
+                    if attempts >= self.max_attempts:
+                        failed.append((attempts, str(e), row["id"]))
+                    else:
+                        delay = self.retry_base_seconds * (2 ** (attempts - 1))
+                        retry.append((attempts, str(e), time.time() + delay, row["id"]))
+                    logger.warning(f"WEBHOOK QUEUE: event {row['event_id']} attempt {attempts} failed: {e}")
+                else:
+                    done.append((row["id"],))
+
+            cursor.executemany("""
+                UPDATE webhook_queue SET status = 'done', processed_at = datetime('now') WHERE id = ?
+            """, done)
+            cursor.executemany("""
+                UPDATE webhook_queue SET status = 'pending', attempts = ?, last_error = ?, next_attempt_at = ?
+                WHERE id = ?
+            """, retry)
+            cursor.executemany("""
+                UPDATE webhook_queue SET status = 'failed', attempts = ?, last_error = ?, processed_at = datetime('now')
+                WHERE id = ?
+            """, failed)
+
+        with self._stats_lock:
+            self.processed += len(done)
+            self.retried += len(retry)
+            self.failed += len(failed)
+            self.last_batch_ms = (time.perf_counter() - started) * 1000
+        self.refresh_depth()
+        return len(batch)
+
+    def _claim(self):
+        now = time.time()
+        # PERF: Probe on a reader first so an idle poll never takes the
+        # database write lock away from metric writes
+        with self.pool.reader() as conn:
+            claimable = conn.execute("""
+                SELECT 1 FROM webhook_queue
+                WHERE status IN ('pending', 'processing') AND next_attempt_at <= ?
+                LIMIT 1
+            """, (now,)).fetchone()
+        if claimable is None:
+            return []
+
+        with self.pool.writer() as conn:
+            # Take the write lock up front so another process can't claim the same rows
+            conn.execute("BEGIN IMMEDIATE")
+            rows = conn.execute("""
+                SELECT id, event_id, payload, attempts, received_at FROM webhook_queue
+                WHERE (status = 'pending' AND next_attempt_at <= ?)
+                   OR (status = 'processing' AND next_attempt_at <= ?)
+                ORDER BY id
+                LIMIT ?
+            """, (now, now, self.batch_size)).fetchall()
+            if rows:
+                # While processing, next_attempt_at doubles as the lease expiry
+                conn.executemany("""
+                    UPDATE webhook_queue SET status = 'processing', next_attempt_at = ? WHERE id = ?
+                """, [(now + self.lease_seconds, row["id"]) for row in rows])
+        return rows
+
+    def refresh_depth(self):
+        with self.pool.reader() as conn:
+            depth = conn.execute("""
+                SELECT COUNT(*) FROM webhook_queue WHERE status IN ('pending', 'processing')
+            """).fetchone()[0]
+        with self._stats_lock:
+            self.depth = depth
+
+    def stats(self):
+        with self._stats_lock:
+            return {
+                "depth": self.depth,
+                "high_water": self.high_water,
+                "saturated": self.depth >= self.high_water,
+                "workers": len(self._threads),
+                "enqueued": self.enqueued,
+                "duplicates": self.duplicates,
+                "processed": self.processed,
+                "retried": self.retried,
+                "failed": self.failed,
+                "last_batch_ms": round(self.last_batch_ms, 2),
+            }
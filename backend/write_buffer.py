@@ -0,0 +1,201 @@
+"""
+PROJECT VECTOR — Group-Commit Write Buffer
+Calgary Strength & Physio
+
+Small writes (one recording, one webhook enqueue) used to take the worker's
+write connection and commit a transaction each, so a burst of requests
+queued on the write lock and on SQLite's own lock against the other
+gunicorn workers. The buffer funnels them through one writer thread that
+commits them in groups:
+
+  * submit(work, keys) queues `work(cursor)` and returns a Future. The
+    writer takes everything queued (lingering up to `linger` seconds for
+    more, up to `max_batch` units) and runs it in one BEGIN IMMEDIATE
+    transaction, each unit under its own savepoint so a failing unit
+    (404, unknown metric) is rolled back alone, together with any live
+    events it queued for after the commit.
+  * Futures resolve once the group has committed: awaiting one gives
+    group commit with the same durability as before; not awaiting it gives
+    write-behind (/api/metric/stream).
+  * Read-your-writes: `keys` (client ids) stay pending until their unit
+    commits, and wait_for(key) blocks a reader until then. This holds
+    within a worker; a read served by another worker sees the write after
+    the flush (a few milliseconds).
+  * Backpressure: saturated() once `high_water` units are queued.
+
+Before start() (scripts, tests without the app lifespan) submit() runs the
+unit inline on the pool's writer.
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+
+from backend.profiling import profile_connection, profiled
+
+logger = logging.getLogger(__name__)
+
+
+class _Unit:
+    __slots__ = ("work", "keys", "future")
+
+    def __init__(self, work, keys, future):
+        self.work = work
+        self.keys = keys
+        self.future = future
+
+
+class WriteBuffer:
+    """Single writer thread committing queued write units in groups."""
+
+    def __init__(self, pool, linger=0.002, max_batch=500, high_water=20000):
+        self.pool = pool
+        self.linger = linger
+        self.max_batch = max_batch
+        self.high_water = high_water
+
+        self._cond = threading.Condition()
+        self._queue = deque()
+        self._pending = {}  # key -> units queued or in flight
+        self._thread = None
+        self._stop = False
+
+        self.submitted = 0
+        self.committed = 0
+        self.failed = 0
+        self.flushes = 0
+        self.largest_group = 0
+        self.last_flush_ms = 0.0
+
+    # --- Producer side ---
+
+    def submit(self, work, keys=()):
+        """Queue `work(cursor)`; the Future holds its return value once committed."""
+        future = Future()
+        keys = tuple(keys)
+        with self._cond:
+            running = self._thread is not None
+            if running:
+                self._queue.append(_Unit(work, keys, future))
+                for key in keys:
+                    self._pending[key] = self._pending.get(key, 0) + 1
+                self.submitted += 1
+                self._cond.notify_all()
+        if not running:
+            self._flush([_Unit(work, (), future)])
+        return future
+
+    def saturated(self):
+        return len(self._queue) >= self.high_water
+
+    def wait_for(self, key, timeout=1.0):
+        """
+        Block until every unit submitted under `key` has committed.
+        Returns False if `timeout` ran out first.
+        """
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while self._pending.get(key):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    # --- Writer thread ---
+
+    def start(self):
+        with self._cond:
+            if self._thread is not None:
+                return
+            self._stop = False
+            self._thread = threading.Thread(target=self._run, name="write-buffer", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=5.0):
+        """Flush whatever is queued, then stop the writer."""
+        with self._cond:
+            thread = self._thread
+            self._stop = True
+            self._cond.notify_all()
+        if thread is not None:
+            thread.join(timeout)
+        with self._cond:
+            self._thread = None
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._queue and not self._stop:
+                    self._cond.wait()
+                if not self._queue:
+                    return
+                if self.linger and len(self._queue) < self.max_batch and not self._stop:
+                    # Linger so concurrent submitters share the commit
+                    self._cond.wait_for(lambda: len(self._queue) >= self.max_batch or self._stop, self.linger)
+                group = [self._queue.popleft() for _ in range(min(len(self._queue), self.max_batch))]
+
+            try:
+                self._flush(group)
+            except Exception:
+                logger.exception("WRITE BUFFER: flush failed")
+
+            with self._cond:
+                for unit in group:
+                    for key in unit.keys:
+                        left = self._pending.get(key, 0) - 1
+                        if left > 0:
+                            self._pending[key] = left
+                        else:
+                            self._pending.pop(key, None)
+                self._cond.notify_all()
+
+    def _flush(self, group):
+        """Apply `group` in one transaction, then resolve each unit's Future."""
+        started = time.perf_counter()
+        outcomes = []
+        try:
+            with profiled("write_buffer.flush"), self.pool.writer() as conn:
+                cursor = profile_connection(conn).cursor()
+                cursor.execute("BEGIN IMMEDIATE")
+                for unit in group:
+                    try:
+                        with self.pool.savepoint(cursor, "buffered_write"):
+                            outcomes.append((True, unit.work(cursor)))
+                    except Exception as e:
+                        outcomes.append((False, e))
+        except Exception as e:
+            # BEGIN or COMMIT failed: nothing in the group was written
+            outcomes = [(False, e)] * len(group)
+
+        failed = sum(1 for ok, _ in outcomes if not ok)
+        with self._cond:
+            self.flushes += 1
+            self.committed += len(group) - failed
+            self.failed += failed
+            self.largest_group = max(self.largest_group, len(group))
+            self.last_flush_ms = (time.perf_counter() - started) * 1000
+
+        for unit, (ok, value) in zip(group, outcomes):
+            if ok:
+                unit.future.set_result(value)
+            else:
+                unit.future.set_exception(value)
+
+    def stats(self):
+        with self._cond:
+            return {
+                "running": self._thread is not None,
+                "depth": len(self._queue),
+                "high_water": self.high_water,
+                "saturated": len(self._queue) >= self.high_water,
+                "submitted": self.submitted,
+                "committed": self.committed,
+                "failed": self.failed,
+                "flushes": self.flushes,
+                "mean_group": round((self.committed + self.failed) / self.flushes, 2) if self.flushes else 0.0,
+                "largest_group": self.largest_group,
+                "last_flush_ms": round(self.last_flush_ms, 2),
+            }
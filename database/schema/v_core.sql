@@ -81,8 +81,8 @@ CREATE TABLE IF NOT EXISTS exit_criteria (
     id                TEXT PRIMARY KEY,          -- e.g., 'EC_ACL_01_P1_01'
     phase_id          TEXT NOT NULL,
     metric_name       TEXT NOT NULL,             -- 'knee_extension', 'pain_level', 'quad_strength'
-    target_operator   TEXT NOT NULL DEFAULT '>=',-- '>=', '<=', '=', '<', '>'
-    target_value      TEXT NOT NULL,             -- '0', '2', '80'
+    target_operator   TEXT NOT NULL DEFAULT '>=',-- '>=', '<=', '=', '<', '>', 'between'
+    target_value      TEXT NOT NULL,             -- '0', '2', '80', '0..10' (between)
     measurement_unit  TEXT,                      -- 'degrees', 'VAS (0-10)', '% limb symmetry'
     measurement_tool  TEXT,                      -- 'Goniometer', 'Dynamometer', 'VAS Scale'
     description       TEXT,                      -- 'Full knee extension (0 degrees)'
@@ -127,6 +127,239 @@ CREATE TABLE IF NOT EXISTS programming_slots (
 CREATE INDEX IF NOT EXISTS idx_slots_phase ON programming_slots(phase_id);
 CREATE INDEX IF NOT EXISTS idx_slots_type ON programming_slots(slot_type);
 
+-- ---------------------------------------------------------------------------
+-- 1e. Library Version — Protocol Cache Invalidation Counter
+-- ---------------------------------------------------------------------------
+-- Single-row counter bumped by scripts/load_base.py on every reload.
+-- API workers compare it against their in-memory protocol cache and drop
+-- stale entries without re-reading the protocol tables.
+-- ---------------------------------------------------------------------------
+CREATE TABLE IF NOT EXISTS library_version (
+    id                INTEGER PRIMARY KEY CHECK (id = 1),
+    counter           INTEGER NOT NULL DEFAULT 0,
+    updated_at        DATETIME DEFAULT (datetime('now'))
+);
+
+INSERT OR IGNORE INTO library_version (id, counter) VALUES (1, 0);
+
+-- ---------------------------------------------------------------------------
+-- 1f. Protocol Hashes — Incremental Loader Bookkeeping
+-- ---------------------------------------------------------------------------
+-- SHA-256 of each seed protocol subtree as last applied by load_base.py.
+-- Unchanged protocols are skipped without reading their rows; changed ones
+-- are diffed row by row and only the differing rows are written.
+-- ---------------------------------------------------------------------------
+CREATE TABLE IF NOT EXISTS protocol_hashes (
+    pathology_id      TEXT PRIMARY KEY,
+    content_hash      TEXT NOT NULL,
+    updated_at        DATETIME DEFAULT (datetime('now')),
+    FOREIGN KEY(pathology_id) REFERENCES pathologies(id) ON DELETE CASCADE
+);
+
+-- ---------------------------------------------------------------------------
+-- 1g. Library Search — FTS5 Index over the Living Library
+-- ---------------------------------------------------------------------------
+-- One row per searchable item, kept in step with the protocol tables by
+-- the triggers below, so the incremental loader (which only writes rows
+-- that changed) re-indexes only those rows. Protocol Vault documents
+-- (database/protocols/*.md) are synced by load_base.sync_documents().
+--
+--   kind       ref_id                       title             exercises
+--   pathology  pathologies.id               name              —
+--   phase      phases.id                    name              —
+--   slot       programming_slots.id         slot_type         standard | regression | progression | high-density
+--   document   '<file stem>#<section>'      section heading   —
+--
+-- library_search is an external-content FTS5 table over
+-- library_search_content; the trg_search_content_* triggers mirror every
+-- write into it. Queried by backend/search.py (GET /api/search).
+-- ---------------------------------------------------------------------------
+CREATE TABLE IF NOT EXISTS library_search_content (
+    id                INTEGER PRIMARY KEY,
+    kind              TEXT NOT NULL,             -- 'pathology', 'phase', 'slot', 'document'
+    ref_id            TEXT NOT NULL,
+    pathology_id      TEXT,                      -- Owning pathology (NULL for unlinked documents)
+    phase_id          TEXT,                      -- Owning phase (phase and slot rows)
+    title             TEXT NOT NULL,
+    exercises         TEXT NOT NULL DEFAULT '',
+    body              TEXT NOT NULL DEFAULT '',
+    UNIQUE(kind, ref_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_search_content_phase ON library_search_content(phase_id);
+
+CREATE VIRTUAL TABLE IF NOT EXISTS library_search USING fts5(
+    title, exercises, body,
+    content = 'library_search_content',
+    content_rowid = 'id',
+    tokenize = 'porter unicode61'
+);
+
+-- Default ranking: BM25 weighting title over exercise names over body text
+INSERT INTO library_search (library_search, rank) VALUES ('rank', 'bm25(10.0, 5.0, 1.0)');
+
+CREATE TRIGGER IF NOT EXISTS trg_search_content_insert
+AFTER INSERT ON library_search_content
+BEGIN
+    INSERT INTO library_search (rowid, title, exercises, body)
+    VALUES (NEW.id, NEW.title, NEW.exercises, NEW.body);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_search_content_delete
+AFTER DELETE ON library_search_content
+BEGIN
+    INSERT INTO library_search (library_search, rowid, title, exercises, body)
+    VALUES ('delete', OLD.id, OLD.title, OLD.exercises, OLD.body);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_search_content_update
+AFTER UPDATE OF title, exercises, body ON library_search_content
+BEGIN
+    INSERT INTO library_search (library_search, rowid, title, exercises, body)
+    VALUES ('delete', OLD.id, OLD.title, OLD.exercises, OLD.body);
+    INSERT INTO library_search (rowid, title, exercises, body)
+    VALUES (NEW.id, NEW.title, NEW.exercises, NEW.body);
+END;
+
+-- Pathologies: name, region, mechanism, OSICS code, source, contraindications
+CREATE TRIGGER IF NOT EXISTS trg_search_pathology_insert
+AFTER INSERT ON pathologies
+BEGIN
+    INSERT INTO library_search_content (kind, ref_id, pathology_id, title, body)
+    VALUES (
+        'pathology', NEW.id, NEW.id, NEW.name,
+        trim(COALESCE(NEW.body_region, '') || ' ' || COALESCE(NEW.injury_mechanism, '') || ' ' ||
+             COALESCE(NEW.osics_code, '') || ' ' || COALESCE(NEW.research_source, '') || ' ' ||
+             COALESCE(NEW.contraindications, ''))
+    )
+    ON CONFLICT(kind, ref_id) DO UPDATE SET
+        pathology_id = excluded.pathology_id,
+        title        = excluded.title,
+        body         = excluded.body;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_search_pathology_update
+AFTER UPDATE OF name, osics_code, body_region, injury_mechanism, research_source, contraindications ON pathologies
+BEGIN
+    UPDATE library_search_content SET
+        title = NEW.name,
+        body  = trim(COALESCE(NEW.body_region, '') || ' ' || COALESCE(NEW.injury_mechanism, '') || ' ' ||
+                     COALESCE(NEW.osics_code, '') || ' ' || COALESCE(NEW.research_source, '') || ' ' ||
+                     COALESCE(NEW.contraindications, ''))
+    WHERE kind = 'pathology' AND ref_id = NEW.id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_search_pathology_delete
+AFTER DELETE ON pathologies
+BEGIN
+    DELETE FROM library_search_content WHERE kind = 'pathology' AND ref_id = OLD.id;
+END;
+
+-- Phases: name, description, precautions, typical duration
+CREATE TRIGGER IF NOT EXISTS trg_search_phase_insert
+AFTER INSERT ON phases
+BEGIN
+    INSERT INTO library_search_content (kind, ref_id, pathology_id, phase_id, title, body)
+    VALUES (
+        'phase', NEW.id, NEW.pathology_id, NEW.id, NEW.name,
+        trim(COALESCE(NEW.description, '') || ' ' || COALESCE(NEW.precautions, '') || ' ' ||
+             COALESCE(NEW.typical_duration, ''))
+    )
+    ON CONFLICT(kind, ref_id) DO UPDATE SET
+        pathology_id = excluded.pathology_id,
+        phase_id     = excluded.phase_id,
+        title        = excluded.title,
+        body         = excluded.body;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_search_phase_update
+AFTER UPDATE OF pathology_id, name, description, typical_duration, precautions ON phases
+BEGIN
+    UPDATE library_search_content SET
+        pathology_id = NEW.pathology_id,
+        title        = NEW.name,
+        body         = trim(COALESCE(NEW.description, '') || ' ' || COALESCE(NEW.precautions, '') || ' ' ||
+                            COALESCE(NEW.typical_duration, ''))
+    WHERE kind = 'phase' AND ref_id = NEW.id;
+    UPDATE library_search_content SET pathology_id = NEW.pathology_id
+    WHERE kind = 'slot' AND phase_id = NEW.id AND pathology_id IS NOT NEW.pathology_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_search_phase_delete
+AFTER DELETE ON phases
+BEGIN
+    DELETE FROM library_search_content WHERE kind = 'phase' AND ref_id = OLD.id;
+END;
+
+-- Programming slots: the four exercise options are their own column so
+-- exercise-name hits outrank passing mentions in rationale text
+CREATE TRIGGER IF NOT EXISTS trg_search_slot_insert
+AFTER INSERT ON programming_slots
+BEGIN
+    INSERT INTO library_search_content (kind, ref_id, pathology_id, phase_id, title, exercises, body)
+    SELECT
+        'slot', NEW.id, ph.pathology_id, NEW.phase_id, NEW.slot_type,
+        NEW.standard_exercise || ' | ' || COALESCE(NEW.regression, '') || ' | ' ||
+            COALESCE(NEW.progression, '') || ' | ' || COALESCE(NEW.high_density_option, ''),
+        trim(COALESCE(NEW.intent_description, '') || ' ' || COALESCE(NEW.high_density_rationale, '') || ' ' ||
+             COALESCE(NEW.sets_reps_guidance, '') || ' ' || COALESCE(NEW.frequency, ''))
+    FROM phases ph
+    WHERE ph.id = NEW.phase_id
+    ON CONFLICT(kind, ref_id) DO UPDATE SET
+        pathology_id = excluded.pathology_id,
+        phase_id     = excluded.phase_id,
+        title        = excluded.title,
+        exercises    = excluded.exercises,
+        body         = excluded.body;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_search_slot_update
+AFTER UPDATE OF phase_id, slot_type, intent_description, standard_exercise, regression, progression,
+                high_density_option, high_density_rationale, sets_reps_guidance, frequency ON programming_slots
+BEGIN
+    UPDATE library_search_content SET
+        pathology_id = (SELECT pathology_id FROM phases WHERE id = NEW.phase_id),
+        phase_id     = NEW.phase_id,
+        title        = NEW.slot_type,
+        exercises    = NEW.standard_exercise || ' | ' || COALESCE(NEW.regression, '') || ' | ' ||
+                       COALESCE(NEW.progression, '') || ' | ' || COALESCE(NEW.high_density_option, ''),
+        body         = trim(COALESCE(NEW.intent_description, '') || ' ' || COALESCE(NEW.high_density_rationale, '') || ' ' ||
+                            COALESCE(NEW.sets_reps_guidance, '') || ' ' || COALESCE(NEW.frequency, ''))
+    WHERE kind = 'slot' AND ref_id = NEW.id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_search_slot_delete
+AFTER DELETE ON programming_slots
+BEGIN
+    DELETE FROM library_search_content WHERE kind = 'slot' AND ref_id = OLD.id;
+END;
+
+-- Backfill for databases created before the search index existed (no-op otherwise)
+INSERT OR IGNORE INTO library_search_content (kind, ref_id, pathology_id, title, body)
+SELECT
+    'pathology', id, id, name,
+    trim(COALESCE(body_region, '') || ' ' || COALESCE(injury_mechanism, '') || ' ' ||
+         COALESCE(osics_code, '') || ' ' || COALESCE(research_source, '') || ' ' ||
+         COALESCE(contraindications, ''))
+FROM pathologies;
+
+INSERT OR IGNORE INTO library_search_content (kind, ref_id, pathology_id, phase_id, title, body)
+SELECT
+    'phase', id, pathology_id, id, name,
+    trim(COALESCE(description, '') || ' ' || COALESCE(precautions, '') || ' ' ||
+         COALESCE(typical_duration, ''))
+FROM phases;
+
+INSERT OR IGNORE INTO library_search_content (kind, ref_id, pathology_id, phase_id, title, exercises, body)
+SELECT
+    'slot', s.id, ph.pathology_id, s.phase_id, s.slot_type,
+    s.standard_exercise || ' | ' || COALESCE(s.regression, '') || ' | ' ||
+        COALESCE(s.progression, '') || ' | ' || COALESCE(s.high_density_option, ''),
+    trim(COALESCE(s.intent_description, '') || ' ' || COALESCE(s.high_density_rationale, '') || ' ' ||
+         COALESCE(s.sets_reps_guidance, '') || ' ' || COALESCE(s.frequency, ''))
+FROM programming_slots s
+JOIN phases ph ON ph.id = s.phase_id;
+
 
 -- =============================================================================
 -- SECTION 2: CLIENT JOURNEY TABLES (The TRAJECTORY Tracker)
@@ -217,9 +450,242 @@ CREATE TABLE IF NOT EXISTS metric_recordings (
     FOREIGN KEY(criterion_id) REFERENCES exit_criteria(id)
 );
 
-CREATE INDEX IF NOT EXISTS idx_metrics_journey ON metric_recordings(journey_id);
+-- Covering index for "latest value of criterion X for journey Y": the seek on
+-- (journey_id, criterion_id) lands on rows already ordered by recorded_at,
+-- and recorded_value rides along so the table itself is never touched.
+-- It also serves every journey_id-only lookup, replacing idx_metrics_journey.
+CREATE INDEX IF NOT EXISTS idx_metrics_journey_criterion_time
+    ON metric_recordings(journey_id, criterion_id, recorded_at, recorded_value);
+DROP INDEX IF EXISTS idx_metrics_journey;
 CREATE INDEX IF NOT EXISTS idx_metrics_criterion ON metric_recordings(criterion_id);
 
+-- ---------------------------------------------------------------------------
+-- 2e. Latest Metric — Most Recent Recording per (Journey, Criterion)
+-- ---------------------------------------------------------------------------
+-- Maintained by triggers on metric_recordings so the TRAJECTORY view and
+-- caseload readiness read one row per criterion, however many historical
+-- measurements a client has. Ties on recorded_at go to the later insert,
+-- matching the ORDER BY recorded_at DESC, rowid DESC reads it replaces.
+-- ---------------------------------------------------------------------------
+CREATE TABLE IF NOT EXISTS latest_metric (
+    journey_id        TEXT NOT NULL,
+    criterion_id      TEXT NOT NULL,
+    recording_id      TEXT NOT NULL,
+    recorded_value    TEXT NOT NULL,
+    measurement_unit  TEXT,
+    recorded_at       DATETIME,
+    PRIMARY KEY (journey_id, criterion_id),
+    FOREIGN KEY(journey_id) REFERENCES client_journeys(id) ON DELETE CASCADE
+) WITHOUT ROWID;
+
+CREATE TRIGGER IF NOT EXISTS trg_latest_metric_insert
+AFTER INSERT ON metric_recordings
+WHEN NEW.criterion_id IS NOT NULL
+BEGIN
+    INSERT INTO latest_metric (journey_id, criterion_id, recording_id, recorded_value, measurement_unit, recorded_at)
+    VALUES (NEW.journey_id, NEW.criterion_id, NEW.id, NEW.recorded_value, NEW.measurement_unit, NEW.recorded_at)
+    ON CONFLICT(journey_id, criterion_id) DO UPDATE SET
+        recording_id     = excluded.recording_id,
+        recorded_value   = excluded.recorded_value,
+        measurement_unit = excluded.measurement_unit,
+        recorded_at      = excluded.recorded_at
+    WHERE excluded.recorded_at >= latest_metric.recorded_at
+       OR latest_metric.recorded_at IS NULL;
+END;
+
+-- Deleting the current latest recording falls back to the next most recent
+CREATE TRIGGER IF NOT EXISTS trg_latest_metric_delete
+AFTER DELETE ON metric_recordings
+WHEN OLD.criterion_id IS NOT NULL
+BEGIN
+    DELETE FROM latest_metric
+    WHERE journey_id = OLD.journey_id
+      AND criterion_id = OLD.criterion_id
+      AND recording_id = OLD.id;
+    INSERT OR IGNORE INTO latest_metric (journey_id, criterion_id, recording_id, recorded_value, measurement_unit, recorded_at)
+    SELECT journey_id, criterion_id, id, recorded_value, measurement_unit, recorded_at
+    FROM metric_recordings
+    WHERE journey_id = OLD.journey_id AND criterion_id = OLD.criterion_id
+    ORDER BY recorded_at DESC, rowid DESC
+    LIMIT 1;
+END;
+
+-- Backfill for databases created before latest_metric existed (no-op otherwise)
+INSERT OR IGNORE INTO latest_metric (journey_id, criterion_id, recording_id, recorded_value, measurement_unit, recorded_at)
+SELECT journey_id, criterion_id, id, recorded_value, measurement_unit, recorded_at FROM (
+    SELECT
+        journey_id, criterion_id, id, recorded_value, measurement_unit, recorded_at,
+        ROW_NUMBER() OVER (
+            PARTITION BY journey_id, criterion_id
+            ORDER BY recorded_at DESC, rowid DESC
+        ) AS rn
+    FROM metric_recordings
+    WHERE criterion_id IS NOT NULL
+) WHERE rn = 1;
+
+
+-- ---------------------------------------------------------------------------
+-- 2f. Webhook Queue — Durable Inbox for JaneApp Events
+-- ---------------------------------------------------------------------------
+-- /webhooks/janeapp appends the raw payload here and returns 202; background
+-- drainers in backend/webhook_queue.py apply it to metric_recordings.
+-- event_id is the idempotency key (JaneApp treatment_note.id), so retried
+-- deliveries are acknowledged without being applied twice.
+-- next_attempt_at (unix epoch) is the retry time while 'pending' and the
+-- lease expiry while 'processing'.
+-- ---------------------------------------------------------------------------
+CREATE TABLE IF NOT EXISTS webhook_queue (
+    id                INTEGER PRIMARY KEY AUTOINCREMENT,
+    event_id          TEXT NOT NULL UNIQUE,
+    event_type        TEXT,
+    payload           TEXT NOT NULL,             -- Raw request body (JSON)
+    status            TEXT NOT NULL DEFAULT 'pending', -- 'pending', 'processing', 'done', 'failed'
+    attempts          INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at   REAL NOT NULL DEFAULT 0,
+    last_error        TEXT,
+    received_at       DATETIME DEFAULT (datetime('now')),
+    processed_at      DATETIME
+);
+
+CREATE INDEX IF NOT EXISTS idx_webhook_queue_status ON webhook_queue(status, next_attempt_at);
+
+-- ---------------------------------------------------------------------------
+-- 2g. Phase Progress — Incremental Auto-Progression State
+-- ---------------------------------------------------------------------------
+-- Maintained by backend/progression.py after every metric write. One
+-- phase_progress row per journey holds the number of current-phase exit
+-- criteria still unmet; criterion_progress holds the met flag of each of
+-- those criteria. A new recording only re-evaluates its own criterion and
+-- adjusts the count; the phase advances when the count reaches zero.
+-- Both are derived state: rows are rebuilt from latest_metric whenever the
+-- journey changes phase or library_version moves on.
+-- ---------------------------------------------------------------------------
+CREATE TABLE IF NOT EXISTS phase_progress (
+    journey_id        TEXT PRIMARY KEY,
+    phase_id          TEXT NOT NULL,
+    library_version   INTEGER,
+    unmet_count       INTEGER NOT NULL,
+    criteria_count    INTEGER NOT NULL,
+    FOREIGN KEY(journey_id) REFERENCES client_journeys(id) ON DELETE CASCADE
+);
+
+CREATE TABLE IF NOT EXISTS criterion_progress (
+    journey_id        TEXT NOT NULL,
+    criterion_id      TEXT NOT NULL,
+    met               INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (journey_id, criterion_id),
+    FOREIGN KEY(journey_id) REFERENCES client_journeys(id) ON DELETE CASCADE
+) WITHOUT ROWID;
+
+-- ---------------------------------------------------------------------------
+-- 2h. Metric Series — Numeric Shadow of metric_recordings
+-- ---------------------------------------------------------------------------
+-- recorded_value is TEXT ('3', 'full', 'pass'). Every recording whose value
+-- is numeric is mirrored here as a REAL, with recorded_at normalized to
+-- 'YYYY-MM-DD HH:MM:SS', so the history endpoint can filter, bucket and
+-- aggregate in SQL. The primary key is the read order of
+-- /api/client/{id}/metrics/{metric}/series, so a range read is one seek
+-- and a scan of this table only.
+-- A value counts as numeric only if the whole trimmed text is a number:
+-- in `CAST(v AS REAL) = v` SQLite applies numeric affinity to the bare v,
+-- which converts well-formed numbers ('3', '.5', '1e3') and leaves text
+-- such as '3-4', '1e' or '12kg' as TEXT, so the comparison is false.
+-- ---------------------------------------------------------------------------
+CREATE TABLE IF NOT EXISTS metric_series (
+    journey_id        TEXT NOT NULL,
+    metric_name       TEXT NOT NULL,
+    recorded_at       DATETIME NOT NULL,
+    recording_id      TEXT NOT NULL,
+    numeric_value     REAL NOT NULL,
+    PRIMARY KEY (journey_id, metric_name, recorded_at, recording_id),
+    FOREIGN KEY(journey_id) REFERENCES client_journeys(id) ON DELETE CASCADE
+) WITHOUT ROWID;
+
+DROP TRIGGER IF EXISTS trg_metric_series_insert;
+CREATE TRIGGER trg_metric_series_insert
+AFTER INSERT ON metric_recordings
+WHEN CAST(trim(NEW.recorded_value) AS REAL) = trim(NEW.recorded_value)
+BEGIN
+    INSERT OR REPLACE INTO metric_series (journey_id, metric_name, recorded_at, recording_id, numeric_value)
+    VALUES (
+        NEW.journey_id,
+        NEW.metric_name,
+        COALESCE(datetime(NEW.recorded_at), NEW.recorded_at, datetime('now')),
+        NEW.id,
+        CAST(trim(NEW.recorded_value) AS REAL)
+    );
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_metric_series_delete
+AFTER DELETE ON metric_recordings
+BEGIN
+    DELETE FROM metric_series
+    WHERE journey_id = OLD.journey_id
+      AND metric_name = OLD.metric_name
+      AND recording_id = OLD.id;
+END;
+
+-- Rows mirrored by the earlier, looser pattern ('3-4', '1e', '+-')
+DELETE FROM metric_series
+WHERE recording_id IN (
+    SELECT id FROM metric_recordings
+    WHERE NOT CAST(trim(recorded_value) AS REAL) = trim(recorded_value)
+);
+
+-- Backfill for databases created before metric_series existed (no-op otherwise)
+INSERT OR IGNORE INTO metric_series (journey_id, metric_name, recorded_at, recording_id, numeric_value)
+SELECT
+    journey_id,
+    metric_name,
+    COALESCE(datetime(recorded_at), recorded_at, datetime('now')),
+    id,
+    CAST(trim(recorded_value) AS REAL)
+FROM metric_recordings
+WHERE CAST(trim(recorded_value) AS REAL) = trim(recorded_value);
+
+-- ---------------------------------------------------------------------------
+-- 2i. Journey Changes — Sync Log for Offline Clients
+-- ---------------------------------------------------------------------------
+-- Append-only log of every write that changes what a journey view shows:
+-- recordings added or removed, and phase / status moves. seq is
+-- AUTOINCREMENT, so it only ever grows (never reused after a delete) and
+-- is the cursor of GET /api/client/{id}/sync?since=<seq>: a tablet holding
+-- a snapshot at seq N fetches only the criteria touched after N.
+-- Written by triggers, so every write path (API, batch, JaneApp drainers,
+-- auto-progression) is covered inside its own transaction.
+-- ---------------------------------------------------------------------------
+CREATE TABLE IF NOT EXISTS journey_changes (
+    seq               INTEGER PRIMARY KEY AUTOINCREMENT,
+    journey_id        TEXT NOT NULL,
+    kind              TEXT NOT NULL,             -- 'recording', 'recording_deleted', 'journey'
+    recording_id      TEXT,                      -- metric_recordings.id (recording kinds)
+    criterion_id      TEXT,                      -- Criterion whose latest value may have moved
+    changed_at        DATETIME DEFAULT (datetime('now'))
+);
+
+CREATE INDEX IF NOT EXISTS idx_journey_changes_journey ON journey_changes(journey_id, seq);
+
+CREATE TRIGGER IF NOT EXISTS trg_journey_changes_recording_insert
+AFTER INSERT ON metric_recordings
+BEGIN
+    INSERT INTO journey_changes (journey_id, kind, recording_id, criterion_id)
+    VALUES (NEW.journey_id, 'recording', NEW.id, NEW.criterion_id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_journey_changes_recording_delete
+AFTER DELETE ON metric_recordings
+BEGIN
+    INSERT INTO journey_changes (journey_id, kind, recording_id, criterion_id)
+    VALUES (OLD.journey_id, 'recording_deleted', OLD.id, OLD.criterion_id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_journey_changes_journey_update
+AFTER UPDATE OF current_phase_id, status ON client_journeys
+WHEN NEW.current_phase_id IS NOT OLD.current_phase_id OR NEW.status IS NOT OLD.status
+BEGIN
+    INSERT INTO journey_changes (journey_id, kind) VALUES (NEW.id, 'journey');
+END;
+
 
 -- =============================================================================
 -- SECTION 3: UTILITY VIEWS
@@ -269,33 +735,21 @@ WHERE j.status = 'active';
 -- View: Exit Criteria Progress
 -- For a given journey, shows how close each criterion is to being met.
 -- ---------------------------------------------------------------------------
-CREATE VIEW IF NOT EXISTS v_criteria_progress AS
+DROP VIEW IF EXISTS v_criteria_progress;
+CREATE VIEW v_criteria_progress AS
 SELECT
     j.id AS journey_id,
     c.display_name,
     ph.name AS phase_name,
     ec.metric_name,
     ec.target_operator || ' ' || ec.target_value || ' ' || COALESCE(ec.measurement_unit, '') AS target,
-    (
-        SELECT mr.recorded_value
-        FROM metric_recordings mr
-        WHERE mr.journey_id = j.id
-          AND mr.criterion_id = ec.id
-        ORDER BY mr.recorded_at DESC
-        LIMIT 1
-    ) AS latest_value,
-    (
-        SELECT mr.recorded_at
-        FROM metric_recordings mr
-        WHERE mr.journey_id = j.id
-          AND mr.criterion_id = ec.id
-        ORDER BY mr.recorded_at DESC
-        LIMIT 1
-    ) AS last_measured
+    lm.recorded_value AS latest_value,
+    lm.recorded_at AS last_measured
 FROM client_journeys j
 JOIN clients c ON c.id = j.client_id
 JOIN phases ph ON ph.id = j.current_phase_id
 JOIN exit_criteria ec ON ec.phase_id = ph.id
+LEFT JOIN latest_metric lm ON lm.journey_id = j.id AND lm.criterion_id = ec.id
 WHERE j.status = 'active';
 
 
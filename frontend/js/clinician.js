@@ -6,6 +6,29 @@
 
 const API_BASE_URL = window.location.origin;
 
+// Live criterion / phase updates for the loaded client (Server-Sent Events)
+let liveSource = null;
+
+function subscribeClientEvents(clientId) {
+    if (liveSource) liveSource.close();
+    if (!window.EventSource) return;
+    liveSource = new EventSource(`${API_BASE_URL}/api/client/${clientId}/events`);
+
+    liveSource.addEventListener('criterion', (e) => {
+        const delta = JSON.parse(e.data);
+        const help = document.getElementById(`help-${delta.metric}`);
+        if (!help) return;
+        const latest = help.querySelector('.latest-value') || help.appendChild(document.createElement('span'));
+        latest.className = 'latest-value';
+        latest.textContent = ` — Latest: ${delta.current || '--'}${delta.met ? ' (met)' : ''}`;
+    });
+
+    // Phase unlocked (possibly by another device): reload the new phase's criteria
+    liveSource.addEventListener('phase', () => {
+        document.getElementById('loadCriteria').click();
+    });
+}
+
 document.getElementById('loadCriteria').addEventListener('click', async () => {
     const clientId = document.getElementById('clientId').value;
     const status = document.getElementById('status');
@@ -15,7 +38,7 @@ document.getElementById('loadCriteria').addEventListener('click', async () => {
     status.style.display = 'none';
 
     try {
-        const response = await fetch(`${API_BASE_URL}/api/client/${clientId}/journey`);
+        const response = await fetch(`${API_BASE_URL}/api/client/${clientId}/journey?compact=1`);
         if (!response.ok) throw new Error("Client not found or no active journey");
 
         const data = await response.json();
@@ -68,6 +91,7 @@ document.getElementById('loadCriteria').addEventListener('click', async () => {
         `;
 
         form.style.display = 'block';
+        subscribeClientEvents(clientId);
     } catch (err) {
         status.textContent = err.message;
         status.className = 'status-msg error';
@@ -0,0 +1,128 @@
+/**
+ * PROJECT VECTOR — Offline Journey Store
+ * Calgary Strength & Physio
+ *
+ * Offline-first journey data for the dashboard. One snapshot per client
+ * is kept in IndexedDB (see backend/sync.py):
+ *
+ *   cached(id) — the stored journey, with no network at all.
+ *   sync(id)   — asks /api/client/{id}/sync for the changes since the
+ *                stored snapshot's seq and patches it in place (usually a
+ *                few hundred bytes); downloads a fresh snapshot when none is
+ *                stored or the server answers with a reset.
+ *
+ * Also registers the service worker (sw.js) that serves the app shell
+ * from cache. Pure vanilla JS — no dependencies.
+ */
+
+const VectorOffline = (() => {
+  const API_BASE = window.location.origin;
+  const DB_NAME = "vector-offline";
+  const STORE = "snapshots";
+  let dbPromise = null;
+
+  // --- IndexedDB (falls back to online-only when unavailable) ---
+
+  function openDb() {
+    if (!window.indexedDB) return Promise.resolve(null);
+    if (!dbPromise) {
+      dbPromise = new Promise((resolve) => {
+        const request = indexedDB.open(DB_NAME, 1);
+        request.onupgradeneeded = () => request.result.createObjectStore(STORE, { keyPath: "clientId" });
+        request.onsuccess = () => resolve(request.result);
+        request.onerror = () => resolve(null);
+      });
+    }
+    return dbPromise;
+  }
+
+  async function run(mode, operation) {
+    const db = await openDb();
+    if (!db) return null;
+    return new Promise((resolve) => {
+      const tx = db.transaction(STORE, mode);
+      const request = operation(tx.objectStore(STORE));
+      tx.oncomplete = () => resolve(request.result || null);
+      tx.onerror = tx.onabort = () => resolve(null);
+    });
+  }
+
+  const read = (clientId) => run("readonly", (store) => store.get(clientId));
+  const write = (bundle) => run("readwrite", (store) => store.put(bundle));
+  const remove = (clientId) => run("readwrite", (store) => store.delete(clientId));
+
+  // --- Snapshot & Delta ---
+
+  async function getJson(url, clientId) {
+    const response = await fetch(url);
+    if (response.status === 404) {
+      // Journey ended or client removed: don't keep serving it offline
+      await remove(clientId);
+    }
+    if (!response.ok) throw new Error(`Request failed (${response.status})`);
+    return response.json();
+  }
+
+  async function fetchSnapshot(clientId) {
+    const bundle = await getJson(`${API_BASE}/api/client/${clientId}/snapshot`, clientId);
+    bundle.clientId = clientId;
+    await write(bundle);
+    return bundle;
+  }
+
+  // Same status rules as the server-side renderer
+  function applyPhase(journey, currentIndex) {
+    journey.client.currentPhaseIndex = currentIndex;
+    journey.phases.forEach((phase, i) => {
+      if (i === currentIndex) phase.status = "active";
+      else if (currentIndex === -1 || i < currentIndex) phase.status = "completed";
+      else phase.status = "locked";
+    });
+  }
+
+  function applyDelta(journey, delta) {
+    if (delta.phase) applyPhase(journey, delta.phase.currentPhaseIndex);
+    const updates = new Map(delta.criteria.map((c) => [c.id, c]));
+    for (const phase of journey.phases) {
+      for (const criterion of phase.criteria || []) {
+        const update = updates.get(criterion.id);
+        if (update) {
+          criterion.current = update.current;
+          criterion.met = update.met;
+        }
+      }
+    }
+    return updates.size > 0 || delta.phase !== null;
+  }
+
+  async function cached(clientId) {
+    const bundle = await read(clientId);
+    return bundle ? bundle.journey : null;
+  }
+
+  /** Bring the stored journey up to date. Resolves to { journey, changed }. */
+  async function sync(clientId) {
+    const bundle = await read(clientId);
+    if (!bundle) return { journey: (await fetchSnapshot(clientId)).journey, changed: true };
+
+    const params = new URLSearchParams({ since: bundle.seq, protocolVersion: bundle.protocolVersion });
+    const delta = await getJson(`${API_BASE}/api/client/${clientId}/sync?${params}`, clientId);
+    if (delta.reset) return { journey: (await fetchSnapshot(clientId)).journey, changed: true };
+    if (delta.seq === bundle.seq) return { journey: bundle.journey, changed: false };
+
+    const changed = applyDelta(bundle.journey, delta);
+    bundle.seq = delta.seq;
+    await write(bundle);
+    return { journey: bundle.journey, changed };
+  }
+
+  // --- App Shell ---
+
+  if ("serviceWorker" in navigator) {
+    window.addEventListener("load", () => {
+      navigator.serviceWorker.register("sw.js").catch((error) => console.warn("Service worker:", error));
+    });
+  }
+
+  return { cached, sync };
+})();
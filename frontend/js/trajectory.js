@@ -74,14 +74,33 @@ const ICONS = {
 // API FETCH
 // =============================================================================
 
+// Last good payload per URL, revalidated with If-None-Match (304 = reuse it)
+const conditionalCache = new Map();
+
+async function fetchJsonConditional(url) {
+  const cached = conditionalCache.get(url);
+  const headers = cached ? { "If-None-Match": cached.etag } : {};
+  const response = await fetch(url, { headers });
+
+  if (response.status === 304 && cached) return cached.data;
+  if (!response.ok) throw new Error(`Request failed (${response.status})`);
+
+  const data = await response.json();
+  const etag = response.headers.get("ETag");
+  if (etag) conditionalCache.set(url, { etag, data });
+  return data;
+}
+
+// Offline-first: the stored snapshot, patched with /sync deltas (js/offline_store.js).
+// Returns the journey on screen when nothing changed.
 async function fetchJourney(clientId) {
   try {
-    const response = await fetch(`${API_BASE_URL}/api/client/${clientId}/journey`);
-    if (!response.ok) throw new Error("Failed to load journey data");
-    return await response.json();
+    const { journey, changed } = await VectorOffline.sync(clientId);
+    return changed || !currentJourney ? journey : currentJourney;
   } catch (error) {
     console.error("API Error:", error);
-    // Fallback to error UI
+    // Keep showing the stored snapshot; error UI only when there is none
+    if (currentJourney) return currentJourney;
     document.getElementById("app").innerHTML = `<div class="error-state">System Offline. Check Connection.</div>`;
     return null;
   }
@@ -139,7 +158,7 @@ function renderCriterion(c, isLocked) {
 
   const displayValue = isLocked ? "--" : (c.current || "--");
   return `
-    <div class="criterion">
+    <div class="criterion" data-criterion="${c.id}">
       <span class="criterion-status">${statusHTML}</span>
       <span class="criterion-label">${c.label}</span>
       <span class="criterion-value ${valueCls}">${displayValue}</span>
@@ -279,16 +298,74 @@ function renderDashboard(data) {
   app.innerHTML = html;
 }
 
+// =============================================================================
+// LIVE UPDATES (Server-Sent Events)
+// =============================================================================
+
+// Journey currently on screen; patched in place by "criterion" events
+let currentJourney = null;
+
+async function refreshJourney() {
+  const data = await fetchJourney(CLIENT_ID);
+  if (data && data !== currentJourney) {
+    currentJourney = data;
+    renderDashboard(data);
+  }
+}
+
+function applyCriterionDelta(delta) {
+  if (!currentJourney) return;
+  const phaseIndex = currentJourney.phases.findIndex(p => p.status === "active");
+  if (phaseIndex === -1) return;
+  const phase = currentJourney.phases[phaseIndex];
+  const criterion = phase.criteria.find(c => c.id === delta.id);
+  if (!criterion) return refreshJourney();
+
+  criterion.current = delta.current;
+  criterion.met = delta.met;
+
+  const el = document.querySelector(`#phase-${phaseIndex} .criterion[data-criterion="${delta.id}"]`);
+  if (el) el.outerHTML = renderCriterion(criterion, false);
+  const badge = document.querySelector(`#phase-${phaseIndex} .phase-badge`);
+  if (badge) badge.textContent = `${phase.criteria.filter(c => c.met).length}/${phase.criteria.length}`;
+}
+
+function subscribeJourneyEvents(clientId) {
+  if (!window.EventSource) return;
+  const source = new EventSource(`${API_BASE_URL}/api/client/${clientId}/events`);
+  let connectedBefore = false;
+
+  source.addEventListener("open", () => {
+    // Deltas sent while disconnected are not replayed; re-sync instead
+    if (connectedBefore) refreshJourney();
+    connectedBefore = true;
+  });
+  source.addEventListener("criterion", (e) => applyCriterionDelta(JSON.parse(e.data)));
+  source.addEventListener("phase", () => refreshJourney());
+  source.addEventListener("resync", () => refreshJourney());
+  return source;
+}
+
 // =============================================================================
 // INIT
 // =============================================================================
 
 document.addEventListener("DOMContentLoaded", async () => {
   console.log("Initializing VECTOR Dashboard...");
+  // Render the stored snapshot at once, then bring it up to date
+  const stored = await VectorOffline.cached(CLIENT_ID);
+  if (stored) {
+    currentJourney = stored;
+    renderDashboard(stored);
+  }
   const data = await fetchJourney(CLIENT_ID);
   if (data) {
     console.log("Journey Data Loaded:", data);
-    renderDashboard(data);
+    if (data !== currentJourney) {
+      currentJourney = data;
+      renderDashboard(data);
+    }
+    subscribeJourneyEvents(CLIENT_ID);
   }
   /* --- Protocol Viewer Logic --- */
 
@@ -366,10 +443,8 @@ document.addEventListener("DOMContentLoaded", async () => {
     try {
       // Use API_BASE_URL if defined, else relative path
       const baseUrl = (typeof API_BASE_URL !== 'undefined') ? API_BASE_URL : '';
-      const response = await fetch(`${baseUrl}/api/protocol/${protocolId}`);
-      if (!response.ok) throw new Error("Protocol not found");
-
-      const data = await response.json();
+      const data = await fetchJsonConditional(`${baseUrl}/api/protocol/${protocolId}`)
+        .catch(() => { throw new Error("Protocol not found"); });
       if (loading) loading.style.display = "none";
       if (content) content.innerHTML = renderMarkdown(data.content);
     } catch (error) {
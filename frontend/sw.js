@@ -0,0 +1,77 @@
+/**
+ * PROJECT VECTOR — Service Worker (App Shell Cache)
+ * Calgary Strength & Physio
+ *
+ * Serves the frontend from the Cache API so repeat loads on clinic Wi-Fi
+ * don't wait on the network. Journey data is not cached here: it lives in
+ * IndexedDB (js/offline_store.js) and is kept current with /sync deltas.
+ *
+ *   - Fingerprinted assets (name.<hash>.js / .css) never change, so they
+ *     are cache-first; older versions of the same file are dropped.
+ *   - Pages and other files are stale-while-revalidate: the cached copy is
+ *     served at once and refreshed in the background, so a deploy shows up
+ *     on the following load.
+ *   - /api/ and /webhooks/ are never intercepted.
+ */
+
+const CACHE = "vector-shell-v1";
+const SHELL = ["./", "index.html", "clinician.html"];
+const FINGERPRINTED = /\.[0-9a-f]{10}\.(js|css)$/;
+
+self.addEventListener("install", (event) => {
+  event.waitUntil(
+    caches.open(CACHE)
+      .then((cache) => cache.addAll(SHELL))
+      .then(() => self.skipWaiting())
+  );
+});
+
+self.addEventListener("activate", (event) => {
+  event.waitUntil(
+    caches.keys()
+      .then((keys) => Promise.all(keys.filter((key) => key !== CACHE).map((key) => caches.delete(key))))
+      .then(() => self.clients.claim())
+  );
+});
+
+async function putFingerprinted(cache, request, response) {
+  // One version per file: drop earlier hashes of the same asset
+  const stem = request.url.replace(FINGERPRINTED, ".$1");
+  for (const key of await cache.keys()) {
+    if (key.url !== request.url && FINGERPRINTED.test(key.url) && key.url.replace(FINGERPRINTED, ".$1") === stem) {
+      await cache.delete(key);
+    }
+  }
+  await cache.put(request, response);
+}
+
+async function cacheFirst(event) {
+  const cache = await caches.open(CACHE);
+  const cached = await cache.match(event.request);
+  if (cached) return cached;
+  const response = await fetch(event.request);
+  if (response.ok) event.waitUntil(putFingerprinted(cache, event.request, response.clone()));
+  return response;
+}
+
+async function staleWhileRevalidate(event) {
+  const cache = await caches.open(CACHE);
+  const cached = await cache.match(event.request);
+  const network = fetch(event.request).then((response) => {
+    if (response.ok) return cache.put(event.request, response.clone()).then(() => response);
+    return response;
+  });
+  if (cached) {
+    event.waitUntil(network.catch(() => {}));
+    return cached;
+  }
+  return network;
+}
+
+self.addEventListener("fetch", (event) => {
+  const url = new URL(event.request.url);
+  if (event.request.method !== "GET" || url.origin !== self.location.origin) return;
+  if (url.pathname.startsWith("/api/") || url.pathname.startsWith("/webhooks/")) return;
+
+  event.respondWith(FINGERPRINTED.test(url.pathname) ? cacheFirst(event) : staleWhileRevalidate(event));
+});
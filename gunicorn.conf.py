@@ -0,0 +1,26 @@
+"""
+PROJECT VECTOR — Gunicorn Configuration
+Calgary Strength & Physio
+
+    gunicorn -c gunicorn.conf.py backend.main:app
+
+preload_app imports backend.main once in the master. when_ready() then
+runs backend.main.preload() (protocol cache warm-up, frontend asset build)
+before any worker is forked, so the workers inherit the compiled protocols
+and assets instead of each rebuilding them. Per-worker resources (audit
+listener thread, SQLite connections, webhook drainers) are still opened
+after fork, in the app's lifespan.
+"""
+
+import os
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+workers = int(os.getenv("WEB_CONCURRENCY", "4"))
+worker_class = "uvicorn.workers.UvicornWorker"
+preload_app = True
+
+
+def when_ready(server):
+    from backend.main import preload
+
+    preload()
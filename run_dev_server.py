@@ -14,6 +14,9 @@ if os.getenv("VECTOR_ENV") == "production":
     print("ERROR: Do not use this script in production. Use gunicorn instead.")
     sys.exit(1)
 
+# Rebuild frontend assets when files under frontend/ change
+os.environ.setdefault("VECTOR_STATIC_RELOAD", "1")
+
 # SECURITY: Disable all outbound network access
 os.environ['NO_PROXY'] = '*'
 os.environ['no_proxy'] = '*'
@@ -0,0 +1,572 @@
+"""
+PROJECT VECTOR — API Load Test & Benchmark Suite
+
+Builds a synthetic database at a chosen scale with the real v_core.sql
+schema and load_base.sync_protocols, then drives the hot endpoints and
+reports latency percentiles, throughput and SQL statements per request:
+
+  * journey          GET  /api/client/{id}/journey (full assembly)
+  * journey_compact  GET  /api/client/{id}/journey?compact=1 (status + criteria)
+  * journey_304      GET  /api/client/{id}/journey with If-None-Match
+  * sync             GET  /api/client/{id}/sync since the client's snapshot
+  * record_metric    POST /api/metric/record
+  * metric_stream    POST /api/metric/stream (write-behind, 10 readings)
+  * janeapp_webhook  POST /webhooks/janeapp (HMAC-signed payloads); the
+                     background drain rate is reported separately
+  * protocol         GET  /api/protocol/{id} (Protocol Vault documents)
+
+Two drivers:
+  * inproc  — httpx.AsyncClient over ASGITransport against backend.main in
+              this process. No network; isolates application cost. Query
+              counts come from a sequential profiling pass.
+  * uvicorn — a real `uvicorn --workers W` server over HTTP.
+
+Recorded values never satisfy their criteria, so phase progression does
+not move journeys while the benchmark runs.
+
+Results are written as JSON; pass --compare with an earlier file to print
+per-scenario deltas (exit status 1 if any p95 regressed past --threshold).
+
+Usage:
+    python scripts/bench_api.py [--pathologies 20] [--phases 4] [--criteria 4]
+                                [--clients 500] [--recordings 20]
+                                [--requests 2000] [--concurrency 32]
+                                [--driver inproc|uvicorn] [--workers 4]
+                                [--out bench.json] [--compare baseline.json]
+"""
+
+import argparse
+import asyncio
+import hashlib
+import hmac
+import itertools
+import json
+import os
+import platform
+import random
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "scripts"))
+
+SCHEMA_PATH = ROOT / "database/schema/v_core.sql"
+PROTOCOL_DOCS = ROOT / "database/protocols"
+BENCH_SECRET = "bench_secret"
+SCENARIOS = ("journey", "journey_compact", "journey_304", "sync", "record_metric", "metric_stream", "janeapp_webhook", "protocol")
+
+
+# --- Synthetic Data ---
+
+def synthetic_protocols(pathologies, phases, criteria, rng):
+    """Protocols in base_seed.json shape, so they load through sync_protocols."""
+    protocols = []
+    for p in range(pathologies):
+        pid = f"PATH_BENCH_{p:04d}"
+        protocols.append({
+            "id": pid,
+            "name": f"Bench Protocol {p}",
+            "osics_code": f"BX{p:02d}",
+            "body_region": rng.choice(["Knee", "Shoulder", "Lumbar Spine", "Ankle"]),
+            "injury_mechanism": "Synthetic",
+            "research_source": "Benchmark fixture",
+            "research_doi": None,
+            "contraindications": [],
+            "phases": [
+                {
+                    "id": f"PHASE_BENCH_{p:04d}_P{ph}",
+                    "order_index": ph,
+                    "name": f"Phase {ph}",
+                    "description": "Synthetic phase",
+                    "typical_duration": f"Weeks {ph * 2}-{ph * 2 + 2}",
+                    "precautions": None,
+                    "exit_criteria": [
+                        {
+                            "id": f"EC_BENCH_{p:04d}_P{ph}_{c:02d}",
+                            "metric_name": f"metric_{c}",
+                            "target_operator": "<=",
+                            "target_value": "2",
+                            "measurement_unit": "units",
+                            "measurement_tool": "Synthetic",
+                            "description": f"Metric {c} at or below 2",
+                        }
+                        for c in range(criteria)
+                    ],
+                    "programming": [
+                        {
+                            "id": f"SLOT_BENCH_{p:04d}_P{ph}_{s}",
+                            "order_index": s,
+                            "slot_type": "Strength",
+                            "intent_description": "Synthetic slot",
+                            "standard_exercise": f"Exercise {s}",
+                            "sets_reps_guidance": "3x10",
+                        }
+                        for s in range(1, 3)
+                    ],
+                }
+                for ph in range(1, phases + 1)
+            ],
+        })
+    return protocols
+
+
+def build_database(db_path, args, rng):
+    from load_base import bump_library_version, sync_protocols
+
+    conn = sqlite3.connect(db_path)
+    conn.executescript(SCHEMA_PATH.read_text(encoding="utf-8"))
+    cursor = conn.cursor()
+
+    protocols = synthetic_protocols(args.pathologies, args.phases, args.criteria, rng)
+    sync_protocols(cursor, protocols, verbose=False)
+    bump_library_version(cursor)
+
+    clients, journeys, recordings = [], [], []
+    start = datetime(2026, 1, 1)
+    for n in range(args.clients):
+        client_id = f"CLT_BENCH_{n:05d}"
+        p = n % args.pathologies
+        journey_id = f"JRN_BENCH_{n:05d}"
+        phase_id = f"PHASE_BENCH_{p:04d}_P1"
+        clients.append((client_id, f"Bench Client {n}", "2026-01-01", "Return to sport", "Synthetic"))
+        journeys.append((journey_id, client_id, f"PATH_BENCH_{p:04d}", phase_id, "2026-01-01"))
+        for c in range(args.criteria):
+            for k in range(args.recordings):
+                recordings.append((
+                    f"REC_BENCH_{n}_{c}_{k}", journey_id, phase_id, f"EC_BENCH_{p:04d}_P1_{c:02d}",
+                    f"metric_{c}", str(rng.randint(3, 9)), "units",
+                    (start + timedelta(hours=k * 12)).isoformat(),
+                ))
+
+    cursor.executemany("""
+        INSERT INTO clients (id, display_name, intake_date, terminal_goal, sport_activity) VALUES (?, ?, ?, ?, ?)
+    """, clients)
+    cursor.executemany("""
+        INSERT INTO client_journeys (id, client_id, pathology_id, current_phase_id, status, started_at)
+        VALUES (?, ?, ?, ?, 'active', ?)
+    """, journeys)
+    cursor.executemany("""
+        INSERT INTO metric_recordings
+        (id, journey_id, phase_id, criterion_id, metric_name, recorded_value, measurement_unit, recorded_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    """, recordings)
+    conn.commit()
+    conn.close()
+    return len(recordings)
+
+
+# --- Request Generators ---
+
+def signed_webhook(client_id, note_id, criteria, rng):
+    body = json.dumps({
+        "event": "treatment_note.created",
+        "patient": {"external_id": client_id},
+        "appointment": {"date": datetime.now().isoformat()},
+        "treatment_note": {
+            "id": note_id,
+            "fields": [
+                {"label": f"metric_{c}", "value": str(rng.randint(3, 9)), "unit": "units"}
+                for c in range(criteria)
+            ],
+        },
+    }).encode("utf-8")
+    signature = "sha256=" + hmac.new(BENCH_SECRET.encode(), body, hashlib.sha256).hexdigest()
+    return body, {"Content-Type": "application/json", "X-Jane-Signature": signature}
+
+
+def request_factory(scenario, args, rng, etags, snapshots):
+    """Returns a callable producing (method, url, kwargs) for one request."""
+    run_id = int(time.time() * 1000)
+    counter = itertools.count()
+    documents = sorted(p.stem for p in PROTOCOL_DOCS.glob("*.md"))
+
+    def client_id():
+        return f"CLT_BENCH_{rng.randrange(args.clients):05d}"
+
+    if scenario == "journey":
+        return lambda: ("GET", f"/api/client/{client_id()}/journey", {})
+    if scenario == "journey_compact":
+        return lambda: ("GET", f"/api/client/{client_id()}/journey?compact=1", {})
+    if scenario == "journey_304":
+        def make():
+            cid = client_id()
+            headers = {"If-None-Match": etags[cid]} if cid in etags else {}
+            return "GET", f"/api/client/{cid}/journey", {"headers": headers}
+        return make
+    if scenario == "sync":
+        def make():
+            cid = client_id()
+            seq, version = snapshots.get(cid, (0, ""))
+            return "GET", f"/api/client/{cid}/sync", {"params": {"since": seq, "protocolVersion": version}}
+        return make
+    if scenario == "record_metric":
+        return lambda: ("POST", "/api/metric/record", {"json": {
+            "client_id": client_id(),
+            "metric_name": f"metric_{rng.randrange(args.criteria)}",
+            "value": str(rng.randint(3, 9)),
+            "unit": "units",
+        }})
+    if scenario == "metric_stream":
+        def make():
+            cid = client_id()
+            return "POST", "/api/metric/stream", {"json": {"records": [{
+                "client_id": cid,
+                "metric_name": f"metric_{rng.randrange(args.criteria)}",
+                "value": str(rng.randint(3, 9)),
+                "unit": "units",
+            } for _ in range(10)]}}
+        return make
+    if scenario == "janeapp_webhook":
+        def make():
+            body, headers = signed_webhook(client_id(), f"BENCH_{run_id}_{next(counter)}", args.criteria, rng)
+            return "POST", "/webhooks/janeapp", {"content": body, "headers": headers}
+        return make
+    if scenario == "protocol":
+        if not documents:
+            return None
+        return lambda: ("GET", f"/api/protocol/{rng.choice(documents)}", {})
+    raise ValueError(scenario)
+
+
+# --- Measurement ---
+
+def summarize(samples_ms, elapsed, statuses, queries):
+    samples_ms.sort()
+    n = len(samples_ms)
+
+    def pct(q):
+        return round(samples_ms[min(n - 1, int(n * q))], 3)
+
+    return {
+        "requests": n,
+        "throughput_rps": round(n / elapsed, 1) if elapsed else None,
+        "mean_ms": round(statistics.fmean(samples_ms), 3),
+        "p50_ms": pct(0.50),
+        "p95_ms": pct(0.95),
+        "p99_ms": pct(0.99),
+        "max_ms": round(samples_ms[-1], 3),
+        "statuses": {str(k): v for k, v in sorted(statuses.items())},
+        "queries_per_request": queries,
+    }
+
+
+async def run_scenario(client, make_request, total, concurrency):
+    samples, statuses = [], {}
+    remaining = itertools.count()
+
+    async def worker():
+        while next(remaining) < total:
+            method, url, kwargs = make_request()
+            started = time.perf_counter()
+            response = await client.request(method, url, **kwargs)
+            samples.append((time.perf_counter() - started) * 1000)
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return samples, time.perf_counter() - started, statuses
+
+
+async def collect_etags(client, args):
+    etags = {}
+    for n in range(args.clients):
+        cid = f"CLT_BENCH_{n:05d}"
+        response = await client.get(f"/api/client/{cid}/journey")
+        if "etag" in response.headers:
+            etags[cid] = response.headers["etag"]
+    return etags
+
+
+async def collect_snapshots(client, args):
+    """(seq, protocolVersion) of each bench client's current snapshot."""
+    snapshots = {}
+    for n in range(args.clients):
+        cid = f"CLT_BENCH_{n:05d}"
+        response = await client.get(f"/api/client/{cid}/snapshot")
+        if response.status_code == 200:
+            bundle = response.json()
+            snapshots[cid] = (bundle["seq"], bundle["protocolVersion"])
+    return snapshots
+
+
+def wait_for_drain(db_path, timeout):
+    """Seconds until webhook_queue has no pending/processing rows (None on timeout)."""
+    started = time.perf_counter()
+    conn = sqlite3.connect(db_path)
+    try:
+        while time.perf_counter() - started < timeout:
+            depth = conn.execute("""
+                SELECT COUNT(*) FROM webhook_queue WHERE status IN ('pending', 'processing')
+            """).fetchone()[0]
+            if depth == 0:
+                return time.perf_counter() - started
+            time.sleep(0.05)
+    finally:
+        conn.close()
+    return None
+
+
+class StatementCounter:
+    """Counts SQL statements on the app's pooled connections (inproc profiling)."""
+
+    def __init__(self, pool):
+        self.count = 0
+        self.pool = pool
+        self._reader, self._writer = pool.reader, pool.writer
+
+    def _wrap(self, context):
+        counter = self
+
+        class Counted:
+            def __enter__(self):
+                self._cm = context()
+                conn = self._cm.__enter__()
+                conn.set_trace_callback(counter._tick)
+                return conn
+
+            def __exit__(self, *exc):
+                return self._cm.__exit__(*exc)
+
+        return Counted
+
+    def _tick(self, statement):
+        # Background webhook drains are not part of any request
+        if not threading.current_thread().name.startswith("webhook-drain"):
+            self.count += 1
+
+    def install(self):
+        self.pool.reader = self._wrap(self._reader)
+        self.pool.writer = self._wrap(self._writer)
+
+    def remove(self):
+        self.pool.reader, self.pool.writer = self._reader, self._writer
+
+
+async def profile_queries(client, factories, counter, samples=20):
+    """Sequential pass: SQL statements per request for each scenario."""
+    counts = {}
+    for scenario, make_request in factories.items():
+        per_request = []
+        for _ in range(samples):
+            method, url, kwargs = make_request()
+            before = counter.count
+            response = await client.request(method, url, **kwargs)
+            # The journey endpoint traces itself and reports the count
+            header = response.headers.get("x-db-queries")
+            per_request.append(int(header) if header is not None else counter.count - before)
+        counts[scenario] = round(statistics.fmean(per_request), 2)
+    return counts
+
+
+# --- Drivers ---
+
+async def drive(client, args, rng, db_path, profile=None):
+    etags = await collect_etags(client, args)
+    snapshots = await collect_snapshots(client, args) if "sync" in args.scenarios else {}
+    factories = {}
+    for scenario in args.scenarios:
+        make_request = request_factory(scenario, args, rng, etags, snapshots)
+        if make_request is None:
+            print(f"  - {scenario}: skipped (no documents in {PROTOCOL_DOCS})")
+            continue
+        factories[scenario] = make_request
+
+    queries = await profile(factories) if profile else {}
+    wait_for_drain(db_path, args.drain_timeout)
+
+    results = {}
+    for scenario, make_request in factories.items():
+        if scenario == "journey_304":
+            # Earlier scenarios and the profiling pass wrote metrics; revalidate fresh tags
+            etags.update(await collect_etags(client, args))
+        if scenario == "sync":
+            # Deltas from a fresh cursor: what a tablet re-opening the app pays
+            snapshots.update(await collect_snapshots(client, args))
+        # Warm-up (protocol cache, statement cache, connection pool)
+        await run_scenario(client, make_request, min(100, args.requests), args.concurrency)
+        samples, elapsed, statuses = await run_scenario(client, make_request, args.requests, args.concurrency)
+        results[scenario] = summarize(samples, elapsed, statuses, queries.get(scenario))
+        if scenario == "janeapp_webhook":
+            drained = wait_for_drain(db_path, args.drain_timeout)
+            results[scenario]["drain_seconds"] = round(drained, 3) if drained is not None else None
+            results[scenario]["drain_events_per_sec"] = (
+                round(args.requests / (elapsed + drained), 1) if drained is not None else None
+            )
+        print_row(scenario, results[scenario])
+    return results
+
+
+async def drive_inproc(args, rng, db_path):
+    import httpx
+    from backend import main
+
+    counter = StatementCounter(main.db_pool)
+    transport = httpx.ASGITransport(app=main.app)
+    # ASGITransport doesn't send lifespan events; run start-up/shutdown directly
+    async with main.lifespan(main.app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            async def profile(factories):
+                counter.install()
+                try:
+                    return await profile_queries(client, factories, counter)
+                finally:
+                    counter.remove()
+
+            return await drive(client, args, rng, db_path, profile)
+
+
+async def drive_uvicorn(args, rng, db_path, env):
+    import httpx
+
+    port = args.port
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "backend.main:app", "--port", str(port),
+         "--workers", str(args.workers), "--log-level", "warning"],
+        cwd=ROOT, env=env,
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+        async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30) as client:
+            for _ in range(100):
+                if server.poll() is not None:
+                    raise SystemExit(f"uvicorn exited with status {server.returncode}")
+                try:
+                    await client.get("/api/protocol/__ready__")
+                    break
+                except httpx.TransportError:
+                    await asyncio.sleep(0.1)
+            return await drive(client, args, rng, db_path)
+    finally:
+        server.terminate()
+        server.wait(10)
+
+
+# --- Reporting ---
+
+def print_row(scenario, r):
+    queries = "-" if r["queries_per_request"] is None else r["queries_per_request"]
+    print(f"  {scenario:<17}{r['throughput_rps']:>10}{r['p50_ms']:>10}{r['p95_ms']:>10}"
+          f"{r['p99_ms']:>10}{queries:>9}  {r['statuses']}")
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(current, baseline_path, threshold):
+    """Print deltas against an earlier run; returns True if any p95 regressed."""
+    baseline = json.loads(Path(baseline_path).read_text(encoding="utf-8"))
+    print(f"\nCompared with {baseline_path} (commit {baseline['meta'].get('commit')}):")
+    print(f"  {'scenario':<17}{'rps':>10}{'p50':>10}{'p95':>10}{'p99':>10}")
+    regressed = False
+    for scenario, now in current["results"].items():
+        before = baseline["results"].get(scenario)
+        if not before:
+            continue
+        cells = []
+        for key in ("throughput_rps", "p50_ms", "p95_ms", "p99_ms"):
+            change = (now[key] - before[key]) / before[key] * 100 if before[key] else 0.0
+            cells.append(f"{change:>+9.1f}%")
+        if before["p95_ms"] and (now["p95_ms"] - before["p95_ms"]) / before["p95_ms"] * 100 > threshold:
+            regressed = True
+            cells.append("  REGRESSION")
+        print(f"  {scenario:<17}" + "".join(cells))
+    return regressed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the VECTOR API on synthetic data")
+    parser.add_argument("--pathologies", type=int, default=20)
+    parser.add_argument("--phases", type=int, default=4)
+    parser.add_argument("--criteria", type=int, default=4, help="exit criteria per phase")
+    parser.add_argument("--clients", type=int, default=500)
+    parser.add_argument("--recordings", type=int, default=20, help="recordings per current-phase criterion")
+    parser.add_argument("--requests", type=int, default=2000, help="timed requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument("--driver", choices=("inproc", "uvicorn"), default="inproc")
+    parser.add_argument("--workers", type=int, default=4, help="uvicorn workers (--driver uvicorn)")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--drain-timeout", type=float, default=120.0)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--out", default=None, help="results JSON path (default: bench-<commit>-<driver>.json)")
+    parser.add_argument("--compare", default=None, help="earlier results JSON to diff against")
+    parser.add_argument("--threshold", type=float, default=20.0, help="p95 regression threshold in percent")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "bench.db")
+        started = time.perf_counter()
+        recordings = build_database(db_path, args, rng)
+        print(f"Synthetic library: {args.pathologies} pathologies x {args.phases} phases x "
+              f"{args.criteria} criteria, {args.clients} clients, {recordings} recordings "
+              f"({time.perf_counter() - started:.1f}s)")
+
+        # backend.main reads these at import time
+        env = dict(os.environ)
+        env.update({
+            "VECTOR_DB_PATH": db_path,
+            "AUDIT_LOG_DIR": os.path.join(tmp, "logs"),
+            "JANEAPP_WEBHOOK_SECRET": BENCH_SECRET,
+        })
+        os.environ.update(env)
+        os.chdir(ROOT)
+
+        print(f"Driver: {args.driver}, {args.requests} requests/scenario, concurrency {args.concurrency}")
+        print(f"  {'scenario':<17}{'rps':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'queries':>9}  statuses")
+        if args.driver == "inproc":
+            results = asyncio.run(drive_inproc(args, rng, db_path))
+        else:
+            try:
+                import uvicorn  # noqa: F401
+            except ImportError:
+                raise SystemExit("uvicorn is not installed (pip install -r backend/requirements.txt)")
+            results = asyncio.run(drive_uvicorn(args, rng, db_path, env))
+
+    commit = git_commit()
+    report = {
+        "meta": {
+            "commit": commit,
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "driver": args.driver,
+            "workers": args.workers if args.driver == "uvicorn" else 1,
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "platform": platform.platform(),
+            "scale": {
+                "pathologies": args.pathologies,
+                "phases": args.phases,
+                "criteria": args.criteria,
+                "clients": args.clients,
+                "recordings_per_criterion": args.recordings,
+            },
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+        },
+        "results": results,
+    }
+    out = Path(args.out or f"bench-{commit or 'local'}-{args.driver}.json")
+    out.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+    print(f"\nResults written to {out}")
+
+    if args.compare and compare(report, args.compare, args.threshold):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
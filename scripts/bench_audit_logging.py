@@ -0,0 +1,77 @@
+"""
+PROJECT VECTOR — Audit Logging Latency Benchmark
+
+Measures how long one audit_middleware log call holds the request path:
+
+  * before: logging.basicConfig-style FileHandler (format + write + flush
+    inline, on the event loop)
+  * after:  backend.audit QueueHandler (enqueue only; a listener thread
+    writes batched JSON lines)
+
+Calls are paced (default every 500 us, i.e. 2000 audited requests/sec per
+worker) so the listener thread drains between requests as it would under
+real traffic; pass 0 to measure back-to-back calls.
+
+Usage:
+    python scripts/bench_audit_logging.py [iterations] [interval_us]
+"""
+
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+def measure(logger, iterations, interval_us):
+    samples = []
+    for i in range(iterations):
+        if interval_us:
+            time.sleep(interval_us / 1e6)
+        started = time.perf_counter_ns()
+        logger.info("ACCESS", extra={"audit": {"ip": "127.0.0.1", "method": "GET", "path": f"/api/client/CLT_{i}/journey"}})
+        samples.append((time.perf_counter_ns() - started) / 1000)
+    samples.sort()
+    return {
+        "mean": statistics.fmean(samples),
+        "p50": samples[len(samples) // 2],
+        "p99": samples[int(len(samples) * 0.99)],
+        "max": samples[-1],
+    }
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    interval_us = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Before: synchronous FileHandler, as configured by the old basicConfig
+        legacy = logging.getLogger("bench_legacy_audit")
+        legacy.propagate = False
+        legacy.setLevel(logging.INFO)
+        file_handler = logging.FileHandler(os.path.join(tmp, "audit.log"))
+        file_handler.setFormatter(logging.Formatter("%(asctime)s | %(levelname)s | %(message)s", "%Y-%m-%d %H:%M:%S"))
+        legacy.addHandler(file_handler)
+        before = measure(legacy, iterations, interval_us)
+        file_handler.close()
+
+        # After: queue + batching listener
+        os.environ["AUDIT_LOG_DIR"] = tmp
+        from backend import audit
+        audit.AUDIT_LOG_DIR = Path(tmp)
+        logger = audit.setup_audit_logging()
+        after = measure(logger, iterations, interval_us)
+        audit.stop_audit_logging()
+
+    print(f"Audit log call latency over {iterations} calls, {interval_us} us apart (microseconds)")
+    print(f"{'':<22}{'mean':>10}{'p50':>10}{'p99':>10}{'max':>10}")
+    for label, result in (("before (FileHandler)", before), ("after (QueueHandler)", after)):
+        print(f"{label:<22}{result['mean']:>10.2f}{result['p50']:>10.2f}{result['p99']:>10.2f}{result['max']:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,4 @@
+import hashlib
 import os
 import sqlite3
 from pathlib import Path
@@ -16,11 +17,16 @@ DB_DIR = Path("database/data")
 DB_PATH = DB_DIR / "vector.db"
 SCHEMA_PATH = Path("database/schema/v_core.sql")
 
-def init_db():
+def schema_fingerprint(schema_sql):
+    """Positive 28-bit digest of the schema text (fits PRAGMA user_version)."""
+    return int(hashlib.sha256(schema_sql.encode("utf-8")).hexdigest()[:7], 16)
+
+def init_db(reset=False):
     print("Initializing Database...")
     
-    # 1. Ensure clean slate (Delete existing DB)
-    if DB_PATH.exists():
+    # 1. Clean slate only on request; the schema and loader are both
+    #    incremental, so redeploys keep recorded client data.
+    if reset and DB_PATH.exists():
         print(f"Removing existing database at {DB_PATH}...")
         try:
             os.remove(DB_PATH)
@@ -44,11 +50,20 @@ def init_db():
     
     with open(SCHEMA_PATH, 'r') as f:
         schema_sql = f.read()
+
+    # PERF: The schema is idempotent but its backfills scan metric_recordings;
+    # PRAGMA user_version records which schema text was last applied, so an
+    # unchanged schema is skipped on redeploy.
+    fingerprint = schema_fingerprint(schema_sql)
+    if cursor.execute("PRAGMA user_version").fetchone()[0] == fingerprint:
+        print("Schema unchanged since last deploy; skipped.")
+    else:
         cursor.executescript(schema_sql)
-        
+        cursor.execute(f"PRAGMA user_version = {fingerprint}")
+        print("Schema applied successfully.")
+
     conn.commit()
     conn.close()
-    print("Schema applied successfully.")
 
     # 3. Load Seed Data
     print("Loading seed data...")
@@ -56,4 +71,4 @@ def init_db():
     print("Database initialization complete.")
 
 if __name__ == "__main__":
-    init_db()
+    init_db(reset="--reset" in sys.argv)
@@ -1,24 +1,487 @@
-
+import argparse
+import glob
 import json
+import hashlib
+import re
 import sqlite3
 import os
 import sys
 
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from seed_stream import iter_shard, seed_shards, validate_protocol
+
 DB_PATH = "database/data/vector.db"
 SEED_PATH = "database/seeds/base_seed.json"
+SEED_DIR = "database/seeds"
+PROTOCOLS_DIR = "database/protocols"
+STREAM_BATCH_SIZE = 50
+
+# Column order shared by the desired (seed) rows and the stored rows, so a
+# changed row is simply a tuple that differs.
+PHASE_COLUMNS = (
+    "id", "pathology_id", "order_index", "name", "description",
+    "typical_duration", "precautions"
+)
+CRITERION_COLUMNS = (
+    "id", "phase_id", "metric_name", "target_operator", "target_value",
+    "measurement_unit", "measurement_tool", "description"
+)
+SLOT_COLUMNS = (
+    "id", "phase_id", "order_index", "slot_type", "intent_description",
+    "standard_exercise", "regression", "progression",
+    "high_density_option", "high_density_rationale",
+    "sets_reps_guidance", "frequency", "equipment_required"
+)
+
+# Protocol Vault markdown: headings split documents into search sections,
+# emphasis/code markers are dropped from the indexed text
+HEADING = re.compile(r"^(#{1,6})\s+(.*)$")
+MARKUP = re.compile(r"[*`]+")
+
+
+def protocol_hash(proto):
+    """Stable hash of a protocol subtree (key order in the seed doesn't matter)."""
+    canonical = json.dumps(proto, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def desired_rows(proto):
+    """Flatten one seed protocol into phase, criterion and slot row tuples."""
+    pathology_id = proto["id"]
+    phases, criteria, slots = {}, {}, {}
+    for phase in proto.get("phases", []):
+        phase_id = phase["id"]
+        phases[phase_id] = (
+            phase_id,
+            pathology_id,
+            phase["order_index"],
+            phase["name"],
+            phase["description"],
+            phase["typical_duration"],
+            phase["precautions"]
+        )
+        for crit in phase.get("exit_criteria", []):
+            criteria[crit["id"]] = (
+                crit["id"],
+                phase_id,
+                crit["metric_name"],
+                crit["target_operator"],
+                crit["target_value"],
+                crit["measurement_unit"],
+                crit["measurement_tool"],
+                crit["description"]
+            )
+        for slot in phase.get("programming", []):
+            slots[slot["id"]] = (
+                slot["id"],
+                phase_id,
+                slot["order_index"],
+                slot["slot_type"],
+                slot["intent_description"],
+                slot["standard_exercise"],
+                slot.get("regression"),
+                slot.get("progression"),
+                slot.get("high_density_option"),
+                slot.get("high_density_rationale"),
+                slot.get("sets_reps_guidance"),
+                slot.get("frequency"),
+                json.dumps(slot.get("equipment_required", []))
+            )
+    return phases, criteria, slots
+
+
+def stored_rows(cursor, pathology_id):
+    """Current phase, criterion and slot rows for one pathology, keyed by id."""
+    phases = {
+        row[0]: tuple(row)
+        for row in cursor.execute(
+            f"SELECT {', '.join(PHASE_COLUMNS)} FROM phases WHERE pathology_id = ?",
+            (pathology_id,)
+        )
+    }
+    criteria = {
+        row[0]: tuple(row)
+        for row in cursor.execute(f"""
+            SELECT {', '.join('ec.' + c for c in CRITERION_COLUMNS)} FROM exit_criteria ec
+            JOIN phases ph ON ec.phase_id = ph.id WHERE ph.pathology_id = ?
+        """, (pathology_id,))
+    }
+    slots = {
+        row[0]: tuple(row)
+        for row in cursor.execute(f"""
+            SELECT {', '.join('ps.' + c for c in SLOT_COLUMNS)} FROM programming_slots ps
+            JOIN phases ph ON ps.phase_id = ph.id WHERE ph.pathology_id = ?
+        """, (pathology_id,))
+    }
+    return phases, criteria, slots
+
+
+def diff_rows(desired, stored):
+    """Split into (inserts, updates, deleted ids)."""
+    inserts = [row for key, row in desired.items() if key not in stored]
+    updates = [row for key, row in desired.items() if key in stored and stored[key] != row]
+    deletes = [key for key in stored if key not in desired]
+    return inserts, updates, deletes
+
+
+class ProtocolChangeSet:
+    """Row-level changes for a whole library run, applied with executemany."""
+
+    def __init__(self):
+        self.pathologies = []
+        self.phases = ([], [], [])
+        self.criteria = ([], [], [])
+        self.slots = ([], [], [])
+        self.hashes = []
+        self.reordered_phases = []
+        self.reordered_slots = []
+
+    def add(self, diff_phases, diff_criteria, diff_slots, stored_phases, stored_slots):
+        for bucket, diff in ((self.phases, diff_phases), (self.criteria, diff_criteria), (self.slots, diff_slots)):
+            for target, rows in zip(bucket, diff):
+                target.extend(rows)
+        # order_index is UNIQUE per parent; moved rows are parked first
+        self.reordered_phases.extend(
+            (row[0],) for row in diff_phases[1] if stored_phases[row[0]][2] != row[2]
+        )
+        self.reordered_slots.extend(
+            (row[0],) for row in diff_slots[1]
+            if stored_slots[row[0]][1:3] != row[1:3]
+        )
+
+    def counts(self):
+        return {
+            name: {"inserted": len(ins), "updated": len(upd), "deleted": len(dele)}
+            for name, (ins, upd, dele) in (
+                ("phases", self.phases), ("criteria", self.criteria), ("slots", self.slots)
+            )
+        }
+
+
+def pathology_row(proto):
+    return (
+        proto["id"],
+        proto["name"],
+        proto["osics_code"],
+        proto["body_region"],
+        proto["injury_mechanism"],
+        proto["research_source"],
+        proto["research_doi"],
+        json.dumps(proto.get("contraindications", []))
+    )
+
+
+def plan_protocol(cursor, proto, changes):
+    """
+    Diff one protocol against the database and queue its row changes.
+    Returns True if anything differs (which bumps pathologies.version).
+    """
+    want = pathology_row(proto)
+    stored = cursor.execute("""
+        SELECT id, name, osics_code, body_region, injury_mechanism,
+               research_source, research_doi, contraindications
+        FROM pathologies WHERE id = ?
+    """, (proto["id"],)).fetchone()
+
+    stored_phases, stored_criteria, stored_slots = stored_rows(cursor, proto["id"])
+    want_phases, want_criteria, want_slots = desired_rows(proto)
+    diffs = (
+        diff_rows(want_phases, stored_phases),
+        diff_rows(want_criteria, stored_criteria),
+        diff_rows(want_slots, stored_slots),
+    )
+
+    changed = stored is None or tuple(stored) != want or any(any(part) for diff in diffs for part in diff)
+    if changed:
+        changes.pathologies.append(want)
+        changes.add(*diffs, stored_phases, stored_slots)
+    return changed
+
+
+def apply_changes(cursor, changes):
+    """Apply a ProtocolChangeSet in dependency order inside the caller's transaction."""
+    phase_ins, phase_upd, phase_del = changes.phases
+    crit_ins, crit_upd, crit_del = changes.criteria
+    slot_ins, slot_upd, slot_del = changes.slots
+
+    # 1. Pathologies (upsert, never REPLACE: a REPLACE would cascade-delete phases)
+    cursor.executemany("""
+        INSERT INTO pathologies (
+            id, name, osics_code, body_region, injury_mechanism,
+            research_source, research_doi, contraindications,
+            version, is_active, updated_at
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, 1, 1, datetime('now'))
+        ON CONFLICT(id) DO UPDATE SET
+            name = excluded.name,
+            osics_code = excluded.osics_code,
+            body_region = excluded.body_region,
+            injury_mechanism = excluded.injury_mechanism,
+            research_source = excluded.research_source,
+            research_doi = excluded.research_doi,
+            contraindications = excluded.contraindications,
+            version = pathologies.version + 1,
+            is_active = 1,
+            updated_at = datetime('now')
+    """, changes.pathologies)
+
+    # 2. Removals. Recordings keep their value and metric_name but are
+    #    detached from a criterion that no longer exists.
+    #    (A removed phase's criteria and slots are already in the delete lists.)
+    removed_criteria = [(cid,) for cid in crit_del]
+    cursor.executemany("UPDATE metric_recordings SET criterion_id = NULL WHERE criterion_id = ?", removed_criteria)
+    cursor.executemany("DELETE FROM latest_metric WHERE criterion_id = ?", removed_criteria)
+    cursor.executemany("DELETE FROM exit_criteria WHERE id = ?", removed_criteria)
+    cursor.executemany("DELETE FROM programming_slots WHERE id = ?", [(sid,) for sid in slot_del])
+    for phase_id in phase_del:
+        in_use = cursor.execute("""
+            SELECT
+                EXISTS(SELECT 1 FROM client_journeys WHERE current_phase_id = ?)
+                OR EXISTS(SELECT 1 FROM metric_recordings WHERE phase_id = ?)
+                OR EXISTS(SELECT 1 FROM phase_completions WHERE phase_id = ?)
+        """, (phase_id, phase_id, phase_id)).fetchone()[0]
+        if in_use:
+            raise sqlite3.IntegrityError(
+                f"Phase {phase_id} was removed from the seed but client journeys still reference it"
+            )
+    cursor.executemany("DELETE FROM phases WHERE id = ?", [(pid,) for pid in phase_del])
+
+    # 3. Park rows whose order_index moves so UNIQUE(parent, order_index) holds mid-update
+    cursor.executemany("UPDATE phases SET order_index = -1 - rowid WHERE id = ?", changes.reordered_phases)
+    cursor.executemany("UPDATE programming_slots SET order_index = -1 - rowid WHERE id = ?", changes.reordered_slots)
+
+    # 4. Phases, then the criteria and slots that hang off them
+    cursor.executemany("""
+        UPDATE phases SET
+            pathology_id = ?, order_index = ?, name = ?, description = ?,
+            typical_duration = ?, precautions = ?, updated_at = datetime('now')
+        WHERE id = ?
+    """, [row[1:] + row[:1] for row in phase_upd])
+    cursor.executemany("""
+        INSERT INTO phases (
+            id, pathology_id, order_index, name, description,
+            typical_duration, precautions, updated_at
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, datetime('now'))
+    """, phase_ins)
+
+    cursor.executemany("""
+        UPDATE exit_criteria SET
+            phase_id = ?, metric_name = ?, target_operator = ?, target_value = ?,
+            measurement_unit = ?, measurement_tool = ?, description = ?
+        WHERE id = ?
+    """, [row[1:] + row[:1] for row in crit_upd])
+    cursor.executemany("""
+        INSERT INTO exit_criteria (
+            id, phase_id, metric_name, target_operator, target_value,
+            measurement_unit, measurement_tool, description
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    """, crit_ins)
+
+    cursor.executemany("""
+        UPDATE programming_slots SET
+            phase_id = ?, order_index = ?, slot_type = ?, intent_description = ?,
+            standard_exercise = ?, regression = ?, progression = ?,
+            high_density_option = ?, high_density_rationale = ?,
+            sets_reps_guidance = ?, frequency = ?, equipment_required = ?,
+            updated_at = datetime('now')
+        WHERE id = ?
+    """, [row[1:] + row[:1] for row in slot_upd])
+    cursor.executemany("""
+        INSERT INTO programming_slots (
+            id, phase_id, order_index, slot_type, intent_description,
+            standard_exercise, regression, progression,
+            high_density_option, high_density_rationale,
+            sets_reps_guidance, frequency, equipment_required,
+            updated_at
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, datetime('now'))
+    """, slot_ins)
+
+    # 5. Remember what was applied
+    cursor.executemany("""
+        INSERT INTO protocol_hashes (pathology_id, content_hash, updated_at)
+        VALUES (?, ?, datetime('now'))
+        ON CONFLICT(pathology_id) DO UPDATE SET
+            content_hash = excluded.content_hash,
+            updated_at = excluded.updated_at
+    """, changes.hashes)
+
+
+def sync_protocols(cursor, protocols, force=False, verbose=True):
+    """
+    Bring the protocol tables in line with `protocols`, touching only the
+    rows that differ. Protocols whose subtree hash matches the stored hash
+    are skipped without reading their rows (unless `force`).
+    Returns (changed_protocol_names, ProtocolChangeSet).
+    """
+    ids = [proto["id"] for proto in protocols]
+    stored_hashes = {}
+    for start in range(0, len(ids), 500):
+        chunk = ids[start:start + 500]
+        stored_hashes.update(cursor.execute(f"""
+            SELECT pathology_id, content_hash FROM protocol_hashes
+            WHERE pathology_id IN ({",".join("?" * len(chunk))})
+        """, chunk))
+    changes = ProtocolChangeSet()
+    changed = []
+
+    for proto in protocols:
+        pathology_id = proto["id"]
+        content_hash = protocol_hash(proto)
+        if not force and stored_hashes.get(pathology_id) == content_hash:
+            continue
+
+        changes.hashes.append((pathology_id, content_hash))
+        if plan_protocol(cursor, proto, changes):
+            if verbose:
+                print(f"  - Integrating: {proto['name']} ({proto['osics_code']})...")
+            changed.append(proto["name"])
+
+    apply_changes(cursor, changes)
+    return changed, changes
+
+
+def document_sections(text):
+    """
+    Split a Protocol Vault markdown document into (slug, heading, body)
+    sections at its ## / ### headings. Text before the first such heading
+    is filed under the document's # title.
+    """
+    sections, heading, lines = [], None, []
+
+    def close():
+        body = " ".join(MARKUP.sub("", " ".join(lines)).split())
+        if heading and body:
+            sections.append((heading, body))
+
+    for line in text.splitlines():
+        match = HEADING.match(line)
+        if match and (len(match.group(1)) in (2, 3) or heading is None):
+            close()
+            heading, lines = match.group(2).strip(), []
+        elif line.strip() != "---":
+            lines.append(line)
+    close()
+
+    seen = {}
+    result = []
+    for heading, body in sections:
+        slug = "-".join(re.findall(r"[a-z0-9]+", heading.lower())) or "section"
+        seen[slug] = seen.get(slug, 0) + 1
+        if seen[slug] > 1:
+            slug = f"{slug}-{seen[slug]}"
+        result.append((slug, heading, body))
+    return result
+
+
+def sync_documents(cursor, docs_dir=PROTOCOLS_DIR):
+    """
+    Index the Protocol Vault (docs_dir/*.md) for library search, one row per
+    section. Only sections whose text changed are rewritten; sections of
+    edited or deleted documents that no longer exist are dropped.
+    Returns (written, deleted).
+    """
+    pathology_ids = {row[0] for row in cursor.execute("SELECT id FROM pathologies")}
+    desired = {}
+    for path in sorted(glob.glob(os.path.join(docs_dir, "*.md"))):
+        doc_id = os.path.splitext(os.path.basename(path))[0]
+        with open(path, "r", encoding="utf-8") as f:
+            text = f.read()
+        pathology_id = doc_id if doc_id in pathology_ids else None
+        for slug, heading, body in document_sections(text):
+            desired[f"{doc_id}#{slug}"] = (pathology_id, heading, body)
+
+    stored = {
+        ref_id: (pathology_id, title, body)
+        for ref_id, pathology_id, title, body in cursor.execute("""
+            SELECT ref_id, pathology_id, title, body
+            FROM library_search_content WHERE kind = 'document'
+        """)
+    }
+    changed = [
+        (ref_id, *row) for ref_id, row in desired.items() if stored.get(ref_id) != row
+    ]
+    removed = [(ref_id,) for ref_id in stored if ref_id not in desired]
+
+    cursor.executemany("""
+        INSERT INTO library_search_content (kind, ref_id, pathology_id, title, body)
+        VALUES ('document', ?, ?, ?, ?)
+        ON CONFLICT(kind, ref_id) DO UPDATE SET
+            pathology_id = excluded.pathology_id,
+            title = excluded.title,
+            body = excluded.body
+    """, changed)
+    cursor.executemany(
+        "DELETE FROM library_search_content WHERE kind = 'document' AND ref_id = ?", removed
+    )
+    return len(changed), len(removed)
+
+
+def seed_demo_client(cursor, reset=False):
+    """
+    Create a Mock Client Journey (Marcus D.) for Demo.
+    The loader runs on every deploy against a kept database, so an existing
+    demo journey (its progress, completions and recordings) is left alone
+    unless `reset`. Returns True if the demo client was (re)created.
+    """
+    exists = cursor.execute(
+        "SELECT 1 FROM client_journeys WHERE client_id = 'CLT_DEMO_01'"
+    ).fetchone()
+    if exists and not reset:
+        print("  - Demo Client: Marcus D. already present, kept")
+        return False
+    print("  - Creating Demo Client: Marcus D...")
+
+    # Client
+    cursor.execute("""
+        INSERT OR REPLACE INTO clients (id, display_name, intake_date, terminal_goal, sport_activity)
+        VALUES ('CLT_DEMO_01', 'Marcus D.', '2026-01-15', 'Return to 315lb Squat', 'Powerlifting')
+    """)
+
+    # ACTIVE Journey: ACL Reconstruction
+    cursor.execute("DELETE FROM client_journeys WHERE client_id = 'CLT_DEMO_01'") # clear old
+    cursor.execute("""
+        INSERT INTO client_journeys (id, client_id, pathology_id, current_phase_id, status, started_at)
+        VALUES ('JRN_DEMO_ACL', 'CLT_DEMO_01', 'PATH_ACL_01', 'PHASE_ACL_01_P1', 'active', '2026-01-15')
+    """)
+
+    # Add some mock completions for Phase 1 criteria (3/4 met)
+    # We need the Exit Criteria IDs for Phase 1 of ACL
+    # EC_ACL_P1_02 (Quad Lag) -> Met
+    # EC_ACL_P1_03 (Pain) -> Met
+    # EC_ACL_P1_04 (Effusion) -> Met
+    # EC_ACL_P1_01 (Extension) -> Not Met (3 deg)
+
+    cursor.execute("""
+        INSERT INTO metric_recordings (id, journey_id, phase_id, criterion_id, metric_name, recorded_value, measurement_unit, recorded_at)
+        VALUES
+        ('REC_01', 'JRN_DEMO_ACL', 'PHASE_ACL_01_P1', 'EC_ACL_P1_02', 'quad_lag', '0', 'degrees', datetime('now', '-1 day')),
+        ('REC_02', 'JRN_DEMO_ACL', 'PHASE_ACL_01_P1', 'EC_ACL_P1_03', 'pain_level', '1', 'VAS (0-10)', datetime('now', '-1 day')),
+        ('REC_03', 'JRN_DEMO_ACL', 'PHASE_ACL_01_P1', 'EC_ACL_P1_04', 'effusion', '1', 'grade (0-3)', datetime('now', '-1 day')),
+        ('REC_04', 'JRN_DEMO_ACL', 'PHASE_ACL_01_P1', 'EC_ACL_P1_01', 'knee_extension', '3', 'degrees', datetime('now', '-1 day'))
+    """)
+    return True
+
 
-def load_seed_data():
+def bump_library_version(cursor):
+    """Bump the library version so API workers drop cached protocol trees."""
+    cursor.execute("""
+        INSERT INTO library_version (id, counter, updated_at) VALUES (1, 1, datetime('now'))
+        ON CONFLICT(id) DO UPDATE SET counter = counter + 1, updated_at = datetime('now')
+    """)
+
+
+def load_seed_data(force=False, reset_demo=False):
     """
     Loads base_seed.json into the SQLite database.
-    This script wipes existing data for the protocols being loaded to ensure idempotency.
+    Only protocols whose content changed since the last load are rewritten,
+    and only their changed rows; pathologies.version is bumped for each.
     """
-    
+
     if not os.path.exists(SEED_PATH):
         print(f"Error: Seed file not found at {SEED_PATH}")
         sys.exit(1)
-        
+
     print(f"Loading seed data from {SEED_PATH}...")
-    
+
     try:
         with open(SEED_PATH, 'r') as f:
             data = json.load(f)
@@ -30,138 +493,32 @@ def load_seed_data():
     conn = sqlite3.connect(DB_PATH)
     conn.execute("PRAGMA foreign_keys = ON;")
     cursor = conn.cursor()
-    
+
     try:
         cursor.execute("BEGIN TRANSACTION;")
 
-        for proto in protocols:
-            pathology_id = proto["id"]
-            print(f"  - Integrating: {proto['name']} ({proto['osics_code']})...")
-
-            # 1. Upsert Pathology
-            cursor.execute("""
-                INSERT OR REPLACE INTO pathologies (
-                    id, name, osics_code, body_region, injury_mechanism, 
-                    research_source, research_doi, contraindications, 
-                    version, is_active, updated_at
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, datetime('now'))
-            """, (
-                pathology_id,
-                proto["name"],
-                proto["osics_code"],
-                proto["body_region"],
-                proto["injury_mechanism"],
-                proto["research_source"],
-                proto["research_doi"],
-                json.dumps(proto.get("contraindications", [])),
-                1,  # Initial version
-                1   # active = true
-            ))
-
-            # Delete existing phases/criteria/slots for this pathology to ensure fresh load
-            # Due to cascading deletes, deleting phases handles everything else
-            cursor.execute("DELETE FROM phases WHERE pathology_id = ?", (pathology_id,))
-
-            # 2. Insert Phases
-            for phase in proto.get("phases", []):
-                phase_id = phase["id"]
-                
-                cursor.execute("""
-                    INSERT INTO phases (
-                        id, pathology_id, order_index, name, description, 
-                        typical_duration, precautions, updated_at
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, datetime('now'))
-                """, (
-                    phase_id,
-                    pathology_id,
-                    phase["order_index"],
-                    phase["name"],
-                    phase["description"],
-                    phase["typical_duration"],
-                    phase["precautions"]
-                ))
-                
-                # 3. Insert Exit Criteria
-                for crit in phase.get("exit_criteria", []):
-                    cursor.execute("""
-                        INSERT INTO exit_criteria (
-                            id, phase_id, metric_name, target_operator, target_value,
-                            measurement_unit, measurement_tool, description
-                        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                    """, (
-                        crit["id"],
-                        phase_id,
-                        crit["metric_name"],
-                        crit["target_operator"],
-                        crit["target_value"],
-                        crit["measurement_unit"],
-                        crit["measurement_tool"],
-                        crit["description"]
-                    ))
-
-                # 4. Insert Programming Slots
-                for slot in phase.get("programming", []):
-                    cursor.execute("""
-                        INSERT INTO programming_slots (
-                            id, phase_id, order_index, slot_type, intent_description,
-                            standard_exercise, regression, progression, 
-                            high_density_option, high_density_rationale,
-                            sets_reps_guidance, frequency, equipment_required,
-                            updated_at
-                        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, datetime('now'))
-                    """, (
-                        slot["id"],
-                        phase_id,
-                        slot["order_index"],
-                        slot["slot_type"],
-                        slot["intent_description"],
-                        slot["standard_exercise"],
-                        slot.get("regression"),
-                        slot.get("progression"),
-                        slot.get("high_density_option"),
-                        slot.get("high_density_rationale"),
-                        slot.get("sets_reps_guidance"),
-                        slot.get("frequency"),
-                        json.dumps(slot.get("equipment_required", []))
-                    ))
-
-        # 5. Create a Mock Client Journey (Marcus D.) for Demo
-        print("  - Creating Demo Client: Marcus D...")
-        
-        # Client
-        cursor.execute("""
-            INSERT OR REPLACE INTO clients (id, display_name, intake_date, terminal_goal, sport_activity)
-            VALUES ('CLT_DEMO_01', 'Marcus D.', '2026-01-15', 'Return to 315lb Squat', 'Powerlifting')
-        """)
-        
-        # ACTIVE Journey: ACL Reconstruction
-        cursor.execute("DELETE FROM client_journeys WHERE client_id = 'CLT_DEMO_01'") # clear old
-        cursor.execute("""
-            INSERT INTO client_journeys (id, client_id, pathology_id, current_phase_id, status, started_at)
-            VALUES ('JRN_DEMO_ACL', 'CLT_DEMO_01', 'PATH_ACL_01', 'PHASE_ACL_01_P1', 'active', '2026-01-15')
-        """)
+        # 1. Apply only the protocol rows that changed since the last load
+        changed, changes = sync_protocols(cursor, protocols, force=force)
 
-        # Add some mock completions for Phase 1 criteria (3/4 met)
-        # We need the Exit Criteria IDs for Phase 1 of ACL
-        # EC_ACL_P1_02 (Quad Lag) -> Met
-        # EC_ACL_P1_03 (Pain) -> Met
-        # EC_ACL_P1_04 (Effusion) -> Met
-        # EC_ACL_P1_01 (Extension) -> Not Met (3 deg)
-        
-        cursor.execute("""
-            INSERT INTO metric_recordings (id, journey_id, phase_id, criterion_id, metric_name, recorded_value, measurement_unit, recorded_at)
-            VALUES 
-            ('REC_01', 'JRN_DEMO_ACL', 'PHASE_ACL_01_P1', 'EC_ACL_P1_02', 'quad_lag', '0', 'degrees', datetime('now', '-1 day')),
-            ('REC_02', 'JRN_DEMO_ACL', 'PHASE_ACL_01_P1', 'EC_ACL_P1_03', 'pain_level', '1', 'VAS (0-10)', datetime('now', '-1 day')),
-            ('REC_03', 'JRN_DEMO_ACL', 'PHASE_ACL_01_P1', 'EC_ACL_P1_04', 'effusion', '1', 'grade (0-3)', datetime('now', '-1 day')),
-            ('REC_04', 'JRN_DEMO_ACL', 'PHASE_ACL_01_P1', 'EC_ACL_P1_01', 'knee_extension', '3', 'degrees', datetime('now', '-1 day'))
-        """)
+        # 2. Protocol Vault documents (the protocol rows index themselves via triggers)
+        docs_written, docs_deleted = sync_documents(cursor)
+
+        # 3. Demo client (only when missing, so redeploys keep its progress)
+        demo_created = seed_demo_client(cursor, reset=reset_demo)
+
+        # 4. Bump the library version so API workers drop cached protocol trees
+        if changed:
+            bump_library_version(cursor)
 
         conn.commit()
         print("Success: V-CORE Logic Engine successfully seeded.")
-        print(f"  - Protocols Loaded: {len(protocols)}")
-        print("  - Demo Client Created: Marcus D.")
-        
+        print(f"  - Protocols Loaded: {len(protocols)} ({len(changed)} changed, {len(protocols) - len(changed)} unchanged)")
+        for table, count in changes.counts().items():
+            print(f"  - {table}: +{count['inserted']} ~{count['updated']} -{count['deleted']}")
+        print(f"  - Search Documents: ~{docs_written} -{docs_deleted} sections")
+        if demo_created:
+            print("  - Demo Client Created: Marcus D.")
+
     except sqlite3.Error as e:
         conn.rollback()
         print(f"Database Error: {e}")
@@ -169,5 +526,128 @@ def load_seed_data():
     finally:
         conn.close()
 
+def apply_batch(conn, batch, force):
+    """
+    Sync one bounded batch in its own transaction. If the batch fails as a
+    whole, each protocol is retried under its own savepoint so a single bad
+    protocol is reported without rolling back the rest.
+    Returns (applied, changed, failures).
+    """
+    cursor = conn.cursor()
+    cursor.execute("BEGIN")
+    try:
+        cursor.execute("SAVEPOINT batch")
+        try:
+            changed, _ = sync_protocols(cursor, batch, force=force, verbose=False)
+            cursor.execute("RELEASE batch")
+            cursor.execute("COMMIT")
+            return len(batch), len(changed), []
+        except sqlite3.Error:
+            cursor.execute("ROLLBACK TO batch")
+            cursor.execute("RELEASE batch")
+
+        applied, changed_count, failures = 0, 0, []
+        for proto in batch:
+            cursor.execute("SAVEPOINT protocol")
+            try:
+                changed, _ = sync_protocols(cursor, [proto], force=force, verbose=False)
+                cursor.execute("RELEASE protocol")
+                applied += 1
+                changed_count += len(changed)
+            except sqlite3.Error as e:
+                cursor.execute("ROLLBACK TO protocol")
+                cursor.execute("RELEASE protocol")
+                failures.append((proto["id"], str(e)))
+        cursor.execute("COMMIT")
+        return applied, changed_count, failures
+    except BaseException:
+        if conn.in_transaction:
+            cursor.execute("ROLLBACK")
+        raise
+
+
+def load_seed_stream(seed_dir=SEED_DIR, batch_size=STREAM_BATCH_SIZE, force=False, reset_demo=False):
+    """
+    Stream every JSON / NDJSON shard in `seed_dir` into the database, one
+    protocol at a time, committing every `batch_size` protocols.
+    Memory use is bounded by one batch regardless of library size.
+    """
+    shards = seed_shards(seed_dir)
+    if not shards:
+        print(f"Error: No seed shards found in {seed_dir}")
+        sys.exit(1)
+
+    conn = sqlite3.connect(DB_PATH, isolation_level=None)
+    conn.execute("PRAGMA foreign_keys = ON;")
+    totals = {"seen": 0, "applied": 0, "changed": 0, "invalid": 0, "failed": 0}
+
+    def flush(batch, shard):
+        applied, changed, failures = apply_batch(conn, batch, force)
+        totals["applied"] += applied
+        totals["changed"] += changed
+        totals["failed"] += len(failures)
+        for pathology_id, error in failures:
+            print(f"    ! {pathology_id}: {error}")
+        print(f"  - {shard.name}: {totals['seen']} protocols read, "
+              f"{totals['applied']} applied ({totals['changed']} changed), "
+              f"{totals['invalid'] + totals['failed']} rejected")
+
+    try:
+        for shard in shards:
+            print(f"Streaming {shard}...")
+            batch = []
+            try:
+                for proto in iter_shard(shard):
+                    totals["seen"] += 1
+                    errors = validate_protocol(proto)
+                    if errors:
+                        totals["invalid"] += 1
+                        print(f"    ! invalid protocol #{totals['seen']}: {'; '.join(errors[:3])}")
+                        continue
+                    batch.append(proto)
+                    if len(batch) >= batch_size:
+                        flush(batch, shard)
+                        batch = []
+            except ValueError as e:
+                # Malformed shard: batches already committed from it are kept
+                print(f"    ! {shard.name}: parse error: {e}")
+            if batch:
+                flush(batch, shard)
+
+        cursor = conn.cursor()
+        cursor.execute("BEGIN")
+        has_demo_protocol = cursor.execute(
+            "SELECT 1 FROM phases WHERE id = 'PHASE_ACL_01_P1'"
+        ).fetchone()
+        if has_demo_protocol:
+            seed_demo_client(cursor, reset=reset_demo)
+        docs_written, docs_deleted = sync_documents(cursor)
+        if totals["changed"]:
+            bump_library_version(cursor)
+        cursor.execute("COMMIT")
+
+        print("Success: V-CORE Logic Engine successfully seeded.")
+        print(f"  - Protocols Read: {totals['seen']}")
+        print(f"  - Applied: {totals['applied']} ({totals['changed']} changed)")
+        print(f"  - Rejected: {totals['invalid']} invalid, {totals['failed']} failed")
+        print(f"  - Search Documents: ~{docs_written} -{docs_deleted} sections")
+    except sqlite3.Error as e:
+        print(f"Database Error: {e}")
+        sys.exit(1)
+    finally:
+        conn.close()
+
+
 if __name__ == "__main__":
-    load_seed_data()
+    parser = argparse.ArgumentParser(description="Load the Living Library seed into vector.db")
+    parser.add_argument("--force", action="store_true", help="diff every protocol, even if its hash is unchanged")
+    parser.add_argument("--stream", action="store_true", help=f"stream all JSON/NDJSON shards in --dir instead of {SEED_PATH}")
+    parser.add_argument("--dir", default=SEED_DIR, help="seed shard directory for --stream")
+    parser.add_argument("--batch-size", type=int, default=STREAM_BATCH_SIZE, help="protocols per transaction for --stream")
+    parser.add_argument("--reset-demo", action="store_true", help="recreate the demo client's journey, discarding its progress")
+    args = parser.parse_args()
+
+    if args.stream:
+        load_seed_stream(args.dir, args.batch_size, force=args.force, reset_demo=args.reset_demo)
+    else:
+        load_seed_data(force=args.force, reset_demo=args.reset_demo)
@@ -0,0 +1,238 @@
+"""
+PROJECT VECTOR — Streaming Seed Reader
+Calgary Strength & Physio
+
+Yields protocols one at a time from the shards in database/seeds/ so that
+loading a large Living Library never holds more than one protocol (plus a
+read buffer) in memory.
+
+Supported shard formats:
+  * *.json   — {"metadata": {...}, "protocols": [ {...}, ... ]} or a bare
+               top-level array of protocols. Only the protocols array is
+               streamed; other top-level values are parsed and discarded.
+  * *.ndjson — one protocol object per line.
+
+Each protocol is checked against PROTOCOL_SCHEMA before it is handed to the
+loader; see validate_protocol().
+"""
+
+import json
+from pathlib import Path
+
+CHUNK_SIZE = 64 * 1024
+
+_decoder = json.JSONDecoder()
+_WHITESPACE = " \t\n\r"
+
+
+# --- Validation ---
+
+# field -> (accepted types, required)
+CRITERION_FIELDS = {
+    "id": (str, True),
+    "metric_name": (str, True),
+    "target_operator": (str, True),
+    "target_value": (str, True),
+    "measurement_unit": ((str, type(None)), True),
+    "measurement_tool": ((str, type(None)), True),
+    "description": ((str, type(None)), True),
+}
+SLOT_FIELDS = {
+    "id": (str, True),
+    "order_index": (int, True),
+    "slot_type": (str, True),
+    "intent_description": ((str, type(None)), True),
+    "standard_exercise": (str, True),
+    "regression": ((str, type(None)), False),
+    "progression": ((str, type(None)), False),
+    "high_density_option": ((str, type(None)), False),
+    "high_density_rationale": ((str, type(None)), False),
+    "sets_reps_guidance": ((str, type(None)), False),
+    "frequency": ((str, type(None)), False),
+    "equipment_required": (list, False),
+}
+PHASE_FIELDS = {
+    "id": (str, True),
+    "order_index": (int, True),
+    "name": (str, True),
+    "description": ((str, type(None)), True),
+    "typical_duration": ((str, type(None)), True),
+    "precautions": ((str, type(None)), True),
+    "exit_criteria": (list, False),
+    "programming": (list, False),
+}
+PROTOCOL_FIELDS = {
+    "id": (str, True),
+    "name": (str, True),
+    "osics_code": ((str, type(None)), True),
+    "body_region": ((str, type(None)), True),
+    "injury_mechanism": ((str, type(None)), True),
+    "research_source": ((str, type(None)), True),
+    "research_doi": ((str, type(None)), True),
+    "contraindications": (list, False),
+    "phases": (list, True),
+}
+PROTOCOL_SCHEMA = {
+    "protocol": PROTOCOL_FIELDS,
+    "phase": PHASE_FIELDS,
+    "exit_criterion": CRITERION_FIELDS,
+    "slot": SLOT_FIELDS,
+}
+
+
+def _check(obj, fields, where, errors):
+    if not isinstance(obj, dict):
+        errors.append(f"{where}: expected an object")
+        return False
+    for name, (types, required) in fields.items():
+        if name not in obj:
+            if required:
+                errors.append(f"{where}.{name}: missing")
+        elif not isinstance(obj[name], types) or isinstance(obj[name], bool) and types is int:
+            errors.append(f"{where}.{name}: unexpected type {type(obj[name]).__name__}")
+    return True
+
+
+def validate_protocol(proto):
+    """Return a list of schema errors (empty if the protocol is valid)."""
+    errors = []
+    if not _check(proto, PROTOCOL_FIELDS, "protocol", errors):
+        return errors
+    where = f"protocol[{proto.get('id', '?')}]"
+    phase_orders = set()
+    for i, phase in enumerate(proto.get("phases") or []):
+        phase_where = f"{where}.phases[{i}]"
+        if not _check(phase, PHASE_FIELDS, phase_where, errors):
+            continue
+        if phase.get("order_index") in phase_orders:
+            errors.append(f"{phase_where}.order_index: duplicate {phase['order_index']}")
+        phase_orders.add(phase.get("order_index"))
+        for j, crit in enumerate(phase.get("exit_criteria") or []):
+            _check(crit, CRITERION_FIELDS, f"{phase_where}.exit_criteria[{j}]", errors)
+        slot_orders = set()
+        for j, slot in enumerate(phase.get("programming") or []):
+            if _check(slot, SLOT_FIELDS, f"{phase_where}.programming[{j}]", errors):
+                if slot.get("order_index") in slot_orders:
+                    errors.append(f"{phase_where}.programming[{j}].order_index: duplicate {slot['order_index']}")
+                slot_orders.add(slot.get("order_index"))
+    return errors
+
+
+# --- Streaming JSON ---
+
+class _Reader:
+    """Sliding text buffer over a file; consumed text is discarded."""
+
+    def __init__(self, f):
+        self.f = f
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+
+    def fill(self):
+        if self.eof:
+            return False
+        chunk = self.f.read(CHUNK_SIZE)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self):
+        """Next non-whitespace character (not consumed), or '' at EOF."""
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self.fill():
+                return ""
+
+    def expect(self, char):
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"expected {char!r}, found {found or 'end of file'!r}")
+        self.pos += 1
+
+    def value(self):
+        """Decode one complete JSON value, reading more input as needed."""
+        self.peek()
+        while True:
+            try:
+                obj, end = _decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if self.fill():
+                    continue
+                raise
+            # A number at the very end of the buffer may be cut short
+            if end == len(self.buf) and not self.eof and self.fill():
+                continue
+            self.pos = end
+            return obj
+
+
+def _iter_array(reader):
+    reader.expect("[")
+    if reader.peek() == "]":
+        reader.pos += 1
+        return
+    while True:
+        yield reader.value()
+        if reader.peek() == ",":
+            reader.pos += 1
+            continue
+        reader.expect("]")
+        return
+
+
+def iter_json_shard(path):
+    """Yield protocols from a .json shard without loading the whole file."""
+    with open(path, "r", encoding="utf-8") as f:
+        reader = _Reader(f)
+        if reader.peek() == "[":
+            yield from _iter_array(reader)
+            return
+        reader.expect("{")
+        if reader.peek() == "}":
+            return
+        while True:
+            key = reader.value()
+            reader.expect(":")
+            if key == "protocols":
+                yield from _iter_array(reader)
+            else:
+                reader.value()
+            if reader.peek() == ",":
+                reader.pos += 1
+                continue
+            reader.expect("}")
+            return
+
+
+def iter_ndjson_shard(path):
+    with open(path, "r", encoding="utf-8") as f:
+        for line_no, line in enumerate(f, 1):
+            line = line.strip()
+            if line:
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError as e:
+                    raise ValueError(f"line {line_no}: {e}") from e
+
+
+def seed_shards(seed_dir):
+    """Shard files in `seed_dir`, in name order."""
+    seed_dir = Path(seed_dir)
+    return sorted(
+        p for p in seed_dir.iterdir()
+        if p.is_file() and p.suffix in (".json", ".ndjson")
+    )
+
+
+def iter_shard(path):
+    path = Path(path)
+    if path.suffix == ".ndjson":
+        return iter_ndjson_shard(path)
+    return iter_json_shard(path)
@@ -0,0 +1,140 @@
+"""
+PROJECT VECTOR — Test Fixtures
+Calgary Strength & Physio
+
+Every test gets a fresh database file built from the real v_core.sql and
+loaded through load_base.sync_protocols: one three-phase protocol (one
+exit criterion per phase, `metric_<n>` must reach 10) and one client on
+its first phase. The `api` fixture serves backend.main against that file.
+
+Run from the repository root:
+    python -m pytest -q
+"""
+
+import sqlite3
+import sys
+from pathlib import Path
+
+import pytest
+from starlette.testclient import TestClient
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "scripts"))
+
+from backend import audit, main
+from backend.analytics import CohortAnalytics
+from backend.db import ConnectionPool
+from backend.events import JourneyEventBus
+from backend.progression import ProgressionEngine
+from backend.protocol_cache import ProtocolCache
+from backend.webhook_queue import WebhookQueue
+from backend.write_buffer import WriteBuffer
+from load_base import bump_library_version, sync_protocols
+
+SCHEMA_PATH = ROOT / "database/schema/v_core.sql"
+
+PATHOLOGY_ID = "PATH_TEST"
+CLIENT_ID = "CLT_TEST_01"
+JOURNEY_ID = "JRN_TEST_01"
+PHASE_COUNT = 3
+
+
+def phase_id(n):
+    return f"PHASE_TEST_P{n}"
+
+
+def criterion_id(n):
+    return f"EC_TEST_P{n}"
+
+
+def make_protocol(phases=PHASE_COUNT):
+    """A protocol in base_seed.json shape."""
+    return {
+        "id": PATHOLOGY_ID,
+        "name": "Test Protocol",
+        "osics_code": "TX01",
+        "body_region": "Knee",
+        "injury_mechanism": "Synthetic",
+        "research_source": "Test fixture",
+        "research_doi": None,
+        "contraindications": [],
+        "phases": [
+            {
+                "id": phase_id(n),
+                "order_index": n,
+                "name": f"Phase {n}",
+                "description": f"Test phase {n}",
+                "typical_duration": f"Weeks {n * 2}-{n * 2 + 2}",
+                "precautions": None,
+                "exit_criteria": [{
+                    "id": criterion_id(n),
+                    "metric_name": f"metric_{n}",
+                    "target_operator": ">=",
+                    "target_value": "10",
+                    "measurement_unit": "units",
+                    "measurement_tool": "Synthetic",
+                    "description": f"Metric {n} at least 10",
+                }],
+                "programming": [],
+            }
+            for n in range(1, phases + 1)
+        ],
+    }
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = tmp_path / "vector.db"
+    conn = sqlite3.connect(path)
+    conn.executescript(SCHEMA_PATH.read_text(encoding="utf-8"))
+    cursor = conn.cursor()
+    sync_protocols(cursor, [make_protocol()], verbose=False)
+    bump_library_version(cursor)
+    cursor.execute("""
+        INSERT INTO clients (id, display_name, intake_date, terminal_goal, sport_activity)
+        VALUES (?, 'Test Client', '2026-01-01', 'Return to sport', 'Synthetic')
+    """, (CLIENT_ID,))
+    cursor.execute("""
+        INSERT INTO client_journeys (id, client_id, pathology_id, current_phase_id, status, started_at)
+        VALUES (?, ?, ?, ?, 'active', '2026-01-01')
+    """, (JOURNEY_ID, CLIENT_ID, PATHOLOGY_ID, phase_id(1)))
+    conn.commit()
+    conn.close()
+    return path
+
+
+@pytest.fixture
+def pool(db_path):
+    pool = ConnectionPool(db_path, max_readers=4)
+    yield pool
+    pool.close()
+
+
+@pytest.fixture
+def api(db_path, tmp_path, monkeypatch):
+    """A started TestClient on backend.main, every service rebuilt on the test database."""
+    pool = ConnectionPool(db_path, max_readers=4)
+    buffer = WriteBuffer(pool)
+    cache = ProtocolCache(maxsize=128)
+    monkeypatch.setattr(audit, "AUDIT_LOG_DIR", tmp_path / "logs")
+    monkeypatch.setattr(main, "DB_PATH", db_path)
+    monkeypatch.setattr(main, "_preloaded", False)
+    monkeypatch.setattr(main, "db_pool", pool)
+    monkeypatch.setattr(main, "write_buffer", buffer)
+    monkeypatch.setattr(main, "webhook_queue", WebhookQueue(pool, write_buffer=buffer, workers=1))
+    monkeypatch.setattr(main, "protocol_cache", cache)
+    monkeypatch.setattr(main, "cohort_analytics", CohortAnalytics(cache))
+    monkeypatch.setattr(main, "journey_events", JourneyEventBus())
+    monkeypatch.setattr(main, "progression", ProgressionEngine(cache, on_event=main.publish_after_commit))
+    with TestClient(main.create_app()) as client:
+        yield client
+
+
+def insert_recording(cursor, recording_id, n, value, recorded_at="2026-02-01T09:00:00"):
+    """One metric_recordings row against criterion `n` of the test journey."""
+    cursor.execute("""
+        INSERT INTO metric_recordings
+        (id, journey_id, phase_id, criterion_id, metric_name, recorded_value, measurement_unit, recorded_at)
+        VALUES (?, ?, ?, ?, ?, ?, 'units', ?)
+    """, (recording_id, JOURNEY_ID, phase_id(n), criterion_id(n), f"metric_{n}", str(value), recorded_at))
@@ -0,0 +1,62 @@
+"""Cohort analytics with watermark-based incremental refresh (backend/analytics.py)."""
+
+from datetime import date
+
+from backend.analytics import CohortAnalytics, read_watermark
+from backend.protocol_cache import ProtocolCache
+from conftest import PATHOLOGY_ID, insert_recording, phase_id
+
+TODAY = date(2026, 3, 1)
+
+
+def report(pool, analytics):
+    with pool.reader() as conn:
+        cursor = conn.cursor()
+        pathology = cursor.execute("""
+            SELECT id, version, (SELECT counter FROM library_version WHERE id = 1) as library_version
+            FROM pathologies WHERE id = ?
+        """, (PATHOLOGY_ID,)).fetchone()
+        return analytics.report(cursor, pathology, read_watermark(cursor), today=TODAY)
+
+
+def add_journey(cursor, n):
+    cursor.execute("""
+        INSERT INTO clients (id, display_name, intake_date) VALUES (?, ?, '2026-01-01')
+    """, (f"CLT_TEST_{n:02d}", f"Client {n}"))
+    cursor.execute("""
+        INSERT INTO client_journeys (id, client_id, pathology_id, current_phase_id, status, started_at)
+        VALUES (?, ?, ?, ?, 'active', '2026-01-01')
+    """, (f"JRN_TEST_{n:02d}", f"CLT_TEST_{n:02d}", PATHOLOGY_ID, phase_id(1)))
+
+
+def test_only_journeys_past_the_watermark_are_resummarized(pool):
+    analytics = CohortAnalytics(ProtocolCache())
+    first, refreshed = report(pool, analytics)
+    assert refreshed == 1 and first["journeys"]["total"] == 1
+
+    assert report(pool, analytics)[1] == 0
+
+    with pool.writer() as conn:
+        add_journey(conn.cursor(), 2)
+    second, refreshed = report(pool, analytics)
+    assert refreshed == 1 and second["journeys"]["total"] == 2
+
+    with pool.writer() as conn:
+        insert_recording(conn.cursor(), "REC_1", 1, 12, recorded_at="2026-01-15T09:00:00")
+    incremental, refreshed = report(pool, analytics)
+    assert refreshed == 1
+
+    # Same answer as a cold rebuild
+    assert incremental == report(pool, CohortAnalytics(ProtocolCache()))[0]
+    criteria = incremental["phases"][0]["criteria"]
+    assert criteria[0]["timeToMetDays"]["count"] == 1
+    assert analytics.stats()["full_refreshes"] == 1
+
+
+def test_library_reload_rebuilds_the_pathology(pool):
+    analytics = CohortAnalytics(ProtocolCache())
+    report(pool, analytics)
+    with pool.writer() as conn:
+        conn.execute("UPDATE library_version SET counter = counter + 1 WHERE id = 1")
+    assert report(pool, analytics)[1] == 1
+    assert analytics.stats()["full_refreshes"] == 2
@@ -0,0 +1,245 @@
+"""HTTP endpoints end to end through a TestClient (backend/main.py)."""
+
+import asyncio
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+from backend import main
+from backend.db import ConnectionPool
+from conftest import CLIENT_ID, JOURNEY_ID, PATHOLOGY_ID, criterion_id, insert_recording, make_protocol, phase_id
+from load_base import bump_library_version, sync_protocols
+
+
+def journey_criterion(api, n):
+    phases = api.get(f"/api/client/{CLIENT_ID}/journey").json()["phases"]
+    return phases[n - 1]["criteria"][0]
+
+
+def test_streamed_readings_are_visible_to_the_next_journey_read(api):
+    accepted = api.post("/api/metric/stream", json={"records": [
+        {"client_id": CLIENT_ID, "metric_name": "metric_1", "value": "4", "unit": "units"},
+        {"client_id": "CLT_UNKNOWN", "metric_name": "metric_1", "value": "4"},
+    ]})
+    assert accepted.status_code == 202
+    assert (accepted.json()["accepted"], accepted.json()["rejected"]) == (1, 1)
+
+    # Write-behind: the response did not wait for the commit, the read does
+    assert journey_criterion(api, 1)["current"] == "4 units"
+    assert api.get("/api/metric/stream/stats").json()["committed"] == 1
+
+
+def test_busy_reader_pool_answers_503_with_retry_after(api, db_path, monkeypatch):
+    pool = ConnectionPool(db_path, max_readers=1, checkout_timeout=0.01)
+    monkeypatch.setattr(main, "db_pool", pool)
+    try:
+        with pool.reader():
+            busy = api.get(f"/api/client/{CLIENT_ID}/journey")
+        assert busy.status_code == 503
+        assert busy.headers["retry-after"] == str(main.DB_POOL_RETRY_AFTER_SECONDS)
+        assert api.get(f"/api/client/{CLIENT_ID}/journey").status_code == 200
+    finally:
+        pool.close()
+
+
+def test_caseload_page_releases_its_reader_before_streaming(api, db_path, monkeypatch):
+    pool = ConnectionPool(db_path, max_readers=1, checkout_timeout=0.01)
+    monkeypatch.setattr(main, "db_pool", pool)
+    try:
+        async def mid_stream():
+            response = main.get_caseload_readiness(after=None, limit=10)
+            await response.body_iterator.__anext__()
+            # The only reader is free while the client is still draining the page
+            with pool.reader():
+                pass
+            await response.body_iterator.aclose()
+
+        asyncio.run(mid_stream())
+        body = api.get("/api/caseload/readiness").json()
+    finally:
+        pool.close()
+    assert body["count"] == 1 and body["nextCursor"] is None
+    assert body["journeys"][0] == {
+        "journeyId": JOURNEY_ID, "clientId": CLIENT_ID, "clientName": "Test Client",
+        "pathologyId": PATHOLOGY_ID, "phaseId": phase_id(1), "phaseName": "Phase 1",
+        "met": 0, "total": 1, "ready": False, "unmet": ["metric_1"],
+    }
+
+
+def test_caseload_readiness_uses_the_compiled_protocol(api, db_path):
+    conn = sqlite3.connect(db_path)
+    insert_recording(conn.cursor(), "REC_MET", 1, 12)
+    conn.commit()
+    conn.close()
+
+    journey = api.get("/api/caseload/readiness").json()["journeys"][0]
+    assert (journey["met"], journey["total"], journey["ready"], journey["unmet"]) == (1, 1, True, [])
+    assert main.protocol_cache.stats()["hits"] >= 1
+
+
+def grow_protocol(db_path, phases, criteria_per_phase):
+    """Re-sync the test protocol with more phases and exit criteria per phase."""
+    protocol = make_protocol(phases)
+    for phase in protocol["phases"]:
+        first = phase["exit_criteria"][0]
+        phase["exit_criteria"] += [
+            dict(first, id=f"{first['id']}_{k}", metric_name=f"{first['metric_name']}_{k}")
+            for k in range(1, criteria_per_phase)
+        ]
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    sync_protocols(cursor, [protocol], verbose=False)
+    bump_library_version(cursor)
+    conn.commit()
+    conn.close()
+
+
+def test_journey_query_count_does_not_grow_with_the_protocol(api, db_path):
+    counts = []
+    for phases, criteria_per_phase in [(3, 1), (6, 3), (12, 5)]:
+        grow_protocol(db_path, phases, criteria_per_phase)
+        cold = api.get(f"/api/client/{CLIENT_ID}/journey")
+        warm = api.get(f"/api/client/{CLIENT_ID}/journey")
+        assert len(warm.json()["phases"]) == phases
+        assert len(warm.json()["phases"][-1]["criteria"]) == criteria_per_phase
+        counts.append((cold.headers["x-db-queries"], warm.headers["x-db-queries"]))
+    assert len(set(counts)) == 1
+
+
+def test_journey_payload_shape(api):
+    journey = api.get(f"/api/client/{CLIENT_ID}/journey").json()
+    assert journey["client"] == {
+        "name": "Test Client", "sport": "Synthetic", "terminalGoal": "Return to sport",
+        "pathology": "Test Protocol", "protocolId": PATHOLOGY_ID,
+        "researchSource": "Test fixture", "researchDoi": None,
+        "startDate": "2026-01-01", "nextSession": journey["client"]["nextSession"], "currentPhaseIndex": 0,
+    }
+    assert [phase["status"] for phase in journey["phases"]] == ["active", "locked", "locked"]
+    assert set(journey["phases"][0]) == {"name", "status", "description", "typicalDuration", "criteria", "programming"}
+    assert journey["phases"][0]["criteria"] == [{
+        "id": criterion_id(1), "label": "metric_1 >= 10 units", "target": ">= 10", "current": None, "met": False,
+    }]
+
+
+def test_unchanged_journey_revalidates_with_304(api):
+    first = api.get(f"/api/client/{CLIENT_ID}/journey")
+    etag = first.headers["etag"]
+    revalidated = api.get(f"/api/client/{CLIENT_ID}/journey", headers={"If-None-Match": etag})
+    assert revalidated.status_code == 304
+    assert revalidated.headers["etag"] == etag
+    assert revalidated.content == b""
+
+
+def test_recording_a_metric_changes_the_journey_etag(api):
+    etag = api.get(f"/api/client/{CLIENT_ID}/journey").headers["etag"]
+    recorded = api.post("/api/metric/record", json={"client_id": CLIENT_ID, "metric_name": "metric_1", "value": "4"})
+    assert recorded.status_code == 200
+
+    changed = api.get(f"/api/client/{CLIENT_ID}/journey", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["etag"] != etag
+    assert changed.json()["phases"][0]["criteria"][0]["current"] == "4 units"
+
+
+def test_protocol_content_revalidates_on_if_modified_since(api):
+    first = api.get("/api/protocol/PATH_ACL_01")
+    assert first.status_code == 200 and first.json()["id"] == "PATH_ACL_01"
+    revalidated = api.get("/api/protocol/PATH_ACL_01", headers={"If-Modified-Since": first.headers["last-modified"]})
+    assert revalidated.status_code == 304
+    assert revalidated.headers["etag"] == first.headers["etag"]
+    # A validator from before the file's mtime gets the document again
+    assert api.get("/api/protocol/PATH_ACL_01", headers={
+        "If-Modified-Since": "Mon, 01 Jan 2001 00:00:00 GMT"
+    }).status_code == 200
+
+
+def test_metric_batch_reports_failures_per_index(api):
+    response = api.post("/api/metric/record/batch", json={"records": [
+        {"client_id": CLIENT_ID, "metric_name": "metric_1", "value": "4", "unit": "units"},
+        {"client_id": "CLT_UNKNOWN", "metric_name": "metric_1", "value": "4"},
+        {"client_id": CLIENT_ID, "metric_name": "metric_2", "value": "4"},
+    ]})
+    assert response.status_code == 200
+    body = response.json()
+    assert (body["recorded"], body["failed"], body["advanced"]) == (1, 2, [])
+    assert [(r["index"], r["status"]) for r in body["results"]] == [(0, "success"), (1, "error"), (2, "error")]
+    assert body["results"][1]["detail"] == "No active journey found for this client"
+    assert body["results"][2]["detail"] == "Metric 'metric_2' is not an exit criterion for current phase"
+    assert body["results"][0]["recording_id"].startswith("REC")
+
+
+def test_metric_batch_above_the_limit_is_rejected(api, monkeypatch):
+    monkeypatch.setattr(main, "METRIC_BATCH_MAX", 2)
+    record = {"client_id": CLIENT_ID, "metric_name": "metric_1", "value": "4"}
+    assert api.post("/api/metric/record/batch", json={"records": [record] * 3}).status_code == 413
+    assert api.post("/api/metric/record/batch", json={"records": [record] * 2}).status_code == 200
+
+
+def test_metric_batch_is_visible_to_the_next_read(api):
+    api.post("/api/metric/record/batch", json={"records": [
+        {"client_id": CLIENT_ID, "metric_name": "metric_1", "value": "12", "unit": "units"},
+    ]})
+    journey = api.get(f"/api/client/{CLIENT_ID}/journey").json()
+    # The recording met phase 1's only criterion, so the journey moved on in the same commit
+    assert journey["client"]["currentPhaseIndex"] == 1
+    assert journey["phases"][0]["criteria"][0]["current"] == "12 units"
+    assert [phase["status"] for phase in journey["phases"]][:2] == ["completed", "active"]
+
+
+def test_live_events_carry_criterion_deltas(api):
+    assert api.get("/api/client/CLT_UNKNOWN/events").status_code == 404
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        stream = executor.submit(api.get, f"/api/client/{CLIENT_ID}/events")
+        deadline = time.monotonic() + 5
+        while main.journey_events.stats()["subscribers"] == 0:
+            assert time.monotonic() < deadline, "viewer never subscribed"
+            time.sleep(0.01)
+        api.post("/api/metric/record", json={"client_id": CLIENT_ID, "metric_name": "metric_1", "value": "4"})
+        # Worker shutdown ends the stream, so the test client can return it whole
+        main.journey_events.close()
+        response = stream.result(timeout=5)
+
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = [block.split("\n") for block in response.text.strip().split("\n\n")]
+    assert events[0] == ["retry: 5000"]
+    assert events[1][1:] == [
+        "event: criterion",
+        'data: {"id":"EC_TEST_P1","metric":"metric_1","current":"4 units","met":false}',
+    ]
+    assert len(events) == 2
+
+
+def janeapp_note(note, appointment=None):
+    payload = {"event": "treatment_note.created", "patient": {"external_id": CLIENT_ID}, "treatment_note": note}
+    if appointment is not None:
+        payload["appointment"] = appointment
+    return payload
+
+
+def test_undated_treatment_note_is_dated_when_received(api):
+    # Drain by hand, after backdating the queued row
+    main.webhook_queue.stop()
+    note = {"id": "NOTE_1", "fields": [{"label": "metric_1", "value": "4"}]}
+    assert api.post("/webhooks/janeapp", json=janeapp_note(note)).status_code == 202
+    with main.db_pool.writer() as conn:
+        conn.execute("UPDATE webhook_queue SET received_at = '2026-03-01 08:00:00'")
+
+    assert main.webhook_queue.drain_once() == 1
+    received = datetime(2026, 3, 1, 8, tzinfo=timezone.utc).astimezone().replace(tzinfo=None)
+    with main.db_pool.reader() as conn:
+        assert conn.execute("SELECT recorded_at FROM metric_recordings").fetchone()[0] == received.isoformat()
+
+
+def test_malformed_treatment_note_sections_are_not_a_500(api):
+    assert api.post("/webhooks/janeapp", json=["not", "an", "object"]).status_code == 400
+    assert api.post("/webhooks/janeapp", json={"event": "treatment_note.created", "patient": "CLT"}).status_code == 400
+
+    queued = api.post("/webhooks/janeapp", json=janeapp_note("not an object", appointment="today"))
+    assert queued.status_code == 202
+    assert queued.json()["event_id"].startswith("sha256:")
+    main.webhook_queue.stop()
+    main.webhook_queue.drain_once()
+    with main.db_pool.reader() as conn:
+        assert conn.execute("SELECT status FROM webhook_queue").fetchone()[0] == "done"
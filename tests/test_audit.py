@@ -0,0 +1,55 @@
+"""Audit segment retention (backend/audit.py)."""
+
+import logging
+import os
+import time
+
+from backend.audit import JsonLineFormatter, SegmentFileHandler, sweep_stale_segments
+
+DAY = 24 * 60 * 60
+
+
+def segment(directory, name, age_days):
+    path = directory / name
+    path.write_text("{}\n", encoding="utf-8")
+    stamp = time.time() - age_days * DAY
+    os.utime(path, (stamp, stamp))
+    return path
+
+
+def test_segments_are_swept_by_age_alone(tmp_path):
+    stale = [
+        segment(tmp_path, "audit.4242.jsonl", 100),
+        segment(tmp_path, "audit.4242.jsonl.3", 120),
+        # A running pid proves nothing once pids are reused across restarts
+        segment(tmp_path, f"audit.{os.getppid()}.jsonl.1", 100),
+    ]
+    kept = [
+        segment(tmp_path, "audit.4242.jsonl.1", 10),               # within retention
+        segment(tmp_path, f"audit.{os.getpid()}.jsonl", 0),        # being written
+        segment(tmp_path, "notes.txt", 400),                       # not a segment
+    ]
+
+    assert sweep_stale_segments(tmp_path, 90 * DAY) == 3
+    assert not any(path.exists() for path in stale)
+    assert all(path.exists() for path in kept)
+
+
+def test_swept_open_segment_is_rolled_over_before_the_next_write(tmp_path):
+    path = tmp_path / "audit.1.jsonl"
+    handler = SegmentFileHandler(str(path), max_bytes=0, rotate_seconds=60, backup_count=2)
+    handler.setFormatter(JsonLineFormatter())
+    record = logging.LogRecord("vector_audit", logging.INFO, __file__, 1, "ACCESS", None, None)
+    try:
+        handler.emit(record)
+        handler.flush()
+        stamp = time.time() - 100 * DAY
+        os.utime(path, (stamp, stamp))
+        handler.rollover_at = time.time() - 1          # idle well past the rotation interval
+
+        assert sweep_stale_segments(tmp_path, 90 * DAY) == 1
+        handler.emit(record)
+        handler.flush()
+        assert path.read_text(encoding="utf-8").count("ACCESS") == 1
+    finally:
+        handler.close()
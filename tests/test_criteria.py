@@ -0,0 +1,48 @@
+"""Compiled exit-criteria predicates (backend/criteria.py)."""
+
+import pytest
+
+from backend.criteria import NeverMet, compile_criterion, evaluate_criteria
+
+
+@pytest.mark.parametrize("operator, target, value, met", [
+    (">=", "120", "120", True),
+    (">=", "120", "119.5", False),
+    ("<=", "2", "2", True),
+    ("=", "0", "0.0", True),
+    ("=", "full", "FULL", True),
+    ("=", "full", "partial", False),
+    ("between", "0..10", "10", True),
+    ("between", "10-0", "-1", False),
+    (">=", "pass", "Pass", True),
+    (">=", "120", None, False),
+])
+def test_predicates(operator, target, value, met):
+    assert compile_criterion(operator, target)(value) is met
+
+
+def test_unsatisfiable_pairs_compile_to_never_met():
+    assert isinstance(compile_criterion(">=", "bodyweight"), NeverMet)
+    assert isinstance(compile_criterion("between", "lots"), NeverMet)
+
+
+def test_evaluate_criteria_groups_by_journey_and_treats_unknown_as_unmet():
+    predicates = {"EC_A": compile_criterion(">=", "10"), "EC_B": compile_criterion("=", "pass")}
+    observed = [("J1", "EC_A", "12"), ("J1", "EC_B", None), ("J2", "EC_A", "3"), ("J2", "EC_X", "99")]
+    assert evaluate_criteria(predicates, observed) == {
+        "J1": {"EC_A": True, "EC_B": False},
+        "J2": {"EC_A": False, "EC_X": False},
+    }
+
+
+def test_evaluate_criteria_maps_each_predicate_over_its_column():
+    seen = []
+
+    def recording(value):
+        seen.append(value)
+        return value == "hit"
+
+    page = [("J1", "EC_A", "hit"), ("J1", "EC_B", "10"), ("J2", "EC_A", "miss"), ("J3", "EC_A", None)]
+    met = evaluate_criteria({"EC_A": recording, "EC_B": compile_criterion(">=", "10")}, page)
+    assert seen == ["hit", "miss", None]
+    assert met == {"J1": {"EC_A": True, "EC_B": True}, "J2": {"EC_A": False}, "J3": {"EC_A": False}}
@@ -0,0 +1,53 @@
+"""Reader checkout, writer transactions, savepoints and after-commit callbacks (backend/db.py)."""
+
+import pytest
+
+from backend.db import ConnectionPool, PoolExhausted
+
+
+def test_after_commit_runs_on_commit_and_is_dropped_on_rollback(pool):
+    fired = []
+    with pool.writer():
+        pool.after_commit(lambda: fired.append("committed"))
+    assert fired == ["committed"]
+
+    with pytest.raises(RuntimeError):
+        with pool.writer():
+            pool.after_commit(lambda: fired.append("rolled back"))
+            raise RuntimeError("boom")
+    assert fired == ["committed"]
+
+
+def test_savepoint_rollback_discards_its_writes_and_callbacks(pool):
+    fired = []
+    with pool.writer() as conn:
+        cursor = conn.cursor()
+        cursor.execute("BEGIN IMMEDIATE")
+        with pool.savepoint(cursor, "unit"):
+            cursor.execute("UPDATE clients SET display_name = 'kept'")
+            pool.after_commit(lambda: fired.append("kept"))
+        with pytest.raises(ValueError):
+            with pool.savepoint(cursor, "unit"):
+                cursor.execute("UPDATE clients SET sport_activity = 'discarded'")
+                pool.after_commit(lambda: fired.append("discarded"))
+                raise ValueError("unit failed")
+        pool.after_commit(lambda: fired.append("after"))
+
+    assert fired == ["kept", "after"]
+    with pool.reader() as conn:
+        name, sport = conn.execute("SELECT display_name, sport_activity FROM clients").fetchone()
+    assert (name, sport) == ("kept", "Synthetic")
+
+
+def test_reader_checkout_gives_up_with_pool_exhausted(db_path):
+    pool = ConnectionPool(db_path, max_readers=1, checkout_timeout=0.01)
+    try:
+        with pool.reader():
+            with pytest.raises(PoolExhausted):
+                with pool.reader():
+                    pass
+        # Returned readers are reused
+        with pool.reader() as conn:
+            assert conn.execute("SELECT COUNT(*) FROM clients").fetchone()[0] == 1
+    finally:
+        pool.close()
@@ -0,0 +1,61 @@
+"""Redeploys keep data and skip an unchanged schema (scripts/deploy_init.py)."""
+
+import shutil
+import sqlite3
+
+import pytest
+
+import deploy_init
+from conftest import ROOT
+
+
+@pytest.fixture
+def deploy_dir(tmp_path, monkeypatch):
+    for sub in ("schema", "seeds", "protocols"):
+        shutil.copytree(ROOT / "database" / sub, tmp_path / "database" / sub)
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+def user_version():
+    conn = sqlite3.connect(deploy_init.DB_PATH)
+    try:
+        return conn.execute("PRAGMA user_version").fetchone()[0]
+    finally:
+        conn.close()
+
+
+def test_unchanged_schema_is_skipped_and_data_kept(deploy_dir, capsys):
+    deploy_init.init_db()
+    schema = deploy_init.SCHEMA_PATH.read_text(encoding="utf-8")
+    assert user_version() == deploy_init.schema_fingerprint(schema)
+
+    # A client recorded between deploys
+    conn = sqlite3.connect(deploy_init.DB_PATH)
+    conn.execute("INSERT INTO clients (id, display_name, intake_date) VALUES ('CLT_KEPT', 'Kept', '2026-02-01')")
+    conn.execute("""
+        INSERT INTO client_journeys (id, client_id, pathology_id, current_phase_id, status, started_at)
+        VALUES ('JRN_KEPT', 'CLT_KEPT', 'PATH_ACL_01', 'PHASE_ACL_01_P1', 'active', '2026-02-01')
+    """)
+    conn.commit()
+    conn.close()
+    capsys.readouterr()
+
+    deploy_init.init_db()
+    assert "Schema unchanged since last deploy; skipped." in capsys.readouterr().out
+    conn = sqlite3.connect(deploy_init.DB_PATH)
+    assert conn.execute("SELECT client_id FROM client_journeys WHERE id = 'JRN_KEPT'").fetchone() == ("CLT_KEPT",)
+    conn.close()
+
+
+def test_changed_schema_is_reapplied(deploy_dir, capsys):
+    deploy_init.init_db()
+    before = user_version()
+
+    with open(deploy_init.SCHEMA_PATH, "a", encoding="utf-8") as f:
+        f.write("\n-- schema edit\n")
+    capsys.readouterr()
+    deploy_init.init_db()
+
+    assert "Schema applied successfully." in capsys.readouterr().out
+    assert user_version() not in (before, 0)
@@ -0,0 +1,38 @@
+"""Live journey event fan-out and backpressure (backend/events.py)."""
+
+import asyncio
+
+from backend.events import _CLOSE, RESYNC_MESSAGE, JourneyEventBus
+
+
+def drain(subscription):
+    messages = []
+    while not subscription.queue.empty():
+        messages.append(subscription.queue.get_nowait())
+    return messages
+
+
+def test_slow_viewer_gets_one_resync_instead_of_the_backlog():
+    async def scenario():
+        bus = JourneyEventBus(max_queue=2)
+        subscription = bus.subscribe("CLT_A")
+        for n in range(3):
+            bus.publish("CLT_A", "criterion", {"n": n})
+        await asyncio.sleep(0)
+        return drain(subscription)
+
+    messages = asyncio.run(scenario())
+    assert messages == [RESYNC_MESSAGE]
+
+
+def test_close_reaches_a_viewer_with_a_full_queue():
+    async def scenario():
+        bus = JourneyEventBus(max_queue=2)
+        subscription = bus.subscribe("CLT_A")
+        for n in range(2):
+            bus.publish("CLT_A", "criterion", {"n": n})
+        bus.close()
+        await asyncio.sleep(0)
+        return drain(subscription)
+
+    assert asyncio.run(scenario()) == [_CLOSE]
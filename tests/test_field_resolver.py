@@ -0,0 +1,75 @@
+"""JaneApp label resolution and live alias reloads (backend/field_resolver.py)."""
+
+import json
+import os
+
+import pytest
+
+from backend import field_resolver
+from backend.criteria import compile_criterion
+from backend.field_resolver import FieldResolver, load_aliases
+from backend.protocol_cache import CompiledCriterion
+
+PHASE_ID = "PHASE_ACL_01_P1"
+
+
+def criterion(criterion_id, metric_name, description):
+    return CompiledCriterion(
+        id=criterion_id, metric_name=metric_name, target_operator=">=", target_value="0",
+        measurement_unit="degrees", description=description, label=metric_name, target=">= 0",
+        is_met=compile_criterion(">=", "0"),
+    )
+
+
+CRITERIA = (
+    criterion("EC_EXT", "knee_extension", "Full passive knee extension"),
+    criterion("EC_LAG", "quad_lag", "No quadriceps lag on straight leg raise"),
+    criterion("EC_PAIN", "pain_level", "Pain at rest on VAS"),
+)
+
+
+@pytest.fixture
+def alias_file(tmp_path, monkeypatch):
+    # Private cache per test, so the real alias table is never consulted
+    monkeypatch.setattr(field_resolver, "_alias_cache", {"mtime": None, "aliases": {}, "version": 0, "checked": None})
+    path = tmp_path / "janeapp_aliases.json"
+    path.write_text(json.dumps({"phases": {}}), encoding="utf-8")
+    return path
+
+
+def write_aliases(path, labels, bump):
+    path.write_text(json.dumps({"phases": {PHASE_ID: labels}}), encoding="utf-8")
+    # Distinct mtime even on coarse filesystem clocks
+    stamp = path.stat().st_mtime + bump
+    os.utime(path, (stamp, stamp))
+
+
+@pytest.mark.parametrize("label, expected", [
+    ("knee_extension", "EC_EXT"),
+    ("Quad Lag", "EC_LAG"),
+    ("Pain Level (VAS)", "EC_PAIN"),
+    ("straight leg raise", "EC_LAG"),
+    ("Hop Test", None),
+])
+def test_resolution_strategies(alias_file, label, expected):
+    resolver = FieldResolver(PHASE_ID, CRITERIA, alias_source=lambda: load_aliases(alias_file))
+    hit = resolver.resolve(label)
+    assert (hit.id if hit else None) == expected
+
+
+def test_edited_alias_file_applies_without_a_reload(alias_file):
+    resolver = FieldResolver(PHASE_ID, CRITERIA, alias_source=lambda: load_aliases(alias_file, max_age=0))
+    assert resolver.resolve("Extension Deficit") is None
+
+    write_aliases(alias_file, {"Extension Deficit": "EC_EXT"}, bump=1)
+    assert resolver.resolve("Extension Deficit").id == "EC_EXT"
+
+    write_aliases(alias_file, {"Extension Deficit": "EC_LAG"}, bump=2)
+    assert resolver.resolve("Extension Deficit").id == "EC_LAG"
+
+
+def test_alias_file_is_checked_at_most_once_per_interval(alias_file):
+    assert load_aliases(alias_file, max_age=60) == ({}, 1)
+    write_aliases(alias_file, {"Extension Deficit": "EC_EXT"}, bump=1)
+    assert load_aliases(alias_file, max_age=60) == ({}, 1)
+    assert load_aliases(alias_file, max_age=0)[0] == {PHASE_ID: {"extension deficit": "EC_EXT"}}
@@ -0,0 +1,35 @@
+"""ULID record identifiers (backend/ids.py)."""
+
+import threading
+
+from backend.ids import UlidGenerator, encode_ulid, new_record_id
+
+
+def test_encoding_is_26_crockford_characters():
+    assert encode_ulid(0) == "0" * 26
+    assert encode_ulid((1 << 128) - 1) == "7" + "Z" * 25
+
+
+def test_ids_are_unique_and_ordered_across_threads():
+    generate = UlidGenerator()
+    minted = [[] for _ in range(8)]
+
+    def mint(out):
+        for _ in range(2000):
+            out.append(generate())
+
+    threads = [threading.Thread(target=mint, args=(out,)) for out in minted]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    ids = [ulid for out in minted for ulid in out]
+    assert len(set(ids)) == len(ids)
+    # Each thread sees a strictly increasing sequence
+    assert all(out == sorted(out) and len(set(out)) == len(out) for out in minted)
+
+
+def test_record_ids_carry_their_prefix():
+    record_id = new_record_id("REC")
+    assert record_id.startswith("REC_") and len(record_id) == 30
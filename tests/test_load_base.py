@@ -0,0 +1,52 @@
+"""Incremental Living Library loads and the demo client (scripts/load_base.py)."""
+
+import json
+import sqlite3
+
+import pytest
+
+from conftest import ROOT, SCHEMA_PATH
+from load_base import SEED_PATH, seed_demo_client, sync_protocols
+
+
+@pytest.fixture
+def seeded(tmp_path):
+    conn = sqlite3.connect(tmp_path / "vector.db")
+    conn.execute("PRAGMA foreign_keys = ON")
+    conn.executescript(SCHEMA_PATH.read_text(encoding="utf-8"))
+    protocols = json.loads((ROOT / SEED_PATH).read_text(encoding="utf-8"))["protocols"]
+    sync_protocols(conn.cursor(), protocols, verbose=False)
+    conn.commit()
+    yield conn, protocols
+    conn.close()
+
+
+def demo_state(cursor):
+    phase = cursor.execute("SELECT current_phase_id FROM client_journeys WHERE id = 'JRN_DEMO_ACL'").fetchone()[0]
+    recordings = cursor.execute("SELECT COUNT(*) FROM metric_recordings WHERE journey_id = 'JRN_DEMO_ACL'").fetchone()[0]
+    return phase, recordings
+
+
+def test_unchanged_protocols_are_skipped_on_reload(seeded):
+    conn, protocols = seeded
+    changed, _ = sync_protocols(conn.cursor(), protocols, verbose=False)
+    assert changed == []
+
+
+def test_redeploy_keeps_the_demo_journey_progress(seeded):
+    conn, _ = seeded
+    cursor = conn.cursor()
+    assert seed_demo_client(cursor) is True
+
+    # Progress made between deploys
+    cursor.execute("UPDATE client_journeys SET current_phase_id = 'PHASE_ACL_01_P2' WHERE id = 'JRN_DEMO_ACL'")
+    cursor.execute("""
+        INSERT INTO metric_recordings (id, journey_id, phase_id, criterion_id, metric_name, recorded_value, measurement_unit, recorded_at)
+        VALUES ('REC_LATER', 'JRN_DEMO_ACL', 'PHASE_ACL_01_P1', 'EC_ACL_P1_01', 'knee_extension', '0', 'degrees', datetime('now'))
+    """)
+
+    assert seed_demo_client(cursor) is False
+    assert demo_state(cursor) == ("PHASE_ACL_01_P2", 5)
+
+    assert seed_demo_client(cursor, reset=True) is True
+    assert demo_state(cursor) == ("PHASE_ACL_01_P1", 4)
@@ -0,0 +1,65 @@
+"""Incremental phase advancement (backend/progression.py)."""
+
+from backend.progression import ProgressionEngine
+from backend.protocol_cache import ProtocolCache
+from conftest import CLIENT_ID, JOURNEY_ID, criterion_id, insert_recording, phase_id
+
+
+def record(pool, engine, recording_id, n, value):
+    with pool.writer() as conn:
+        cursor = conn.cursor()
+        insert_recording(cursor, recording_id, n, value)
+        return engine.apply(cursor, [(JOURNEY_ID, criterion_id(n))])
+
+
+def journey_state(pool):
+    with pool.reader() as conn:
+        return tuple(conn.execute(
+            "SELECT current_phase_id, status FROM client_journeys WHERE id = ?", (JOURNEY_ID,)
+        ).fetchone())
+
+
+def test_unmet_value_does_not_advance(pool):
+    engine = ProgressionEngine(ProtocolCache())
+    assert record(pool, engine, "REC_1", 1, 4) == []
+    assert journey_state(pool) == (phase_id(1), "active")
+
+
+def test_met_criterion_advances_and_reports_after_the_writes(pool):
+    events = []
+    engine = ProgressionEngine(ProtocolCache(), on_event=lambda *e: events.append(e))
+
+    record(pool, engine, "REC_1", 1, 4)
+    transitions = record(pool, engine, "REC_2", 1, 12)
+
+    assert [t["completed_phase_id"] for t in transitions] == [phase_id(1)]
+    assert journey_state(pool) == (phase_id(2), "active")
+    assert [(client, event) for client, event, _ in events] == [
+        (CLIENT_ID, "criterion"), (CLIENT_ID, "criterion"), (CLIENT_ID, "phase"),
+    ]
+    assert events[-1][2]["criteria_met"] == {"metric_1": "12 units"}
+
+
+def test_last_phase_completes_the_journey(pool):
+    engine = ProgressionEngine(ProtocolCache())
+    for n in (1, 2, 3):
+        record(pool, engine, f"REC_{n}", n, 10)
+    assert journey_state(pool) == (phase_id(3), "completed")
+
+
+def test_phase_can_be_completed_again_after_a_move_back(pool):
+    engine = ProgressionEngine(ProtocolCache())
+    record(pool, engine, "REC_1", 1, 12)
+
+    # Clinician moves the journey back; the next qualifying value completes phase 1 again
+    with pool.writer() as conn:
+        conn.execute("UPDATE client_journeys SET current_phase_id = ? WHERE id = ?", (phase_id(1), JOURNEY_ID))
+    transitions = record(pool, engine, "REC_2", 1, 15)
+
+    assert [t["completed_phase_id"] for t in transitions] == [phase_id(1)]
+    with pool.reader() as conn:
+        completions = conn.execute(
+            "SELECT COUNT(*) FROM phase_completions WHERE journey_id = ? AND phase_id = ?",
+            (JOURNEY_ID, phase_id(1))
+        ).fetchone()[0]
+    assert completions == 2
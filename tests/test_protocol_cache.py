@@ -0,0 +1,32 @@
+"""Compiled protocol cache and library-version invalidation (backend/protocol_cache.py)."""
+
+from backend.protocol_cache import ProtocolCache
+from conftest import PATHOLOGY_ID, PHASE_COUNT
+
+
+def counters(cache):
+    stats = cache.stats()
+    return stats["size"], stats["library_version"], stats["hits"], stats["misses"], stats["stale_reads"]
+
+
+def test_only_a_newer_library_version_clears_the_cache(pool):
+    cache = ProtocolCache()
+    with pool.reader() as conn:
+        cursor = conn.cursor()
+        version = cursor.execute("SELECT version FROM pathologies WHERE id = ?", (PATHOLOGY_ID,)).fetchone()[0]
+
+        cached = cache.get(cursor, PATHOLOGY_ID, version, 5)
+        assert cache.get(cursor, PATHOLOGY_ID, version, 5) is cached
+        assert counters(cache) == (1, 5, 1, 1, 0)
+
+        # A reader on an older snapshot is served without disturbing the entries
+        older = cache.get(cursor, PATHOLOGY_ID, version, 4)
+        assert older is not cached and len(older.phases) == PHASE_COUNT
+        assert counters(cache) == (1, 5, 1, 1, 1)
+        assert cache.get(cursor, PATHOLOGY_ID, version, 5) is cached
+
+        # A reload elsewhere bumps the counter: recompiled once, then cached again
+        reloaded = cache.get(cursor, PATHOLOGY_ID, version, 6)
+        assert reloaded is not cached
+        assert cache.get(cursor, PATHOLOGY_ID, version, 6) is reloaded
+        assert counters(cache) == (1, 6, 3, 2, 1)
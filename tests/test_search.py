@@ -0,0 +1,56 @@
+"""Living Library search: query reduction, prefixes and highlighting (backend/search.py)."""
+
+import sqlite3
+
+import pytest
+
+from backend.search import match_expression, search
+from conftest import make_protocol
+from load_base import sync_protocols
+
+
+@pytest.mark.parametrize("query, expression", [
+    ("bfr leg ext", '"bfr" "leg" "ext"*'),
+    # Quotes, operators and column filters are dropped, never passed to MATCH
+    ('"leg extension"', '"leg" "extension"'),
+    ('leg OR "ext', '"leg" "OR" "ext"*'),
+    ("title:quad -", '"title" "quad"'),
+    ('"', None),
+    ("  ", None),
+])
+def test_match_expression(query, expression):
+    assert match_expression(query) == expression
+
+
+@pytest.fixture
+def library(db_path, pool):
+    protocol = make_protocol()
+    protocol["phases"][0]["description"] = "Quad sets <img src=x onerror=alert(1)> & straight leg raises"
+    protocol["phases"][1]["name"] = "<script>alert(1)</script> Loading"
+    conn = sqlite3.connect(db_path)
+    sync_protocols(conn.cursor(), [protocol], verbose=False)
+    conn.commit()
+    conn.close()
+    return pool
+
+
+def test_last_term_is_matched_as_a_prefix(library):
+    with library.reader() as conn:
+        assert [hit["id"] for hit in search(conn.cursor(), "straight le", kind="phase")] == ["PHASE_TEST_P1"]
+        assert search(conn.cursor(), "straight le ", kind="phase") == []
+
+
+def test_snippets_and_titles_are_escaped_around_marks(library):
+    with library.reader() as conn:
+        [phase] = search(conn.cursor(), "quad", kind="phase")
+        [titled] = search(conn.cursor(), "loading", kind="phase")
+    assert "<img" not in phase["snippet"]
+    assert "&lt;img src=x onerror=alert(1)&gt; &amp; straight" in phase["snippet"]
+    assert phase["snippet"].startswith("<mark>Quad</mark>")
+    assert titled["title"] == "&lt;script&gt;alert(1)&lt;/script&gt; <mark>Loading</mark>"
+
+
+def test_search_endpoint_rejects_a_lone_quote_and_accepts_quoted_terms(api):
+    assert api.get("/api/search", params={"q": '"'}).status_code == 400
+    hits = api.get("/api/search", params={"q": '"phase 3"', "kind": "phase"}).json()["results"]
+    assert [hit["id"] for hit in hits] == ["PHASE_TEST_P3"]
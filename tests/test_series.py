@@ -0,0 +1,77 @@
+"""Metric history: the metric_series shadow, week buckets and LTTB (backend/series.py)."""
+
+from backend.series import bucketed_series, lttb, raw_series
+from conftest import JOURNEY_ID, insert_recording
+
+
+def record(pool, *recordings):
+    with pool.writer() as conn:
+        cursor = conn.cursor()
+        for n, (value, recorded_at) in enumerate(recordings):
+            insert_recording(cursor, f"REC_{n:02d}", 1, value, recorded_at)
+
+
+def test_only_whole_numbers_reach_the_series(pool):
+    record(
+        pool,
+        ("3-4", "2026-02-01T09:00:00"),
+        ("1e", "2026-02-01T09:01:00"),
+        ("+-", "2026-02-01T09:02:00"),
+        ("12kg", "2026-02-01T09:03:00"),
+        ("full", "2026-02-01T09:04:00"),
+        (" 7 ", "2026-02-01T09:05:00"),
+        (".5", "2026-02-01T09:06:00"),
+        ("1e3", "2026-02-01T09:07:00"),
+    )
+    with pool.reader() as conn:
+        rows = raw_series(conn.cursor(), JOURNEY_ID, "metric_1")
+    assert [(t, value) for _, t, value in rows] == [
+        ("2026-02-01 09:05:00", 7.0),
+        ("2026-02-01 09:06:00", 0.5),
+        ("2026-02-01 09:07:00", 1000.0),
+    ]
+
+
+def test_raw_series_range_is_inclusive_by_day(pool):
+    record(
+        pool,
+        ("1", "2026-01-31T23:59:00"),
+        ("2", "2026-02-01T00:00:00"),
+        ("3", "2026-02-03T23:59:59"),
+        ("4", "2026-02-04T00:00:00"),
+    )
+    with pool.reader() as conn:
+        rows = raw_series(conn.cursor(), JOURNEY_ID, "metric_1", start="2026-02-01", end="2026-02-03")
+    assert [value for _, _, value in rows] == [2.0, 3.0]
+
+
+def test_week_buckets_start_on_monday(pool):
+    # 2026-02-01 is a Sunday: it closes the week of 2026-01-26
+    record(
+        pool,
+        ("5", "2026-02-01T09:00:00"),
+        ("8", "2026-02-02T09:00:00"),
+        ("6", "2026-02-04T09:00:00"),
+        ("7", "2026-02-08T10:00:00"),
+    )
+    with pool.reader() as conn:
+        rows = bucketed_series(conn.cursor(), JOURNEY_ID, "metric_1", "week")
+    assert [row[1:] for row in rows] == [
+        ("2026-01-26", 5.0, 5.0, 5.0, 1),
+        ("2026-02-02", 6.0, 8.0, 7.0, 3),
+    ]
+
+
+def test_lttb_keeps_the_ends_and_the_peak():
+    rows = [(x, 100.0 if x == 37 else 0.0) for x in range(100)]
+    sampled = lttb(rows, 10)
+    assert len(sampled) == 10
+    assert sampled[0] == rows[0] and sampled[-1] == rows[-1]
+    assert (37, 100.0) in sampled
+    assert [x for x, _ in sampled] == sorted(x for x, _ in sampled)
+
+
+def test_lttb_leaves_short_series_alone():
+    rows = [(x, float(x)) for x in range(5)]
+    assert lttb(rows, 5) == rows
+    assert lttb(rows, 2) == rows
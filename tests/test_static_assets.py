@@ -0,0 +1,56 @@
+"""Fingerprinting, per-coding validators and dev reload (backend/static_assets.py)."""
+
+import pytest
+from starlette.testclient import TestClient
+
+from backend import static_assets
+from backend.static_assets import IMMUTABLE, StaticAssets
+
+SCRIPT = "const answer = 42;\n" * 200
+
+
+@pytest.fixture
+def frontend(tmp_path):
+    (tmp_path / "js").mkdir()
+    (tmp_path / "js/app.js").write_text(SCRIPT, encoding="utf-8")
+    (tmp_path / "index.html").write_text('<script src="js/app.js"></script>\n', encoding="utf-8")
+    return tmp_path
+
+
+def test_pages_reference_immutable_fingerprinted_assets(frontend):
+    client = TestClient(StaticAssets(frontend))
+    page = client.get("/")
+    script_path = page.text.split('"')[1]
+    assert script_path.startswith("js/app.") and script_path != "js/app.js"
+
+    script = client.get(f"/{script_path}")
+    assert script.headers["cache-control"] == IMMUTABLE
+    assert script.text == SCRIPT
+
+
+def test_each_content_coding_has_its_own_etag(frontend):
+    client = TestClient(StaticAssets(frontend))
+    plain = client.get("/js/app.js", headers={"Accept-Encoding": "identity"})
+    gzipped = client.get("/js/app.js", headers={"Accept-Encoding": "gzip"})
+    assert gzipped.headers["content-encoding"] == "gzip"
+    assert plain.headers["etag"] != gzipped.headers["etag"]
+
+    # A validator only revalidates the representation it was issued for
+    assert client.get("/js/app.js", headers={
+        "Accept-Encoding": "gzip", "If-None-Match": gzipped.headers["etag"]
+    }).status_code == 304
+    assert client.get("/js/app.js", headers={
+        "Accept-Encoding": "identity", "If-None-Match": gzipped.headers["etag"]
+    }).status_code == 200
+
+
+def test_edits_are_picked_up_only_in_reload_mode(frontend, monkeypatch):
+    monkeypatch.setattr(static_assets, "RELOAD_INTERVAL_SECONDS", 0.0)
+    production = StaticAssets(frontend)
+    development = StaticAssets(frontend, reload=True)
+    for assets in (production, development):
+        assets.build()
+
+    (frontend / "index.html").write_text("<p>edited</p>\n", encoding="utf-8")
+    assert "edited" not in TestClient(production).get("/").text
+    assert TestClient(development).get("/").text == "<p>edited</p>\n"
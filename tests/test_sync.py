@@ -0,0 +1,71 @@
+"""Offline snapshot deltas from the journey_changes log (backend/sync.py)."""
+
+from backend import sync
+from backend.protocol_cache import ProtocolCache
+from backend.sync import current_seq, journey_delta
+from conftest import JOURNEY_ID, PATHOLOGY_ID, criterion_id, insert_recording, phase_id
+
+
+def delta(pool, since):
+    with pool.reader() as conn:
+        cursor = conn.cursor()
+        seq = current_seq(cursor)
+        version, library_version = cursor.execute("""
+            SELECT p.version, (SELECT counter FROM library_version WHERE id = 1)
+            FROM pathologies p WHERE p.id = ?
+        """, (PATHOLOGY_ID,)).fetchone()
+        journey = dict(cursor.execute("""
+            SELECT id AS journey_id, current_phase_id FROM client_journeys WHERE id = ?
+        """, (JOURNEY_ID,)).fetchone())
+        protocol = ProtocolCache().get(cursor, PATHOLOGY_ID, version, library_version)
+        return journey_delta(cursor, protocol, journey, since, seq)
+
+
+def write(pool, *statements):
+    with pool.writer() as conn:
+        cursor = conn.cursor()
+        for statement in statements:
+            statement(cursor)
+
+
+def delete(recording_id):
+    return lambda cursor: cursor.execute("DELETE FROM metric_recordings WHERE id = ?", (recording_id,))
+
+
+def test_empty_window(pool):
+    with pool.reader() as conn:
+        seq = current_seq(conn.cursor())
+    assert delta(pool, seq) == {"seq": seq, "reset": False, "criteria": [], "phase": None}
+
+
+def test_new_recording_patches_its_criterion(pool):
+    write(pool, lambda c: insert_recording(c, "REC_1", 1, 12))
+    assert delta(pool, 0)["criteria"] == [{"id": criterion_id(1), "current": "12 units", "met": True}]
+
+
+def test_delete_and_reinsert_in_one_window_reports_the_net_value(pool):
+    write(pool, lambda c: insert_recording(c, "REC_1", 1, 4))
+    with pool.reader() as conn:
+        since = current_seq(conn.cursor())
+
+    write(pool, delete("REC_1"), lambda c: insert_recording(c, "REC_1", 1, 11))
+    assert delta(pool, since)["criteria"] == [{"id": criterion_id(1), "current": "11 units", "met": True}]
+
+    with pool.reader() as conn:
+        since = current_seq(conn.cursor())
+    write(pool, delete("REC_1"))
+    assert delta(pool, since)["criteria"] == [{"id": criterion_id(1), "current": None, "met": False}]
+
+
+def test_phase_change_is_reported_with_its_index(pool):
+    write(pool, lambda c: c.execute(
+        "UPDATE client_journeys SET current_phase_id = ? WHERE id = ?", (phase_id(2), JOURNEY_ID)
+    ))
+    assert delta(pool, 0)["phase"] == {"currentPhaseId": phase_id(2), "currentPhaseIndex": 1}
+
+
+def test_long_backlog_asks_for_a_new_snapshot(pool, monkeypatch):
+    monkeypatch.setattr(sync, "SYNC_CHANGES_MAX", 2)
+    write(pool, *(lambda c, n=n: insert_recording(c, f"REC_{n}", 1, n) for n in range(3)))
+    result = delta(pool, 0)
+    assert result["reset"] is True
@@ -0,0 +1,73 @@
+"""Durable webhook queue: idempotency, claims, leases and retries (backend/webhook_queue.py)."""
+
+import time
+
+from backend.webhook_queue import WebhookQueue
+
+
+def queue_rows(pool):
+    with pool.reader() as conn:
+        return {row["event_id"]: tuple(row) for row in conn.execute(
+            "SELECT event_id, status, attempts FROM webhook_queue ORDER BY id"
+        )}
+
+
+def test_duplicate_event_ids_are_queued_once(pool):
+    queue = WebhookQueue(pool)
+    assert queue.enqueue("note:1", "treatment_note.created", "{}") is True
+    assert queue.enqueue("note:1", "treatment_note.created", "{}") is False
+    assert queue.stats()["duplicates"] == 1
+    assert len(queue_rows(pool)) == 1
+
+
+def test_idle_poll_does_not_take_the_write_lock(pool):
+    queue = WebhookQueue(pool)
+    queue._handler = lambda cursor, payload, received_at: None
+
+    statements = []
+    with pool.writer() as conn:
+        conn.set_trace_callback(statements.append)
+    try:
+        assert queue.drain_once() == 0
+    finally:
+        with pool.writer() as conn:
+            conn.set_trace_callback(None)
+    assert not any("BEGIN IMMEDIATE" in sql for sql in statements)
+
+
+def test_claimed_rows_are_leased_to_one_drainer(pool):
+    queue = WebhookQueue(pool, lease_seconds=60)
+    queue.enqueue("note:1", "treatment_note.created", "{}")
+    assert [row["event_id"] for row in queue._claim()] == ["note:1"]
+    # Another drainer (this worker or another process) sees nothing while the lease holds
+    assert WebhookQueue(pool)._claim() == []
+
+
+def test_expired_lease_makes_the_row_claimable_again(pool):
+    queue = WebhookQueue(pool, lease_seconds=0)
+    queue.enqueue("note:1", "treatment_note.created", "{}")
+    assert len(queue._claim()) == 1
+    time.sleep(0.01)
+    assert [row["event_id"] for row in WebhookQueue(pool)._claim()] == ["note:1"]
+
+
+def test_failing_event_is_retried_then_parked(pool):
+    queue = WebhookQueue(pool, max_attempts=2, retry_base_seconds=0)
+    applied = []
+
+    def handler(cursor, payload, received_at):
+        if payload == "bad":
+            raise ValueError("unknown metric")
+        applied.append(payload)
+
+    queue._handler = handler
+    queue.enqueue("note:good", "treatment_note.created", "good")
+    queue.enqueue("note:bad", "treatment_note.created", "bad")
+
+    assert queue.drain_once() == 2
+    assert queue_rows(pool) == {"note:good": ("note:good", "done", 0), "note:bad": ("note:bad", "pending", 1)}
+
+    assert queue.drain_once() == 1
+    assert queue_rows(pool)["note:bad"] == ("note:bad", "failed", 2)
+    assert applied == ["good"]
+    assert queue.stats()["depth"] == 0
@@ -0,0 +1,102 @@
+"""Group commit, savepoint isolation and read-your-writes (backend/write_buffer.py)."""
+
+import pytest
+
+from backend.write_buffer import WriteBuffer
+
+
+def rename(pool, name, fired):
+    def work(cursor):
+        cursor.execute("UPDATE clients SET display_name = ?", (name,))
+        pool.after_commit(lambda: fired.append(name))
+        return name
+    return work
+
+
+def failing(pool, fired):
+    def work(cursor):
+        cursor.execute("UPDATE clients SET sport_activity = 'never stored'")
+        pool.after_commit(lambda: fired.append("failed unit"))
+        raise LookupError("no active journey")
+    return work
+
+
+@pytest.fixture
+def buffer(pool):
+    buffer = WriteBuffer(pool, linger=0.05)
+    buffer.start()
+    yield buffer
+    buffer.stop()
+
+
+def test_failed_unit_is_rolled_back_alone_with_its_callbacks(pool, buffer):
+    fired = []
+    futures = [
+        buffer.submit(rename(pool, "first", fired)),
+        buffer.submit(failing(pool, fired)),
+        buffer.submit(rename(pool, "second", fired)),
+    ]
+
+    assert futures[0].result(timeout=5) == "first"
+    with pytest.raises(LookupError):
+        futures[1].result(timeout=5)
+    assert futures[2].result(timeout=5) == "second"
+
+    assert fired == ["first", "second"]
+    with pool.reader() as conn:
+        assert tuple(conn.execute("SELECT display_name, sport_activity FROM clients").fetchone()) == ("second", "Synthetic")
+    stats = buffer.stats()
+    assert (stats["committed"], stats["failed"]) == (2, 1)
+
+
+def test_concurrent_submits_share_a_commit(pool, buffer):
+    fired = []
+    futures = [buffer.submit(rename(pool, f"name {n}", fired)) for n in range(20)]
+    for future in futures:
+        future.result(timeout=5)
+    stats = buffer.stats()
+    assert stats["committed"] == 20
+    assert stats["flushes"] < 20
+
+
+def test_wait_for_blocks_until_the_keys_units_commit(pool):
+    buffer = WriteBuffer(pool, linger=0.2)
+    buffer.start()
+    try:
+        buffer.submit(rename(pool, "pending", []), keys=("CLT_TEST_01",))
+        # Still lingering: a reader would not see the write yet
+        assert buffer.wait_for("CLT_TEST_01", timeout=0.01) is False
+        assert buffer.wait_for("CLT_TEST_01", timeout=5) is True
+        with pool.reader() as conn:
+            assert conn.execute("SELECT display_name FROM clients").fetchone()[0] == "pending"
+        # Other keys never wait
+        assert buffer.wait_for("CLT_OTHER", timeout=0) is True
+    finally:
+        buffer.stop()
+
+
+def test_stop_flushes_queued_units(pool):
+    buffer = WriteBuffer(pool, linger=10)
+    buffer.start()
+    future = buffer.submit(rename(pool, "flushed on stop", []))
+    buffer.stop()
+    assert future.result(timeout=0) == "flushed on stop"
+
+
+def test_units_run_inline_before_start(pool):
+    buffer = WriteBuffer(pool)
+    assert buffer.submit(rename(pool, "inline", [])).done()
+    with pool.reader() as conn:
+        assert conn.execute("SELECT display_name FROM clients").fetchone()[0] == "inline"
+
+
+def test_saturated_at_high_water(pool):
+    buffer = WriteBuffer(pool, linger=10, high_water=2)
+    buffer.start()
+    try:
+        buffer.submit(rename(pool, "a", []))
+        assert not buffer.saturated()
+        buffer.submit(rename(pool, "b", []))
+        assert buffer.saturated()
+    finally:
+        buffer.stop()